@@ -0,0 +1,113 @@
+"""
+Validate the data files and compile them into a prebuilt snapshot
+
+DataLoader loads the compiled snapshot instead of parsing and indexing
+the JSON files for as long as they are unchanged.
+
+Usage (from the backend directory; build.sh runs this on deploy):
+    python -m app.build_snapshot            # validate and compile
+    python -m app.build_snapshot --check    # validate only
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .services.data_loader import COMPILED_SNAPSHOT_FILE, DATA_FILES, get_data_loader
+
+# filename -> (list key, fields every record needs, field that must be unique)
+RECORD_SCHEMAS = {
+    "fastener_types.json": ("fastener_types", ("id", "name", "category", "has_length"), "id"),
+    "materials.json": ("materials", ("id", "name", "density"), "id"),
+    "hsn_codes.json": ("hsn_codes", ("code", "description", "gst_rate"), "code"),
+    "standards.json": ("standards", ("code", "name", "type"), "code"),
+    "kits.json": ("kits", ("id", "name", "components"), "id"),
+}
+
+
+def _check_records(filename: str, data: Dict, errors: List[str]) -> None:
+    key, fields, unique = RECORD_SCHEMAS[filename]
+    records = data.get(key)
+    if not isinstance(records, list):
+        errors.append(f"{filename}: '{key}' must be a list")
+        return
+    seen = set()
+    for position, record in enumerate(records):
+        missing = [field for field in fields if field not in record]
+        if missing:
+            errors.append(f"{filename}: {key}[{position}] is missing {', '.join(missing)}")
+            continue
+        if record[unique] in seen:
+            errors.append(f"{filename}: duplicate {unique} {record[unique]!r}")
+        seen.add(record[unique])
+
+
+def validate_data(data_dir: Path) -> List[str]:
+    """Problems found in the data files (empty when they are valid)"""
+    errors: List[str] = []
+    parsed: Dict[str, Dict] = {}
+    for filename in DATA_FILES:
+        path = data_dir / filename
+        if not path.exists():
+            errors.append(f"{filename}: missing")
+            continue
+        try:
+            parsed[filename] = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            errors.append(f"{filename}: invalid JSON ({e})")
+            continue
+        if filename in RECORD_SCHEMAS:
+            _check_records(filename, parsed[filename], errors)
+
+    materials = parsed.get("materials.json", {}).get("materials", [])
+    for material in materials:
+        if not isinstance(material.get("density"), (int, float)) or material["density"] <= 0:
+            errors.append(f"materials.json: density of {material.get('id')!r} must be a positive number")
+
+    dimensions = parsed.get("dimensions.json", {}).get("dimensions", {})
+    for fastener_type, rows in dimensions.items():
+        for position, row in enumerate(rows):
+            if "diameter" not in row:
+                errors.append(f"dimensions.json: dimensions.{fastener_type}[{position}] is missing diameter")
+
+    type_ids = {ft.get("id") for ft in parsed.get("fastener_types.json", {}).get("fastener_types", [])}
+    material_ids = {mat.get("id") for mat in materials}
+    for kit in parsed.get("kits.json", {}).get("kits", []):
+        for component in kit.get("components", []):
+            if component.get("fastener_type_id") not in type_ids:
+                errors.append(f"kits.json: {kit.get('id')!r} uses unknown fastener type {component.get('fastener_type_id')!r}")
+            if component.get("material_id") and component["material_id"] not in material_ids:
+                errors.append(f"kits.json: {kit.get('id')!r} uses unknown material {component['material_id']!r}")
+    return errors
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validate and compile the India Fasteners data files")
+    parser.add_argument("--check", action="store_true", help="Only validate, do not write the snapshot")
+    parser.add_argument("--output", type=Path, help=f"Snapshot path (default data/{COMPILED_SNAPSHOT_FILE})")
+    args = parser.parse_args(argv)
+
+    data_loader = get_data_loader()
+    errors = validate_data(data_loader.data_dir)
+    for error in errors:
+        print(f"ERROR {error}")
+    if errors:
+        return 1
+    if args.check:
+        print("Data files are valid")
+        return 0
+
+    started = time.perf_counter()
+    path = args.output or data_loader.data_dir / COMPILED_SNAPSHOT_FILE
+    snapshot = data_loader.write_compiled_snapshot(path)
+    print(
+        f"Compiled data version {snapshot.version} to {path} "
+        f"({path.stat().st_size:,} bytes, {(time.perf_counter() - started) * 1000:.1f} ms)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Application settings read from environment variables
+"""
+import os
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean flag such as PRECOMPUTE_WEIGHT_TABLE=1"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer such as CATALOGUE_CACHE_MAX_AGE=60"""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a number such as DATA_RELOAD_INTERVAL=30"""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return float(value)
+
+
+# Build the unit-weight table for standard sizes at startup
+PRECOMPUTE_WEIGHT_TABLE = _env_flag("PRECOMPUTE_WEIGHT_TABLE")
+
+# Seconds between checks of the data files for changes (0 disables polling)
+DATA_RELOAD_INTERVAL = _env_float("DATA_RELOAD_INTERVAL", 0)
+
+# Token expected in the X-Admin-Token header; admin routes are disabled when unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# max-age for catalogue responses; clients revalidate with their ETag after this
+CATALOGUE_CACHE_MAX_AGE = _env_int("CATALOGUE_CACHE_MAX_AGE", 0)
+
+# Entries in the LRU cache of calculated unit weights (0 disables it)
+UNIT_WEIGHT_CACHE_SIZE = _env_int("UNIT_WEIGHT_CACHE_SIZE", 4096)
+
+# Worker pool for large calculation jobs: "thread" or "process"
+CALC_EXECUTOR = os.environ.get("CALC_EXECUTOR", "thread").strip().lower()
+
+# Worker threads/processes in the calculation pool
+CALC_WORKERS = _env_int("CALC_WORKERS", min(4, os.cpu_count() or 1))
+
+# Jobs with fewer line items than this run inline on the event loop
+CALC_INLINE_THRESHOLD = _env_int("CALC_INLINE_THRESHOLD", 500)
+
+# Jobs queued or running in the pool before new ones get 503
+CALC_MAX_PENDING = _env_int("CALC_MAX_PENDING", 16)
+
+# Directory for rendered diagram SVGs shared across restarts (unset keeps them in memory only)
+DIAGRAM_CACHE_DIR = os.environ.get("DIAGRAM_CACHE_DIR", "")
+
+# Render every fastener type/diameter diagram at startup
+PRERENDER_DIAGRAMS = _env_flag("PRERENDER_DIAGRAMS")
+
+# Entries in the server-side cache of @cached_response GET responses (0 disables it)
+RESPONSE_CACHE_SIZE = _env_int("RESPONSE_CACHE_SIZE", 2048)
+
+# Seconds a cached response is served before the route is run again
+RESPONSE_CACHE_TTL = _env_float("RESPONSE_CACHE_TTL", 300)
+
+# SQLite catalogue written by `python -m app.import_catalogue` (unset serves the JSON data files)
+CATALOGUE_DB = os.environ.get("CATALOGUE_DB", "")
+
+# Build the weight identification index at startup and after each reload.
+# Off by default with CATALOGUE_DB, where it would read every dimension row
+# into memory; /api/identify then builds it in a worker thread on first use.
+PRECOMPUTE_WEIGHT_INDEX = _env_flag("PRECOMPUTE_WEIGHT_INDEX", default=not CATALOGUE_DB)
+
+# Directory with unit-weight tables exported by the multi-worker launcher
+# (app/serve.py sets this for its workers; they map the tables instead of building them)
+SHARED_TABLES_DIR = os.environ.get("SHARED_TABLES_DIR", "")
+
+# Worker processes started by app/serve.py
+WEB_CONCURRENCY = _env_int("WEB_CONCURRENCY", 2)
+
+# Upper limits for /admin/profile sessions: sampling rate and duration
+PROFILER_MAX_HZ = _env_float("PROFILER_MAX_HZ", 250)
+PROFILER_MAX_SECONDS = _env_float("PROFILER_MAX_SECONDS", 60)
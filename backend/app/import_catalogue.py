@@ -0,0 +1,46 @@
+"""
+Import the JSON data files into a SQLite catalogue database
+
+Serve it by pointing CATALOGUE_DB at the output file. Re-running the
+import replaces the database atomically; servers with DATA_RELOAD_INTERVAL
+set pick up the new data without a restart.
+
+Usage (from the backend directory):
+    python -m app.import_catalogue                        # writes app/data/catalogue.db
+    python -m app.import_catalogue --output /srv/catalogue.db
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from .build_snapshot import validate_data
+from .services.catalogue_db import import_catalogue
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import the India Fasteners data files into SQLite")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory with the JSON data files")
+    parser.add_argument("--output", type=Path, default=DATA_DIR / "catalogue.db", help="Database file to write")
+    args = parser.parse_args(argv)
+
+    errors = validate_data(args.data_dir)
+    for error in errors:
+        print(f"ERROR {error}")
+    if errors:
+        return 1
+
+    started = time.perf_counter()
+    result = import_catalogue(args.output, args.data_dir)
+    rows = ", ".join(f"{table} {count}" for table, count in sorted(result["rows"].items()))
+    print(
+        f"Imported data version {result['data_version']} to {args.output} "
+        f"({rows}; {(time.perf_counter() - started) * 1000:.1f} ms)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,52 @@ India Fasteners - FastAPI Backend Application
 
 A web API for fastener weight calculations, HSN codes, and standards reference.
 """
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import calculator, hsn, standards
+from . import config
+from .middleware import DataSnapshotMiddleware, MetricsMiddleware, ResponseCacheMiddleware
+from .routers import admin, bootstrap, calculator, hsn, live, standards
+from .services.data_loader import get_data_loader
+from .services.diagram_renderer import prerender_diagrams
+from .services.executor import shutdown_calculation_executor
+from .services.metrics import get_metrics_registry
+from .services.shared_tables import load_shared_tables
+from .services.weight_index import precompute_unit_weight_index
+from .services.weight_table import get_unit_weight_table, precompute_unit_weight_table
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load data and run optional precompute stages before serving requests"""
+    data_loader = get_data_loader()
+    data_loader.snapshot()
+    shared_tables = bool(config.SHARED_TABLES_DIR) and load_shared_tables(Path(config.SHARED_TABLES_DIR))
+    if shared_tables:
+        # Mapped from the launcher; after a reload this worker builds its own
+        data_loader.add_reload_listener(precompute_unit_weight_table)
+    elif config.PRECOMPUTE_WEIGHT_TABLE:
+        precompute_unit_weight_table()
+        data_loader.add_reload_listener(precompute_unit_weight_table)
+    if config.PRECOMPUTE_WEIGHT_INDEX:
+        # Built here (a no-op when mapped from the launcher) and by the reload
+        # listener, never inside /api/identify on the event loop
+        precompute_unit_weight_index()
+        data_loader.add_reload_listener(precompute_unit_weight_index)
+    if config.PRERENDER_DIAGRAMS:
+        prerender_diagrams()
+        data_loader.add_reload_listener(prerender_diagrams)
+    
+    stop_watcher = None
+    if config.DATA_RELOAD_INTERVAL > 0:
+        stop_watcher = data_loader.start_watcher(config.DATA_RELOAD_INTERVAL)
+    yield
+    if stop_watcher:
+        stop_watcher.set()
+    shutdown_calculation_executor()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -41,7 +84,8 @@ A comprehensive API for fastener weight calculations, GST/HSN codes, and standar
     },
     license_info={
         "name": "MIT License"
-    }
+    },
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -57,18 +101,26 @@ origins = [
     "https://india-fasteners-api.onrender.com",
 ]
 
+# Added first so it runs inside CORS: cached responses never carry CORS headers
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Version"],
 )
+app.add_middleware(DataSnapshotMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(calculator.router)
+app.include_router(live.router)
 app.include_router(hsn.router)
 app.include_router(standards.router)
+app.include_router(bootstrap.router)
+app.include_router(admin.router)
 
 
 @app.get("/", tags=["Root"])
@@ -78,12 +130,15 @@ async def root():
         "name": "India Fasteners API",
         "version": "1.0.0",
         "description": "Fastener weight calculations, HSN codes, and standards reference",
+        "data_version": get_data_loader().version,
         "documentation": "/docs",
         "endpoints": {
+            "bootstrap": "/api/bootstrap",
             "fastener_types": "/api/fastener-types",
             "materials": "/api/materials",
             "calculate_weight": "/api/calculate/weight",
             "calculate_pieces": "/api/calculate/pieces",
+            "live_calculate": "/api/ws/calculate",
             "hsn_codes": "/api/hsn-codes",
             "gst_rates": "/api/gst-rates",
             "standards": "/api/standards"
@@ -94,4 +149,19 @@ async def root():
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "india-fasteners-api"}
+    table = get_unit_weight_table()
+    return {
+        "status": "healthy",
+        "service": "india-fasteners-api",
+        "data_version": get_data_loader().version,
+        "unit_weight_table": table.stats() if table else None
+    }
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """Request, calculation and data loader metrics in Prometheus text format"""
+    return PlainTextResponse(
+        get_metrics_registry().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,155 @@
+"""
+ASGI middleware for the India Fasteners API
+"""
+import time
+from .services.data_loader import get_data_loader
+from .services.metrics import http_request_duration_seconds, http_requests_total
+from .services.prepared_responses import etag_matches
+from .services.response_cache import MAX_CACHED_BODY_BYTES, cache_key, get_response_cache
+
+# Methods recorded under their own name; anything else is "other" so clients
+# cannot create new series by sending made-up verbs
+METRIC_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+
+
+class DataSnapshotMiddleware:
+    """
+    Pin each HTTP request to one data snapshot and report its version
+
+    Every DataLoader lookup made while handling the request sees the same
+    data even if a reload swaps in a new snapshot halfway through. The
+    version is returned in the X-Data-Version response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.data_loader = get_data_loader()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with self.data_loader.pin() as snapshot:
+            version = snapshot.version.encode()
+
+            async def send_with_version(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-data-version", version))
+                    message["headers"] = headers
+                await send(message)
+
+            await self.app(scope, receive, send_with_version)
+
+
+class MetricsMiddleware:
+    """
+    Record request counts, status codes and latency per route template
+
+    Routes are labelled by their template (e.g.
+    /api/diagram/{fastener_type}/{diameter}) so raw paths cannot blow up
+    the number of series. Requests that match no route are "unmatched",
+    and non-standard methods are "other".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"] if scope["method"] in METRIC_METHODS else "other"
+            http_requests_total.inc(method, template, str(status))
+            http_request_duration_seconds.observe(time.perf_counter() - started, method, template)
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve GETs to @cached_response routes from the response cache
+
+    A hit replays the stored response (or answers 304 if the client's
+    ETag matches) without routing or running the handler. On a miss the
+    request runs normally and the response is stored if the route it was
+    routed to opted in. Must sit inside CORSMiddleware so per-origin
+    headers are never cached.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cache = get_response_cache()
+        self.data_loader = get_data_loader()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope["query_string"])
+        version = self.data_loader.version
+        entry = self.cache.get(key, version)
+        if entry is not None:
+            # Recorded by MetricsMiddleware under the route template
+            scope["route"] = entry.route
+            await self._replay(scope, entry, send)
+            return
+
+        start = None
+        chunks = []
+        size = 0
+
+        async def send_and_capture(message):
+            nonlocal start, size
+            if message["type"] == "http.response.start":
+                endpoint = getattr(scope.get("route"), "endpoint", None)
+                if getattr(endpoint, "response_cache", False) and message["status"] == 200:
+                    # Copied now: outer middleware adds per-request headers to the message
+                    start = {"status": message["status"], "headers": list(message.get("headers", []))}
+                    message["headers"] = start["headers"] + [(b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body" and start is not None:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > MAX_CACHED_BODY_BYTES:
+                    # Too large to cache; stop buffering
+                    start, chunks[:] = None, []
+                else:
+                    chunks.append(body)
+                    if not message.get("more_body", False):
+                        self._store(key, scope["route"], start, b"".join(chunks), version)
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+
+    async def _replay(self, scope, entry, send):
+        if_none_match = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"if-none-match"), None)
+        if entry.etag and etag_matches(if_none_match, entry.etag):
+            headers = [(k, v) for k, v in entry.headers if k not in (b"content-length", b"content-type")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers + [(b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": entry.status, "headers": entry.headers + [(b"x-cache", b"HIT")]})
+        await send({"type": "http.response.body", "body": entry.body})
+
+    def _store(self, key, route, start, body, version):
+        """Cache a complete response unless it is content-encoded or per-client"""
+        headers = start["headers"]
+        names = {k.lower() for k, _ in headers}
+        if b"set-cookie" in names or b"content-encoding" in names or b"vary" in names:
+            return
+        self.cache.put(key, start["status"], headers, body, route, version, route.endpoint.response_cache_ttl)
@@ -1,8 +1,8 @@
 """
 Pydantic models for request/response schemas
 """
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Optional, List
 from enum import Enum
 
 
@@ -71,7 +71,7 @@ class WeightCalculationRequest(BaseModel):
     fastener_type_id: str
     material_id: str
     diameter: str  # e.g., "M6", "M8", "M10"
-    length: Optional[float] = Field(None, description="Length in mm")
+    length: Optional[float] = Field(None, gt=0, allow_inf_nan=False, description="Length in mm")
     quantity: int = Field(..., gt=0, description="Number of pieces")
 
 
@@ -80,8 +80,55 @@ class PiecesCalculationRequest(BaseModel):
     fastener_type_id: str
     material_id: str
     diameter: str
-    length: Optional[float] = Field(None, description="Length in mm")
+    length: Optional[float] = Field(None, gt=0, allow_inf_nan=False, description="Length in mm")
     weight: float = Field(..., gt=0, description="Weight in kg")
+    tolerance: bool = Field(False, description="Also estimate the piece-count range within DIN/ISO tolerances")
+    samples: int = Field(100_000, ge=1_000, le=500_000, description="Monte Carlo samples in tolerance mode")
+    seed: Optional[int] = Field(None, description="Random seed for reproducible tolerance estimates")
+
+
+class BatchLineItem(WeightCalculationRequest):
+    """BOM line item; the batch calculator checks its length per row"""
+    length: Optional[float] = Field(None, description="Length in mm")
+
+
+class BatchWeightCalculationRequest(BaseModel):
+    """Request for weight calculation of a bill of materials"""
+    items: List[BatchLineItem] = Field(
+        ...,
+        min_length=1,
+        max_length=10_000,
+        description="BOM line items (larger files go to /calculate/weight/stream)"
+    )
+
+
+class KitComponent(BaseModel):
+    """One component of an ad-hoc kit"""
+    fastener_type_id: str
+    quantity: int = Field(1, gt=0, description="Pieces per set")
+    material_id: Optional[str] = Field(None, description="Overrides the kit material")
+
+
+class KitCalculationRequest(BaseModel):
+    """Request for kit weight calculation: a named kit or a list of components"""
+    kit_id: Optional[str] = Field(None, description="Named kit from /api/kits")
+    components: Optional[List[KitComponent]] = Field(None, min_length=1, description="Ad-hoc components")
+    material_id: str
+    diameter: str  # Thread size shared by every component
+    length: Optional[float] = Field(None, gt=0, allow_inf_nan=False, description="Bolt/screw length in mm")
+    sets: int = Field(1, gt=0, description="Number of sets")
+
+    @model_validator(mode="after")
+    def check_kit_or_components(self):
+        if (self.kit_id is None) == (self.components is None):
+            raise ValueError("Give either kit_id or components")
+        return self
+
+
+class StandardEquivalentsRequest(BaseModel):
+    """Standard codes to convert to their equivalents"""
+    codes: List[str] = Field(..., min_length=1, max_length=1000, description="Standard codes, e.g. IS 1364-1")
+    target: Optional[str] = Field(None, pattern="^(DIN|ISO|IS)$", description="Only return equivalents of this type")
 
 
 # Response models
@@ -108,8 +155,11 @@ class MaterialListResponse(BaseModel):
 
 
 class HSNCodeListResponse(BaseModel):
-    """List of HSN codes"""
+    """List of HSN codes (one page of it when paginated)"""
     hsn_codes: List[HSNCode]
+    offset: Optional[int] = None
+    limit: Optional[int] = None
+    total: Optional[int] = None
 
 
 class StandardListResponse(BaseModel):
@@ -124,6 +174,16 @@ class DimensionResponse(BaseModel):
     dimensions: List[Dimension]
 
 
+class BootstrapResponse(BaseModel):
+    """Catalogue data the frontend needs on first load"""
+    data_version: str
+    fastener_types: List[FastenerType]
+    materials: List[Material]
+    diameters: Dict[str, List[str]] = Field(..., description="Available diameters per fastener type")
+    standards: List[dict]
+    gst: dict
+
+
 class DiagramData(BaseModel):
     """Data for rendering a fastener diagram"""
     fastener_type_id: str
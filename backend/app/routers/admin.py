@@ -0,0 +1,104 @@
+"""
+Admin API routes
+"""
+import asyncio
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from .. import config
+from ..services.data_loader import get_data_loader
+from ..services.calculator import get_weight_calculator
+from ..services.diagram_renderer import get_diagram_cache
+from ..services.profiler import ProfilerBusyError, get_profiler
+from ..services.response_cache import get_response_cache
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured X-Admin-Token"""
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+def reload_data(force: bool = False):
+    """
+    Reload data files that changed on disk
+    
+    Runs in the worker thread pool, so requests keep being served from
+    the current data while the new version is built.
+    
+    Parameters:
+    - force: Rebuild even if no file changed
+    
+    Returns:
+    - reloaded: Whether a new data version was swapped in
+    - data_version: Version now being served
+    - changed_files: Data files that differed from the previous version
+    """
+    data_loader = get_data_loader()
+    try:
+        return data_loader.reload(force=force)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Reload failed, still serving {data_loader.version}: {e}"
+        )
+
+
+@router.get("/cache-stats", dependencies=[Depends(require_admin)])
+async def get_cache_stats():
+    """
+    Unit-weight cache statistics for sizing UNIT_WEIGHT_CACHE_SIZE
+    
+    Returns hit rate, current size, evictions (entries dropped because the
+    cache was full) and invalidations (clears after a data reload), plus
+    the size of the rendered diagram cache and the GET response cache.
+    """
+    calculator = get_weight_calculator()
+    return {
+        "unit_weight_cache": calculator.unit_weight_cache.stats(),
+        "diagram_cache": get_diagram_cache().stats(),
+        "response_cache": get_response_cache().stats()
+    }
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def profile(
+    seconds: float = Query(10, gt=0, description="How long to sample live traffic"),
+    hz: float = Query(100, gt=0, description="Samples per second"),
+    output: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    include_idle: bool = Query(False, description="Also count threads waiting for work")
+):
+    """
+    Sample the stacks of every thread for a few seconds
+    
+    Parameters:
+    - seconds: Session length, at most PROFILER_MAX_SECONDS
+    - hz: Sampling rate, at most PROFILER_MAX_HZ
+    - output: "collapsed" for flame graph tools (flamegraph.pl,
+      speedscope), or "json" for the same stacks with a summary and the
+      functions most often on top of a stack
+    - include_idle: Keep samples of threads blocked in a wait or select
+    
+    Only one session runs at a time; a second request gets 409. Nothing
+    is sampled outside a session.
+    """
+    profiler = get_profiler()
+    try:
+        session = profiler.start(seconds, hz, include_idle)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop(session)
+    if output == "json":
+        return session.report()
+    return PlainTextResponse(session.collapsed())
@@ -0,0 +1,46 @@
+"""
+Bootstrap API route
+"""
+from fastapi import APIRouter, Request
+from ..models.schemas import BootstrapResponse
+from ..services.data_loader import get_data_loader
+from ..services.calculator import get_base_dimension_type
+from ..services.prepared_responses import prepared_json_response
+from .standards import build_standards_list
+
+router = APIRouter(prefix="/api", tags=["Bootstrap"])
+
+
+def build_bootstrap() -> dict:
+    """Fastener types, materials, diameters per type, standards and GST info"""
+    data_loader = get_data_loader()
+    fastener_types = data_loader.get_fastener_types()
+    return {
+        "data_version": data_loader.version,
+        "fastener_types": fastener_types,
+        "materials": data_loader.get_materials(),
+        "diameters": {
+            ft["id"]: data_loader.get_all_diameters(get_base_dimension_type(ft["id"]))
+            for ft in fastener_types
+        },
+        "standards": build_standards_list()["standards"],
+        "gst": data_loader.get_gst_info(),
+    }
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+async def get_bootstrap(request: Request):
+    """
+    Get the whole catalogue the frontend needs in one request
+    
+    The body is encoded and gzip-compressed once per data version and
+    sent with an ETag, so a returning client revalidates with a single
+    304 Not Modified.
+    """
+    return prepared_json_response(
+        request,
+        "bootstrap",
+        build_bootstrap,
+        model=BootstrapResponse,
+        compress=True
+    )
@@ -1,28 +1,46 @@
 """
 Calculator API routes
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from typing import Optional
+from .. import config
 from ..models.schemas import (
     WeightCalculationRequest,
     PiecesCalculationRequest,
+    BatchWeightCalculationRequest,
+    KitCalculationRequest,
     CalculationResult,
     FastenerTypeListResponse,
     MaterialListResponse,
     DimensionResponse
 )
 from ..services.data_loader import get_data_loader
-from ..services.calculator import get_weight_calculator
+from ..services.calculator import get_base_dimension_type, get_weight_calculator
+from ..services.batch_calculator import calculate_batch
+from ..services.executor import ExecutorBusyError, get_calculation_executor
+from ..services.prepared_responses import etag_matches, prepared_json_response
+from ..services.response_cache import cached_response
+from ..services.diagram_renderer import get_diagram_cache, resolve_diagram_dimensions
+from ..services.weight_index import current_unit_weight_index, get_unit_weight_index
+from ..services.tolerance import estimate_pieces_with_tolerance
+from ..services.kit_calculator import get_kit_calculator
+from ..services.bulk_stream import stream_csv, stream_ndjson
 
 router = APIRouter(prefix="/api", tags=["Calculator"])
 
 
 @router.get("/fastener-types", response_model=FastenerTypeListResponse)
-async def get_fastener_types():
+async def get_fastener_types(request: Request):
     """Get all available fastener types"""
     data_loader = get_data_loader()
-    types = data_loader.get_fastener_types()
-    return {"fastener_types": types}
+    return prepared_json_response(
+        request,
+        "fastener_types",
+        lambda: {"fastener_types": data_loader.get_fastener_types()},
+        model=FastenerTypeListResponse
+    )
 
 
 @router.get("/fastener-types/{type_id}")
@@ -36,11 +54,15 @@ async def get_fastener_type(type_id: str):
 
 
 @router.get("/materials", response_model=MaterialListResponse)
-async def get_materials():
+async def get_materials(request: Request):
     """Get all available materials with density information"""
     data_loader = get_data_loader()
-    materials = data_loader.get_materials()
-    return {"materials": materials}
+    return prepared_json_response(
+        request,
+        "materials",
+        lambda: {"materials": data_loader.get_materials()},
+        model=MaterialListResponse
+    )
 
 
 @router.get("/materials/{material_id}")
@@ -54,53 +76,56 @@ async def get_material(material_id: str):
 
 
 @router.get("/dimensions/{fastener_type}")
-async def get_dimensions(fastener_type: str):
-    """Get standard dimensions for a fastener type"""
+async def get_dimensions(
+    fastener_type: str,
+    request: Request,
+    offset: int = Query(0, ge=0, description="Rows to skip when paginating"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all rows when omitted)")
+):
+    """
+    Get standard dimensions for a fastener type
+
+    With `limit`, returns one page of rows plus the total row count.
+    """
     data_loader = get_data_loader()
-    dimensions = data_loader.get_dimensions(fastener_type)
-    if not dimensions:
-        raise HTTPException(
-            status_code=404, 
-            detail=f"Dimensions not found for: {fastener_type}"
-        )
-    standards = data_loader.get_standards(fastener_type)
-    return {
-        "fastener_type": fastener_type,
-        "standards": standards,
-        "dimensions": dimensions
-    }
+    
+    if limit is not None:
+        dimensions, total = data_loader.get_dimensions_page(fastener_type, offset, limit)
+        if not total:
+            raise HTTPException(status_code=404, detail=f"Dimensions not found for: {fastener_type}")
+        return {
+            "fastener_type": fastener_type,
+            "standards": data_loader.get_standards(fastener_type),
+            "dimensions": dimensions,
+            "offset": offset,
+            "limit": limit,
+            "total": total
+        }
+    
+    def build():
+        dimensions = data_loader.get_dimensions(fastener_type)
+        if not dimensions:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Dimensions not found for: {fastener_type}"
+            )
+        standards = data_loader.get_standards(fastener_type)
+        return {
+            "fastener_type": fastener_type,
+            "standards": standards,
+            "dimensions": dimensions
+        }
+    
+    return prepared_json_response(request, f"dimensions:{fastener_type}", build)
 
 
 @router.get("/diameters/{fastener_type}")
+@cached_response()
 async def get_available_diameters(fastener_type: str):
     """Get list of available diameters for a fastener type"""
     data_loader = get_data_loader()
     
-    # Map fastener types to their base dimension types
-    type_mapping = {
-        # Bolts - use hex_bolt dimensions
-        "hex_bolt_full_thread": "hex_bolt",
-        "carriage_bolt": "hex_bolt",
-        "stud_bolt": "hex_bolt",
-        "flange_bolt": "hex_bolt",
-        "eye_bolt": "hex_bolt",
-        "anchor_bolt": "hex_bolt",
-        # Nuts - use hex_nut dimensions
-        "lock_nut": "hex_nut",
-        "flange_nut": "hex_nut",
-        "wing_nut": "hex_nut",
-        "castle_nut": "hex_nut",
-        "thin_hex_nut": "hex_nut",
-        # Washers - use plain_washer dimensions
-        "heavy_duty_washer": "plain_washer",
-        # Screws - use socket_head_cap_screw dimensions
-        "machine_screw": "socket_head_cap_screw",
-        "self_tapping_screw": "socket_head_cap_screw",
-        "wood_screw": "socket_head_cap_screw",
-        "set_screw": "socket_head_cap_screw",
-    }
-    
-    base_type = type_mapping.get(fastener_type, fastener_type)
+    base_type = get_base_dimension_type(fastener_type)
     diameters = data_loader.get_all_diameters(base_type)
     return {"fastener_type": fastener_type, "diameters": diameters}
 
@@ -137,6 +162,60 @@ async def calculate_weight(request: WeightCalculationRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/calculate/weight/batch")
+async def calculate_weight_batch(request: BatchWeightCalculationRequest):
+    """
+    Calculate weights for a whole bill of materials in one request
+    
+    Parameters:
+    - items: List of line items, each with fastener_type_id, material_id,
+      diameter, length and quantity (same fields as /calculate/weight)
+    
+    Returns:
+    - results: Per-row results in input order (rows that cannot be
+      calculated carry an "error" message instead)
+    - totals: Line item counts, total pieces and total weight in kg
+    
+    Large batches run in the calculation worker pool; when the pool is
+    saturated the request is rejected with 503 and a Retry-After header.
+    """
+    items = [item.model_dump() for item in request.items]
+    try:
+        return await get_calculation_executor().run(calculate_batch, items, size=len(items))
+    except ExecutorBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Calculation workers are busy, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+
+@router.post("/calculate/weight/stream")
+async def calculate_weight_stream(
+    file: UploadFile = File(..., description="CSV or NDJSON file of line items"),
+    input_format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    output_format: str = Query("ndjson", pattern="^(csv|ndjson)$")
+):
+    """
+    Calculate weights for a large CSV or NDJSON file, streaming results back
+    
+    Each row (or JSON line) has fastener_type_id, material_id, diameter,
+    length and quantity. Rows are parsed and calculated in chunks while
+    the response is being sent, so files of any size use constant memory.
+    
+    Returns one result per input row in order, with the input line number.
+    Rows that cannot be parsed or calculated carry an "error" instead of
+    failing the file. NDJSON output ends with a {"totals": ...} line.
+    """
+    if input_format is None:
+        filename = (file.filename or "").lower()
+        input_format = "ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv"
+    
+    if output_format == "csv":
+        return StreamingResponse(stream_csv(file.file, input_format), media_type="text/csv")
+    return StreamingResponse(stream_ndjson(file.file, input_format), media_type="application/x-ndjson")
+
+
 @router.post("/calculate/pieces")
 async def calculate_pieces(request: PiecesCalculationRequest):
     """
@@ -148,15 +227,31 @@ async def calculate_pieces(request: PiecesCalculationRequest):
     - diameter: Metric diameter
     - length: Length in mm (required for bolts/screws)
     - weight: Weight in kg
+    - tolerance: Also sample part dimensions within their tolerance bands
+      (samples, seed control the Monte Carlo run)
     
     Returns:
     - total_pieces: Number of pieces
     - unit_weight_grams: Weight per piece
     - pieces_per_50kg: How many pieces in 50 kg
+    - tolerance: In tolerance mode, the unit-weight distribution (mean,
+      std, p5/p50/p95) and the p5-p95 range of the piece count
     """
     calculator = get_weight_calculator()
     
     try:
+        if request.tolerance:
+            return await get_calculation_executor().run(
+                estimate_pieces_with_tolerance,
+                request.fastener_type_id,
+                request.material_id,
+                request.diameter,
+                request.length,
+                request.weight,
+                request.samples,
+                request.seed,
+                size=request.samples
+            )
         result = calculator.calculate_pieces_from_weight(
             fastener_type_id=request.fastener_type_id,
             material_id=request.material_id,
@@ -167,12 +262,107 @@ async def calculate_pieces(request: PiecesCalculationRequest):
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Calculation workers are busy, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+
+@router.get("/kits")
+async def get_kits(request: Request):
+    """Get named fastener kits and their components"""
+    data_loader = get_data_loader()
+    return prepared_json_response(request, "kits", lambda: {"kits": data_loader.get_kits()})
+
+
+@router.post("/calculate/kit")
+async def calculate_kit(request: KitCalculationRequest):
+    """
+    Calculate weights for fastener kits (e.g. bolt + nut + washers)
+    
+    Parameters:
+    - kit_id: Named kit from /api/kits, or
+    - components: Ad-hoc list of fastener_type_id, quantity per set and
+      optional material_id
+    - material_id: Material for all components without their own
+    - diameter: Thread size; nuts and washers are sized to match
+    - length: Length in mm for the bolts/screws in the kit
+    - sets: Number of sets
+    
+    Returns:
+    - components: Per-component unit weight, weight per set and totals
+    - set_weight_grams: Weight of one set
+    - total_weight_kg: Weight of all sets
+    - sets_per_50kg: How many sets in 50 kg
+    """
+    kit_calculator = get_kit_calculator()
+    
+    try:
+        kit = None
+        if request.kit_id:
+            kit = kit_calculator.resolve_kit(request.kit_id)
+            components = kit["components"]
+        else:
+            components = [component.model_dump() for component in request.components]
+        result = kit_calculator.calculate_kit(
+            components=components,
+            diameter=request.diameter,
+            material_id=request.material_id,
+            length=request.length,
+            sets=request.sets
+        )
+        return {"kit_id": request.kit_id, "kit_name": kit["name"] if kit else None, **result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/identify")
+async def identify_from_weight(
+    weight_grams: float = Query(..., gt=0, description="Measured weight of one piece in grams"),
+    tolerance_pct: float = Query(5.0, ge=0, le=50, description="Accepted deviation in percent"),
+    material_id: Optional[str] = Query(None, description="Only consider this material"),
+    category: Optional[str] = Query(None, description="Only consider this category (bolt, nut, washer, screw)"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Identify a part from its measured unit weight
+    
+    Returns candidate fastener type, material, diameter and standard
+    length combinations whose calculated unit weight lies within the
+    tolerance, closest first. match_count is the number of combinations
+    in range before the limit is applied.
+    """
+    index = current_unit_weight_index()
+    if index is None:
+        # The reload listener has not rebuilt it yet; build off the event loop
+        index = await asyncio.to_thread(get_unit_weight_index)
+    try:
+        return index.query(
+            weight_grams,
+            tolerance_pct=tolerance_pct,
+            material_id=material_id,
+            category=category,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/diagram/{fastener_type}/{diameter}")
-async def get_diagram_data(fastener_type: str, diameter: str):
+@cached_response()
+async def get_diagram_data(
+    request: Request,
+    fastener_type: str,
+    diameter: str,
+    format: str = Query("json", pattern="^(json|svg)$", description="json for dimension data, svg for a rendered drawing")
+):
     """
     Get dimension data for rendering a fastener diagram
+    
+    With format=svg, returns the diagram drawn to scale as an SVG image.
+    Rendered SVGs are cached per data version and sent with an ETag.
     """
     data_loader = get_data_loader()
     
@@ -180,35 +370,7 @@ async def get_diagram_data(fastener_type: str, diameter: str):
     if not fastener:
         raise HTTPException(status_code=404, detail=f"Fastener type not found: {fastener_type}")
     
-    dim = data_loader.get_dimension_for_diameter(fastener_type, diameter)
-    if not dim:
-        # Try to find dimensions under a related type
-        # Many fastener types share the same base dimensions
-        parent_types = {
-            # Bolts - use hex_bolt dimensions
-            "hex_bolt_full_thread": "hex_bolt",
-            "carriage_bolt": "hex_bolt",
-            "stud_bolt": "hex_bolt",
-            "flange_bolt": "hex_bolt",
-            "eye_bolt": "hex_bolt",
-            "anchor_bolt": "hex_bolt",
-            # Nuts - use hex_nut dimensions
-            "lock_nut": "hex_nut",
-            "flange_nut": "hex_nut",
-            "wing_nut": "hex_nut",
-            "castle_nut": "hex_nut",
-            "thin_hex_nut": "hex_nut",
-            # Washers - use plain_washer dimensions
-            "heavy_duty_washer": "plain_washer",
-            # Screws - use socket_head_cap_screw dimensions
-            "machine_screw": "socket_head_cap_screw",
-            "self_tapping_screw": "socket_head_cap_screw",
-            "wood_screw": "socket_head_cap_screw",
-            "set_screw": "socket_head_cap_screw",
-        }
-        parent = parent_types.get(fastener_type)
-        if parent:
-            dim = data_loader.get_dimension_for_diameter(parent, diameter)
+    dim = resolve_diagram_dimensions(fastener_type, diameter)
     
     if not dim:
         raise HTTPException(
@@ -216,6 +378,19 @@ async def get_diagram_data(fastener_type: str, diameter: str):
             detail=f"Dimensions not found for {diameter}"
         )
     
+    if format == "svg":
+        try:
+            prepared = get_diagram_cache().get(fastener, diameter, dim)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        headers = {
+            "ETag": prepared.etag,
+            "Cache-Control": f"public, max-age={config.CATALOGUE_CACHE_MAX_AGE}, must-revalidate",
+        }
+        if etag_matches(request.headers.get("if-none-match"), prepared.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=prepared.body, media_type="image/svg+xml", headers=headers)
+    
     # Generate labels for diagram
     labels = []
     if "head_across_flats" in dim:
@@ -1,35 +1,59 @@
 """
 HSN Codes and GST API routes
 """
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from typing import Optional
 from ..models.schemas import HSNCodeListResponse
 from ..services.data_loader import get_data_loader
+from ..services.prepared_responses import prepared_json_response
+from ..services.response_cache import cached_response
 
 router = APIRouter(prefix="/api", tags=["HSN & GST"])
 
 
 @router.get("/hsn-codes", response_model=HSNCodeListResponse)
-async def get_hsn_codes():
-    """Get all HSN codes for fasteners"""
+async def get_hsn_codes(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Codes to skip when paginating"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all codes when omitted)")
+):
+    """
+    Get all HSN codes for fasteners
+
+    With `limit`, returns one page of codes plus the total count.
+    """
     data_loader = get_data_loader()
-    codes = data_loader.get_hsn_codes()
-    return {"hsn_codes": codes}
+    if limit is not None:
+        hsn_codes, total = data_loader.get_hsn_codes_page(offset, limit)
+        return {"hsn_codes": hsn_codes, "offset": offset, "limit": limit, "total": total}
+    return prepared_json_response(
+        request,
+        "hsn_codes",
+        lambda: {"hsn_codes": data_loader.get_hsn_codes()},
+        model=HSNCodeListResponse
+    )
 
 
 @router.get("/hsn-codes/search")
+@cached_response()
 async def search_hsn_codes(
-    q: str = Query(..., min_length=1, description="Search query")
+    q: str = Query(..., min_length=1, description="Search query"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of results")
 ):
     """
     Search HSN codes by code number or description
     
+    Results are ranked: exact code match first, then codes starting with
+    the query, then descriptions containing every query word, then close
+    spellings of the query words.
+    
     Examples:
     - Search by code: /api/hsn-codes/search?q=7318
     - Search by keyword: /api/hsn-codes/search?q=bolt
+    - Limit results: /api/hsn-codes/search?q=screw&limit=5
     """
     data_loader = get_data_loader()
-    results = data_loader.search_hsn_codes(q)
+    results = data_loader.search_hsn_codes(q, limit=limit)
     return {"query": q, "results": results, "count": len(results)}
 
 
@@ -37,21 +61,18 @@ async def search_hsn_codes(
 async def get_hsn_code(code: str):
     """Get specific HSN code details"""
     data_loader = get_data_loader()
-    hsn_codes = data_loader.get_hsn_codes()
-    
-    for hsn in hsn_codes:
-        if hsn["code"] == code:
-            return hsn
+    hsn = data_loader.get_hsn_code_by_code(code)
+    if hsn:
+        return hsn
     
     return {"error": "HSN code not found", "code": code}
 
 
 @router.get("/gst-rates")
-async def get_gst_rates():
+async def get_gst_rates(request: Request):
     """Get GST rate information for fasteners"""
     data_loader = get_data_loader()
-    gst_info = data_loader.get_gst_info()
-    return gst_info
+    return prepared_json_response(request, "gst_rates", data_loader.get_gst_info)
 
 
 @router.get("/gst-rates/{material_type}")
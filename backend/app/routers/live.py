@@ -0,0 +1,58 @@
+"""
+Live calculation WebSocket route
+"""
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from ..services.live_calculation import (
+    LatestMessageSlot,
+    compute_live_message,
+    encode_reply,
+    live_connections,
+    live_messages_total
+)
+
+router = APIRouter(prefix="/api", tags=["Calculator"])
+
+
+@router.websocket("/ws/calculate")
+async def live_calculate(websocket: WebSocket):
+    """
+    Calculate weights or piece counts as the user edits the form
+
+    Send the /calculate/weight or /calculate/pieces body as JSON, with
+    "mode": "weight" | "pieces" and an optional "id". Each message gets
+    a {"type": "result" | "error", "id", ...} reply, except messages
+    superseded by a newer one before they were calculated.
+    """
+    await websocket.accept()
+    live_connections.inc()
+    slot = LatestMessageSlot()
+
+    async def receive():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                live_messages_total.inc("received")
+                text = message.get("text")
+                if text is None:
+                    text = (message.get("bytes") or b"").decode("utf-8", "replace")
+                if slot.put(text):
+                    live_messages_total.inc("superseded")
+        finally:
+            slot.close()
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while True:
+            text = await slot.take()
+            if text is None:
+                break
+            await websocket.send_text(encode_reply(compute_live_message(text)))
+            live_messages_total.inc("sent")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        live_connections.dec()
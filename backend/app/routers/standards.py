@@ -1,15 +1,18 @@
 """
 Standards API routes
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from ..models.schemas import StandardEquivalentsRequest
 from ..services.data_loader import get_data_loader
+from ..services.prepared_responses import prepared_json_response
+from ..services.response_cache import cached_response
+from ..services.standards_index import normalize_standard_code, standard_type
 
 router = APIRouter(prefix="/api", tags=["Standards"])
 
 
-@router.get("/standards")
-async def get_all_standards():
-    """Get all fastener standards (DIN, ISO, IS)"""
+def build_standards_list() -> dict:
+    """All standards flattened to one entry per code, with descriptions"""
     data_loader = get_data_loader()
     standards = data_loader.get_standards()
     
@@ -28,7 +31,14 @@ async def get_all_standards():
     return {"standards": formatted}
 
 
+@router.get("/standards")
+async def get_all_standards(request: Request):
+    """Get all fastener standards (DIN, ISO, IS)"""
+    return prepared_json_response(request, "standards", build_standards_list)
+
+
 @router.get("/standards/{fastener_type}")
+@cached_response()
 async def get_standards_for_fastener(fastener_type: str):
     """Get standards applicable to a specific fastener type"""
     data_loader = get_data_loader()
@@ -49,9 +59,10 @@ async def get_standards_for_fastener(fastener_type: str):
 @router.get("/standards/info/{code}")
 async def get_standard_info(code: str):
     """Get detailed information about a specific standard"""
-    info = get_standard_description(code, detailed=True)
+    data_loader = get_data_loader()
+    info = data_loader.get_standard_info(code)
     if info:
-        return info
+        return {**info, "equivalents": data_loader.get_standard_equivalents(code)}
     
     raise HTTPException(
         status_code=404,
@@ -59,176 +70,38 @@ async def get_standard_info(code: str):
     )
 
 
-def get_standard_description(code: str, detailed: bool = False) -> dict | str:
-    """Get description for a standard code"""
-    standards_info = {
-        # DIN Standards
-        "DIN 931": {
-            "code": "DIN 931",
-            "name": "Hexagon Head Bolts - Partially Threaded",
-            "type": "DIN",
-            "description": "Hexagonal head bolts with partial threading, thread to head",
-            "equivalent_iso": "ISO 4014",
-            "material_grades": ["4.6", "4.8", "5.6", "5.8", "8.8", "10.9", "12.9"],
-            "size_range": "M1.6 to M64"
-        },
-        "DIN 933": {
-            "code": "DIN 933",
-            "name": "Hexagon Head Bolts - Fully Threaded",
-            "type": "DIN",
-            "description": "Hexagonal head bolts with full threading along entire shank",
-            "equivalent_iso": "ISO 4017",
-            "material_grades": ["4.6", "4.8", "5.6", "5.8", "8.8", "10.9", "12.9"],
-            "size_range": "M1.6 to M64"
-        },
-        "DIN 912": {
-            "code": "DIN 912",
-            "name": "Socket Head Cap Screws",
-            "type": "DIN",
-            "description": "Cylindrical head with internal hexagon (Allen) drive",
-            "equivalent_iso": "ISO 4762",
-            "material_grades": ["8.8", "10.9", "12.9"],
-            "size_range": "M1.6 to M64"
-        },
-        "DIN 934": {
-            "code": "DIN 934",
-            "name": "Hexagon Nuts",
-            "type": "DIN",
-            "description": "Standard hexagonal nuts, style 1",
-            "equivalent_iso": "ISO 4032",
-            "material_grades": ["4", "5", "6", "8", "10", "12"],
-            "size_range": "M1.6 to M64"
-        },
-        "DIN 125": {
-            "code": "DIN 125",
-            "name": "Plain Washers",
-            "type": "DIN",
-            "description": "Plain washers, Form A (without chamfer) and Form B (with chamfer)",
-            "equivalent_iso": "ISO 7089, ISO 7090",
-            "size_range": "M1.6 to M64"
-        },
-        "DIN 127": {
-            "code": "DIN 127",
-            "name": "Spring Lock Washers",
-            "type": "DIN",
-            "description": "Spring lock washers with square ends",
-            "size_range": "M2 to M48"
-        },
-        "DIN 9021": {
-            "code": "DIN 9021",
-            "name": "Plain Washers - Large Series",
-            "type": "DIN",
-            "description": "Plain washers with larger outer diameter",
-            "equivalent_iso": "ISO 7093",
-            "size_range": "M3 to M36"
-        },
-        # ISO Standards
-        "ISO 4014": {
-            "code": "ISO 4014",
-            "name": "Hexagon Head Bolts - Product Grades A and B",
-            "type": "ISO",
-            "description": "Partially threaded hexagon head bolts",
-            "equivalent_din": "DIN 931",
-            "size_range": "M1.6 to M64"
-        },
-        "ISO 4017": {
-            "code": "ISO 4017",
-            "name": "Hexagon Head Screws - Product Grades A and B",
-            "type": "ISO",
-            "description": "Fully threaded hexagon head screws",
-            "equivalent_din": "DIN 933",
-            "size_range": "M1.6 to M64"
-        },
-        "ISO 4762": {
-            "code": "ISO 4762",
-            "name": "Socket Head Cap Screws",
-            "type": "ISO",
-            "description": "Hexagon socket head cap screws",
-            "equivalent_din": "DIN 912",
-            "size_range": "M1.6 to M64"
-        },
-        "ISO 4032": {
-            "code": "ISO 4032",
-            "name": "Hexagon Nuts - Style 1",
-            "type": "ISO",
-            "description": "Hexagon nuts, style 1, product grades A and B",
-            "equivalent_din": "DIN 934",
-            "size_range": "M1.6 to M64"
-        },
-        "ISO 7089": {
-            "code": "ISO 7089",
-            "name": "Plain Washers - Normal Series",
-            "type": "ISO",
-            "description": "Plain washers, normal series, product grade A",
-            "equivalent_din": "DIN 125 Form A",
-            "size_range": "M1.6 to M64"
-        },
-        "ISO 7093": {
-            "code": "ISO 7093",
-            "name": "Plain Washers - Large Series",
-            "type": "ISO",
-            "description": "Plain washers, large series, product grade A",
-            "equivalent_din": "DIN 9021",
-            "size_range": "M3 to M36"
-        },
-        # Indian Standards (IS)
-        "IS 1363-1": {
-            "code": "IS 1363-1",
-            "name": "Hexagon Head Bolts",
-            "type": "IS",
-            "description": "Hexagon head bolts, screws and nuts of product grade C - Part 1: Hexagon head bolts",
-            "size_range": "M5 to M64"
-        },
-        "IS 1363-3": {
-            "code": "IS 1363-3",
-            "name": "Hexagon Nuts",
-            "type": "IS",
-            "description": "Hexagon head bolts, screws and nuts of product grade C - Part 3: Hexagon nuts",
-            "size_range": "M5 to M64"
-        },
-        "IS 1364-1": {
-            "code": "IS 1364-1",
-            "name": "Hexagon Head Bolts - Product Grades A and B",
-            "type": "IS",
-            "description": "Hexagon head bolts, screws and nuts of product grades A and B - Part 1: Hexagon head bolts",
-            "size_range": "M1.6 to M64"
-        },
-        "IS 1364-3": {
-            "code": "IS 1364-3",
-            "name": "Hexagon Nuts - Style 1",
-            "type": "IS",
-            "description": "Style 1 hexagon nuts of product grades A and B",
-            "size_range": "M1.6 to M64"
-        },
-        "IS 2016": {
-            "code": "IS 2016",
-            "name": "Plain Washers",
-            "type": "IS",
-            "description": "Plain washers for metric fasteners",
-            "size_range": "M1.6 to M64"
-        },
-        "IS 2269": {
-            "code": "IS 2269",
-            "name": "Socket Head Cap Screws",
-            "type": "IS",
-            "description": "Hexagon socket head cap screws",
-            "size_range": "M1.6 to M64"
-        },
-        "IS 6735": {
-            "code": "IS 6735",
-            "name": "Spring Lock Washers",
-            "type": "IS",
-            "description": "Spring lock washers for screws with cylindrical heads",
-            "size_range": "M2 to M48"
-        }
-    }
-    
-    info = standards_info.get(code)
+@router.post("/standards/equivalents")
+async def convert_standards(request: StandardEquivalentsRequest):
+    """
+    Convert a list of standard codes to their equivalents in bulk
     
-    if detailed:
-        return info
+    Parameters:
+    - codes: Standard codes, e.g. ["IS 1364-1", "din 934"]; case and
+      spacing are ignored
+    - target: Only return equivalents of this type (DIN, ISO or IS)
     
+    Returns one result per code in input order, with equivalents found
+    directly or through other standards (IS -> ISO -> DIN).
+    """
+    data_loader = get_data_loader()
+    results = []
+    for code in request.codes:
+        normalized = normalize_standard_code(code)
+        equivalents = data_loader.get_standard_equivalents(normalized)
+        if request.target:
+            equivalents = [other for other in equivalents if standard_type(other) == request.target]
+        results.append({
+            "code": code,
+            "normalized": normalized,
+            "known": bool(equivalents) or data_loader.get_standard_info(normalized) is not None,
+            "equivalents": equivalents
+        })
+    return {"target": request.target, "results": results}
+
+
+def get_standard_description(code: str) -> str:
+    """Get description for a standard code, or the code itself if unknown"""
+    info = get_data_loader().get_standard_info(code)
     if info:
         return info.get("description", code)
-    
     return code
@@ -0,0 +1,77 @@
+"""
+Multi-worker server launcher
+
+The parent process loads the data and builds the unit-weight table and
+weight identification index once, writes them to a shared directory
+(in /dev/shm where available) and then starts the uvicorn workers, which
+map the tables read-only instead of each building their own.
+
+Usage (from the backend directory):
+    python -m app.serve                             # WEB_CONCURRENCY workers on port $PORT
+    python -m app.serve --workers 4 --port 8000
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from . import config
+from .services.data_loader import get_data_loader
+from .services.shared_tables import export_shared_tables
+
+logger = logging.getLogger(__name__)
+
+
+def _shared_dir_base() -> str:
+    """Memory-backed tmpfs when there is one, so the tables never touch disk"""
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def prepare_shared_data(directory: Path) -> str:
+    """Compile the data snapshot if needed and export the tables; returns the data version"""
+    data_loader = get_data_loader()
+    # Workers unpickle this instead of each parsing the JSON files
+    try:
+        data_loader.write_compiled_snapshot()
+    except OSError:
+        logger.warning("Could not write the compiled snapshot; workers will parse the JSON files")
+    snapshot = data_loader.snapshot()
+    export_shared_tables(directory, snapshot)
+    return snapshot.version
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the India Fasteners API with several worker processes")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address (default 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)), help="Port (default $PORT or 8000)")
+    parser.add_argument("--workers", type=int, default=config.WEB_CONCURRENCY, help="Worker processes (default WEB_CONCURRENCY)")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     %(message)s")
+
+    directory = Path(tempfile.mkdtemp(prefix="india-fasteners-", dir=_shared_dir_base()))
+    try:
+        version = prepare_shared_data(directory)
+        logger.info("Serving data version %s to %d workers from %s", version, args.workers, directory)
+        # Workers are spawned fresh and read their settings from the environment
+        os.environ["SHARED_TABLES_DIR"] = str(directory)
+        config.SHARED_TABLES_DIR = str(directory)
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level
+        )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Vectorized batch weight calculation service
+
+Rows are grouped by fastener type and each group's volumes are computed
+with NumPy arrays using the same geometry as ``WeightCalculator``.
+"""
+import math
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .data_loader import get_data_loader
+from .calculator import SHAPE_REGISTRY, get_weight_calculator
+from .metrics import calculations_total
+
+
+# Dimension parameters per fastener type:
+# (dimension table, {param: (dimension key, default as multiple of d)})
+SHAPE_PARAMETERS: Dict[str, Tuple[Optional[str], Dict[str, Tuple[str, float]]]] = {
+    "hex_bolt": ("hex_bolt", {"s": ("head_across_flats", 1.5), "k": ("head_height", 0.7)}),
+    "hex_bolt_full_thread": ("hex_bolt", {"s": ("head_across_flats", 1.5), "k": ("head_height", 0.7)}),
+    "flange_bolt": ("hex_bolt", {"s": ("head_across_flats", 1.5), "k": ("head_height", 0.7)}),
+    "socket_head_cap_screw": ("socket_head_cap_screw", {"head_d": ("head_diameter", 1.5), "head_h": ("head_height", 1.0)}),
+    "hex_nut": ("hex_nut", {"s": ("across_flats", 1.5), "h": ("height", 0.8)}),
+    "lock_nut": ("hex_nut", {"s": ("across_flats", 1.5), "h": ("height", 0.8)}),
+    "flange_nut": ("hex_nut", {"s": ("across_flats", 1.5), "h": ("height", 0.8)}),
+    "wing_nut": ("hex_nut", {"s": ("across_flats", 1.5), "h": ("height", 0.8)}),
+    "castle_nut": ("hex_nut", {"s": ("across_flats", 1.5), "h": ("height", 0.8)}),
+    "thin_hex_nut": ("hex_nut", {"s": ("across_flats", 1.5), "h": ("height", 0.8)}),
+    "plain_washer": ("plain_washer", {"id": ("inner_diameter", 1.05), "od": ("outer_diameter", 2.0), "t": ("thickness", 0.15)}),
+    "heavy_duty_washer": ("plain_washer", {"id": ("inner_diameter", 1.05), "od": ("outer_diameter", 2.0), "t": ("thickness", 0.15)}),
+    "spring_washer": ("spring_washer", {"id": ("inner_diameter", 1.02), "od": ("outer_diameter", 1.8), "t": ("thickness", 0.25)}),
+    "stud_bolt": (None, {}),
+    "carriage_bolt": (None, {}),
+    "eye_bolt": (None, {}),
+    "anchor_bolt": (None, {}),
+    "machine_screw": (None, {}),
+    "self_tapping_screw": (None, {}),
+    "wood_screw": (None, {}),
+    "set_screw": (None, {}),
+}
+
+
+def _rod_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    """Plain cylinder: stud bolt, anchor bolt, set screw"""
+    return (np.pi / 4) * p["d"] ** 2 * p["length"]
+
+
+def _hex_bolt_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    return _rod_volume(p) + 0.866 * p["s"] ** 2 * p["k"]
+
+
+def _flange_bolt_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    d = p["d"]
+    flange = (np.pi / 4) * ((d * 2.5) ** 2 - (d * 1.5) ** 2) * (d * 0.15)
+    return _hex_bolt_volume(p) + flange
+
+
+def _socket_head_cap_screw_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    head_d, head_h = p["head_d"], p["head_h"]
+    head = (np.pi / 4) * head_d ** 2 * head_h
+    socket = (np.pi / 4) * (head_d * 0.6) ** 2 * (head_h * 0.8)
+    return _rod_volume(p) + head - socket
+
+
+def _carriage_bolt_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    d = p["d"]
+    dome = (2 / 3) * np.pi * (d * 1.2) ** 3
+    neck_height = d * 0.5
+    neck = (d * 1.1) ** 2 * neck_height
+    shank = (np.pi / 4) * d ** 2 * np.maximum(p["length"] - neck_height, 0)
+    return dome + neck + shank
+
+
+def _eye_bolt_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    d = p["d"]
+    return _rod_volume(p) + (np.pi ** 2 / 4) * d ** 2 * (d * 3)
+
+
+def _hex_nut_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    return 0.866 * p["s"] ** 2 * p["h"] - (np.pi / 4) * p["d"] ** 2 * p["h"]
+
+
+def _flange_nut_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    d = p["d"]
+    flange = (np.pi / 4) * ((d * 2.2) ** 2 - (d * 1.5) ** 2) * (d * 0.15)
+    return _hex_nut_volume(p) + flange
+
+
+def _plain_washer_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    return (np.pi / 4) * (p["od"] ** 2 - p["id"] ** 2) * p["t"]
+
+
+def _spring_washer_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    mean_diameter = (p["od"] + p["id"]) / 2
+    width = (p["od"] - p["id"]) / 2
+    return np.pi * mean_diameter * width * p["t"]
+
+
+def _machine_screw_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    d = p["d"]
+    return _rod_volume(p) + (np.pi / 4) * (d * 1.8) ** 2 * (d * 0.6) * 0.8
+
+
+def _wood_screw_volume(p: Dict[str, np.ndarray]) -> np.ndarray:
+    d = p["d"]
+    return (np.pi / 12) * d ** 2 * p["length"] + (np.pi / 12) * (d * 2.0) ** 2 * (d * 0.5)
+
+
+def _scaled(func: Callable, factor: float) -> Callable:
+    return lambda p: func(p) * factor
+
+
+# Volume in mm³ for each fastener type, mirroring WeightCalculator.calculate_*_weight
+VOLUME_FUNCTIONS: Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]] = {
+    "hex_bolt": _hex_bolt_volume,
+    "hex_bolt_full_thread": _hex_bolt_volume,
+    "socket_head_cap_screw": _socket_head_cap_screw_volume,
+    "stud_bolt": _rod_volume,
+    "carriage_bolt": _carriage_bolt_volume,
+    "eye_bolt": _eye_bolt_volume,
+    "flange_bolt": _flange_bolt_volume,
+    "anchor_bolt": _rod_volume,
+    "hex_nut": _hex_nut_volume,
+    "lock_nut": _scaled(_hex_nut_volume, 1.1),
+    "flange_nut": _flange_nut_volume,
+    "wing_nut": _scaled(_hex_nut_volume, 1.5),
+    "castle_nut": _hex_nut_volume,
+    "thin_hex_nut": _scaled(_hex_nut_volume, 0.6),
+    "plain_washer": _plain_washer_volume,
+    "spring_washer": _spring_washer_volume,
+    "heavy_duty_washer": _scaled(_plain_washer_volume, 1.5),
+    "machine_screw": _machine_screw_volume,
+    "self_tapping_screw": _machine_screw_volume,
+    "wood_screw": _wood_screw_volume,
+    "set_screw": _rod_volume,
+}
+
+
+class BatchWeightCalculator:
+    """Service for calculating weights of many line items at once"""
+
+    def __init__(self):
+        self.data_loader = get_data_loader()
+        self.calculator = get_weight_calculator()
+
+    def resolve_shape_parameters(self, fastener_type_id: str, diameter: str) -> Dict[str, float]:
+        """
+        Resolve the scalar geometry parameters (d plus head/washer dimensions)
+        for one fastener type and diameter, with the same fallbacks as
+        WeightCalculator
+        """
+        d = self.calculator._get_nominal_diameter(diameter)
+        table, params = SHAPE_PARAMETERS[fastener_type_id]
+        dim = self.data_loader.get_dimension_for_diameter(table, diameter) if table else None
+        resolved = {"d": d}
+        for name, (key, factor) in params.items():
+            resolved[name] = dim.get(key, d * factor) if dim else d * factor
+        return resolved
+
+    def calculate_volumes(
+        self,
+        fastener_type_id: str,
+        diameters: List[str],
+        lengths: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate volumes in mm³ for rows of a single fastener type
+
+        Dimensions are resolved once per distinct diameter and broadcast
+        to the rows with an inverse index.
+        """
+        unique, inverse = np.unique(np.array(diameters), return_inverse=True)
+        per_diameter = [self.resolve_shape_parameters(fastener_type_id, dia) for dia in unique]
+        params = {
+            name: np.array([p[name] for p in per_diameter], dtype=np.float64)[inverse]
+            for name in per_diameter[0]
+        }
+        params["length"] = lengths
+        return VOLUME_FUNCTIONS[fastener_type_id](params)
+
+    def calculate_batch(self, items: List[Dict]) -> Dict:
+        """
+        Calculate weights for a list of line items
+
+        Each item has fastener_type_id, material_id, diameter, length and
+        quantity. Invalid rows are reported with an error instead of
+        failing the whole batch.
+
+        Returns dict with per-row results and order totals
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        groups: Dict[str, List[int]] = defaultdict(list)
+
+        for index, item in enumerate(items):
+            error = self._validate_item(item)
+            if error:
+                results[index] = {"index": index, "error": error}
+            else:
+                groups[item["fastener_type_id"]].append(index)
+
+        for fastener_type_id, indices in groups.items():
+            fastener_type = self.data_loader.get_fastener_type_by_id(fastener_type_id)
+            has_length = SHAPE_REGISTRY[fastener_type_id].needs_length
+
+            diameters = [items[i]["diameter"] for i in indices]
+            lengths = np.array(
+                [items[i]["length"] if has_length else 0.0 for i in indices],
+                dtype=np.float64
+            )
+            materials = [self.data_loader.get_material_by_id(items[i]["material_id"]) for i in indices]
+            for material_id, count in Counter(items[i]["material_id"] for i in indices).items():
+                calculations_total.inc(fastener_type_id, material_id, amount=count)
+            densities = np.array([m["density"] for m in materials], dtype=np.float64)
+            quantities = np.array([items[i]["quantity"] for i in indices], dtype=np.float64)
+
+            unit_weights = self.calculate_volumes(fastener_type_id, diameters, lengths) / 1000 * densities
+            total_weights = unit_weights * quantities / 1000
+
+            for i, material, unit_weight, total_weight in zip(
+                indices, materials, unit_weights.tolist(), total_weights.tolist()
+            ):
+                item = items[i]
+                results[i] = {
+                    "index": i,
+                    "fastener_type": fastener_type["name"],
+                    "material": material["name"],
+                    "material_grade": material.get("grade"),
+                    "diameter": item["diameter"],
+                    "length": item.get("length"),
+                    "unit_weight_grams": round(unit_weight, 3),
+                    "quantity": item["quantity"],
+                    "total_weight_kg": round(total_weight, 4),
+                    "pieces_per_50kg": int(50000 / unit_weight) if unit_weight > 0 else 0
+                }
+
+        valid = [r for r in results if "error" not in r]
+        return {
+            "results": results,
+            "totals": {
+                "line_items": len(items),
+                "valid_line_items": len(valid),
+                "error_count": len(items) - len(valid),
+                "total_pieces": sum(r["quantity"] for r in valid),
+                "total_weight_kg": round(sum(r["total_weight_kg"] for r in valid), 4)
+            }
+        }
+
+    def _validate_item(self, item: Dict) -> Optional[str]:
+        """Return an error message for an invalid row, None if it can be calculated"""
+        if not self.data_loader.get_material_by_id(item["material_id"]):
+            return f"Unknown material: {item['material_id']}"
+        fastener_type = self.data_loader.get_fastener_type_by_id(item["fastener_type_id"])
+        if not fastener_type:
+            return f"Unknown fastener type: {item['fastener_type_id']}"
+        handler = SHAPE_REGISTRY.get(item["fastener_type_id"])
+        if not handler or item["fastener_type_id"] not in VOLUME_FUNCTIONS:
+            return f"No calculation method for: {item['fastener_type_id']}"
+        if item.get("length") is not None:
+            error = length_error(item["length"])
+            if error:
+                return error
+        elif handler.needs_length:
+            return f"Length required for {item['fastener_type_id']}"
+        try:
+            self.calculator._get_nominal_diameter(item["diameter"])
+        except ValueError:
+            return f"Invalid diameter: {item['diameter']}"
+        return None
+
+
+def length_error(length: float) -> Optional[str]:
+    """Error message for a length that is not a positive finite number, None if it is valid"""
+    # NaN and inf would poison the JSON output and the totals
+    if not math.isfinite(length) or length <= 0:
+        return f"Length must be a positive number: {length!r}"
+    return None
+
+
+# Singleton instance
+batch_weight_calculator = BatchWeightCalculator()
+
+
+def get_batch_weight_calculator() -> BatchWeightCalculator:
+    """Get singleton batch calculator instance"""
+    return batch_weight_calculator
+
+
+def calculate_batch(items: List[Dict]) -> Dict:
+    """Module-level entry point so batch jobs can be sent to a process pool"""
+    return batch_weight_calculator.calculate_batch(items)
@@ -0,0 +1,185 @@
+"""
+Streaming bulk weight calculation for CSV and NDJSON files
+
+Rows are parsed lazily from the uploaded file, calculated a chunk at a
+time with the batch engine, and encoded back out as they are produced,
+so memory use does not grow with the size of the file.
+"""
+import csv
+import io
+import json
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .batch_calculator import get_batch_weight_calculator, length_error
+
+# Rows calculated per call to the batch engine
+CHUNK_SIZE = 1000
+
+# Approximate size of each block written to the response
+BLOCK_SIZE = 64 * 1024
+
+RESULT_COLUMNS = [
+    "line",
+    "fastener_type",
+    "material",
+    "material_grade",
+    "diameter",
+    "length",
+    "unit_weight_grams",
+    "quantity",
+    "total_weight_kg",
+    "pieces_per_50kg",
+    "error",
+]
+
+# A parsed row is (line number, item dict or None, error message or None)
+ParsedRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+def _parse_item(record: Dict) -> Dict:
+    """Validate one raw record into a batch calculator item, raising ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError("Row must be an object")
+    item = {}
+    for field in ("fastener_type_id", "material_id", "diameter"):
+        value = record.get(field)
+        if value is None or str(value).strip() == "":
+            raise ValueError(f"Missing {field}")
+        item[field] = str(value).strip()
+
+    length = record.get("length")
+    if length is None or str(length).strip() == "":
+        item["length"] = None
+    else:
+        try:
+            item["length"] = float(length)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid length: {length!r}")
+        error = length_error(item["length"])
+        if error:
+            raise ValueError(error)
+
+    try:
+        quantity = int(str(record.get("quantity", "")).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid quantity: {record.get('quantity')!r}")
+    if quantity <= 0:
+        raise ValueError("Quantity must be greater than 0")
+    item["quantity"] = quantity
+    return item
+
+
+def iter_csv_rows(text: io.TextIOBase) -> Iterator[ParsedRow]:
+    """Parse CSV rows lazily; the first row is the header"""
+    reader = csv.DictReader(text)
+    line = 1
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # A malformed record (e.g. a field over the size limit) fails that row only;
+            # the reader has consumed it and carries on with the next one
+            line = max(reader.line_num, line + 1)
+            yield line, None, f"Invalid CSV row: {e}"
+            continue
+        line = reader.line_num
+        try:
+            yield line, _parse_item(record), None
+        except ValueError as e:
+            yield line, None, str(e)
+
+
+def iter_ndjson_rows(text: io.TextIOBase) -> Iterator[ParsedRow]:
+    """Parse newline-delimited JSON rows lazily, skipping blank lines"""
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            yield line, _parse_item(json.loads(raw)), None
+        except ValueError as e:
+            yield line, None, str(e)
+
+
+def iter_rows(file: BinaryIO, input_format: str) -> Iterator[ParsedRow]:
+    """Parse an uploaded binary file as 'csv' or 'ndjson'"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    if input_format == "csv":
+        return iter_csv_rows(text)
+    return iter_ndjson_rows(text)
+
+
+def iter_results(rows: Iterator[ParsedRow], totals: Dict) -> Iterator[Dict]:
+    """
+    Calculate parsed rows chunk by chunk, yielding one result per row in
+    input order and accumulating order totals into `totals`
+    """
+    calculator = get_batch_weight_calculator()
+    while True:
+        chunk: List[ParsedRow] = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        items = [item for _, item, _ in chunk if item is not None]
+        calculated = iter(calculator.calculate_batch(items)["results"] if items else ())
+
+        for line, item, error in chunk:
+            totals["line_items"] += 1
+            if item is not None:
+                result = next(calculated)
+                result.pop("index")
+                error = result.get("error")
+            if error:
+                totals["error_count"] += 1
+                yield {"line": line, "error": error}
+            else:
+                totals["total_pieces"] += result["quantity"]
+                totals["total_weight_kg"] += result["total_weight_kg"]
+                yield {"line": line, **result}
+
+
+def new_totals() -> Dict:
+    """Empty running totals for iter_results"""
+    return {"line_items": 0, "error_count": 0, "total_pieces": 0, "total_weight_kg": 0.0}
+
+
+def _buffered(lines: Iterator[str]) -> Iterator[bytes]:
+    """Join encoded lines into blocks of about BLOCK_SIZE bytes"""
+    block: List[str] = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield "".join(block).encode("utf-8")
+            block, size = [], 0
+    if block:
+        yield "".join(block).encode("utf-8")
+
+
+def stream_ndjson(file: BinaryIO, input_format: str) -> Iterator[bytes]:
+    """Results as NDJSON, one line per input row, then a final totals line"""
+    def lines():
+        totals = new_totals()
+        for result in iter_results(iter_rows(file, input_format), totals):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        totals["total_weight_kg"] = round(totals["total_weight_kg"], 4)
+        yield json.dumps({"totals": totals}) + "\n"
+
+    return _buffered(lines())
+
+
+def stream_csv(file: BinaryIO, input_format: str) -> Iterator[bytes]:
+    """Results as CSV with a header row, one line per input row"""
+    def lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=RESULT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for result in iter_results(iter_rows(file, input_format), new_totals()):
+            writer.writerow(result)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return _buffered(lines())
@@ -2,8 +2,39 @@
 Weight calculation service for fasteners
 """
 import math
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from .. import config
 from .data_loader import get_data_loader
+from .lru import LRUCache
+from .weight_table import get_unit_weight_table
+from .metrics import calculations_total
+
+
+class ShapeHandler(NamedTuple):
+    """How to calculate the unit weight of one fastener type"""
+    # Unbound WeightCalculator method: (self, diameter, [length,] density) -> grams
+    calculate: Callable[..., float]
+    needs_length: bool
+    # Dimension table that lists the diameters available for this type
+    base_dimension_type: str
+
+
+# Fastener type id -> handler, filled by @register_shape at import
+SHAPE_REGISTRY: Dict[str, ShapeHandler] = {}
+
+
+def register_shape(fastener_type_id: str, needs_length: bool, base_dimension_type: str):
+    """Register a weight calculation method for a fastener type"""
+    def decorator(func: Callable[..., float]) -> Callable[..., float]:
+        SHAPE_REGISTRY[fastener_type_id] = ShapeHandler(func, needs_length, base_dimension_type)
+        return func
+    return decorator
+
+
+def get_base_dimension_type(fastener_type_id: str) -> str:
+    """Dimension table a fastener type shares (e.g. lock_nut -> hex_nut)"""
+    handler = SHAPE_REGISTRY.get(fastener_type_id)
+    return handler.base_dimension_type if handler else fastener_type_id
 
 
 class WeightCalculator:
@@ -11,6 +42,8 @@ class WeightCalculator:
     
     def __init__(self):
         self.data_loader = get_data_loader()
+        # (type, material, diameter, length) -> (type name, material name, grade, grams)
+        self.unit_weight_cache = LRUCache(config.UNIT_WEIGHT_CACHE_SIZE)
     
     def _get_nominal_diameter(self, diameter_str: str) -> float:
         """Extract numeric diameter from string like 'M6', 'M10'"""
@@ -18,6 +51,7 @@ class WeightCalculator:
             return float(diameter_str[1:])
         return float(diameter_str)
     
+    @register_shape("hex_bolt", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_hex_bolt_weight(
         self, 
         diameter: str, 
@@ -66,6 +100,7 @@ class WeightCalculator:
         
         return weight_grams
     
+    @register_shape("hex_bolt_full_thread", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_hex_bolt_full_thread_weight(
         self,
         diameter: str,
@@ -76,6 +111,7 @@ class WeightCalculator:
         # Same as partial thread hex bolt for weight purposes
         return self.calculate_hex_bolt_weight(diameter, length, density)
     
+    @register_shape("socket_head_cap_screw", needs_length=True, base_dimension_type="socket_head_cap_screw")
     def calculate_socket_head_cap_screw_weight(
         self,
         diameter: str,
@@ -110,6 +146,7 @@ class WeightCalculator:
         
         return total_volume_cm3 * density
     
+    @register_shape("stud_bolt", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_stud_bolt_weight(
         self,
         diameter: str,
@@ -125,6 +162,7 @@ class WeightCalculator:
         
         return volume_cm3 * density
     
+    @register_shape("carriage_bolt", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_carriage_bolt_weight(
         self,
         diameter: str,
@@ -154,6 +192,7 @@ class WeightCalculator:
         
         return total_volume_cm3 * density
     
+    @register_shape("eye_bolt", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_eye_bolt_weight(
         self,
         diameter: str,
@@ -175,6 +214,7 @@ class WeightCalculator:
         
         return total_volume_cm3 * density
     
+    @register_shape("flange_bolt", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_flange_bolt_weight(
         self,
         diameter: str,
@@ -194,6 +234,7 @@ class WeightCalculator:
         
         return base_weight + flange_weight
     
+    @register_shape("anchor_bolt", needs_length=True, base_dimension_type="hex_bolt")
     def calculate_anchor_bolt_weight(
         self,
         diameter: str,
@@ -209,6 +250,7 @@ class WeightCalculator:
         
         return volume_cm3 * density
     
+    @register_shape("hex_nut", needs_length=False, base_dimension_type="hex_nut")
     def calculate_hex_nut_weight(
         self,
         diameter: str,
@@ -239,6 +281,7 @@ class WeightCalculator:
         
         return total_volume_cm3 * density
     
+    @register_shape("lock_nut", needs_length=False, base_dimension_type="hex_nut")
     def calculate_lock_nut_weight(
         self,
         diameter: str,
@@ -249,6 +292,7 @@ class WeightCalculator:
         # Add ~10% for nylon insert
         return base_weight * 1.1
     
+    @register_shape("flange_nut", needs_length=False, base_dimension_type="hex_nut")
     def calculate_flange_nut_weight(
         self,
         diameter: str,
@@ -267,6 +311,7 @@ class WeightCalculator:
         
         return base_weight + flange_weight
     
+    @register_shape("wing_nut", needs_length=False, base_dimension_type="hex_nut")
     def calculate_wing_nut_weight(
         self,
         diameter: str,
@@ -277,6 +322,7 @@ class WeightCalculator:
         # Wings add approximately 50% more material
         return base_weight * 1.5
     
+    @register_shape("castle_nut", needs_length=False, base_dimension_type="hex_nut")
     def calculate_castle_nut_weight(
         self,
         diameter: str,
@@ -287,6 +333,7 @@ class WeightCalculator:
         # Slots remove some material, but crown adds - net ~same
         return base_weight
     
+    @register_shape("thin_hex_nut", needs_length=False, base_dimension_type="hex_nut")
     def calculate_thin_hex_nut_weight(
         self,
         diameter: str,
@@ -296,6 +343,7 @@ class WeightCalculator:
         # About 60% height of regular nut
         return self.calculate_hex_nut_weight(diameter, density) * 0.6
     
+    @register_shape("plain_washer", needs_length=False, base_dimension_type="plain_washer")
     def calculate_plain_washer_weight(
         self,
         diameter: str,
@@ -319,6 +367,7 @@ class WeightCalculator:
         
         return volume_cm3 * density
     
+    @register_shape("spring_washer", needs_length=False, base_dimension_type="spring_washer")
     def calculate_spring_washer_weight(
         self,
         diameter: str,
@@ -351,6 +400,7 @@ class WeightCalculator:
         
         return volume_cm3 * density
     
+    @register_shape("heavy_duty_washer", needs_length=False, base_dimension_type="plain_washer")
     def calculate_heavy_duty_washer_weight(
         self,
         diameter: str,
@@ -360,6 +410,7 @@ class WeightCalculator:
         # Heavy duty washers are ~1.5x thicker
         return self.calculate_plain_washer_weight(diameter, density) * 1.5
     
+    @register_shape("machine_screw", needs_length=True, base_dimension_type="socket_head_cap_screw")
     def calculate_machine_screw_weight(
         self,
         diameter: str,
@@ -383,6 +434,7 @@ class WeightCalculator:
         
         return total_volume_cm3 * density
     
+    @register_shape("self_tapping_screw", needs_length=True, base_dimension_type="socket_head_cap_screw")
     def calculate_self_tapping_screw_weight(
         self,
         diameter: str,
@@ -393,6 +445,7 @@ class WeightCalculator:
         # Similar to machine screw
         return self.calculate_machine_screw_weight(diameter, length, density)
     
+    @register_shape("wood_screw", needs_length=True, base_dimension_type="socket_head_cap_screw")
     def calculate_wood_screw_weight(
         self,
         diameter: str,
@@ -414,6 +467,7 @@ class WeightCalculator:
         
         return total_volume_cm3 * density
     
+    @register_shape("set_screw", needs_length=True, base_dimension_type="socket_head_cap_screw")
     def calculate_set_screw_weight(
         self,
         diameter: str,
@@ -429,18 +483,17 @@ class WeightCalculator:
         
         return volume_cm3 * density
     
-    def calculate_weight(
+    def _resolve_unit_weight(
         self,
         fastener_type_id: str,
         material_id: str,
         diameter: str,
-        length: Optional[float] = None,
-        quantity: int = 1
-    ) -> Dict:
+        length: Optional[float]
+    ) -> Tuple[str, str, Optional[str], float]:
         """
-        Calculate weight for any fastener type
+        Resolve material and fastener type and calculate the unit weight
         
-        Returns dict with unit_weight, total_weight, pieces_per_50kg
+        Returns (fastener type name, material name, material grade, grams)
         """
         material = self.data_loader.get_material_by_id(material_id)
         if not material:
@@ -452,51 +505,76 @@ class WeightCalculator:
         if not fastener_type:
             raise ValueError(f"Unknown fastener type: {fastener_type_id}")
         
-        # Map fastener type to calculation method
-        calc_methods = {
-            "hex_bolt": self.calculate_hex_bolt_weight,
-            "hex_bolt_full_thread": self.calculate_hex_bolt_full_thread_weight,
-            "socket_head_cap_screw": self.calculate_socket_head_cap_screw_weight,
-            "stud_bolt": self.calculate_stud_bolt_weight,
-            "carriage_bolt": self.calculate_carriage_bolt_weight,
-            "eye_bolt": self.calculate_eye_bolt_weight,
-            "flange_bolt": self.calculate_flange_bolt_weight,
-            "anchor_bolt": self.calculate_anchor_bolt_weight,
-            "hex_nut": lambda d, dens: self.calculate_hex_nut_weight(d, dens),
-            "lock_nut": lambda d, dens: self.calculate_lock_nut_weight(d, dens),
-            "flange_nut": lambda d, dens: self.calculate_flange_nut_weight(d, dens),
-            "wing_nut": lambda d, dens: self.calculate_wing_nut_weight(d, dens),
-            "castle_nut": lambda d, dens: self.calculate_castle_nut_weight(d, dens),
-            "thin_hex_nut": lambda d, dens: self.calculate_thin_hex_nut_weight(d, dens),
-            "plain_washer": lambda d, dens: self.calculate_plain_washer_weight(d, dens),
-            "spring_washer": lambda d, dens: self.calculate_spring_washer_weight(d, dens),
-            "heavy_duty_washer": lambda d, dens: self.calculate_heavy_duty_washer_weight(d, dens),
-            "machine_screw": self.calculate_machine_screw_weight,
-            "self_tapping_screw": self.calculate_self_tapping_screw_weight,
-            "wood_screw": self.calculate_wood_screw_weight,
-            "set_screw": self.calculate_set_screw_weight,
-        }
-        
-        calc_method = calc_methods.get(fastener_type_id)
-        if not calc_method:
+        handler = SHAPE_REGISTRY.get(fastener_type_id)
+        if not handler:
             raise ValueError(f"No calculation method for: {fastener_type_id}")
         
-        # Calculate unit weight
-        if fastener_type.get("has_length", True):
-            if length is None:
-                raise ValueError(f"Length required for {fastener_type_id}")
-            unit_weight_grams = calc_method(diameter, length, density)
-        else:
-            unit_weight_grams = calc_method(diameter, density)
+        # Calculate unit weight, from the precomputed table for standard sizes
+        table = get_unit_weight_table()
+        unit_weight_grams = None
+        if table and table.data_version == self.data_loader.version:
+            unit_weight_grams = table.lookup(fastener_type_id, material_id, diameter, length)
+        if unit_weight_grams is None:
+            if handler.needs_length:
+                if length is None:
+                    raise ValueError(f"Length required for {fastener_type_id}")
+                unit_weight_grams = handler.calculate(self, diameter, length, density)
+            else:
+                unit_weight_grams = handler.calculate(self, diameter, density)
+        
+        return fastener_type["name"], material["name"], material.get("grade"), unit_weight_grams
+    
+    def unit_weight(
+        self,
+        fastener_type_id: str,
+        material_id: str,
+        diameter: str,
+        length: Optional[float] = None
+    ) -> Tuple[str, str, Optional[str], float]:
+        """
+        Unrounded unit weight, memoized per (type, material, diameter, length)
+        for the current data version
+        
+        Returns (fastener type name, material name, material grade, grams)
+        """
+        version = self.data_loader.version
+        key = (fastener_type_id, material_id, diameter, length)
+        entry = self.unit_weight_cache.get(key, version)
+        if entry is None:
+            entry = self._resolve_unit_weight(fastener_type_id, material_id, diameter, length)
+            self.unit_weight_cache.put(key, entry, version)
+        return entry
+    
+    def calculate_weight(
+        self,
+        fastener_type_id: str,
+        material_id: str,
+        diameter: str,
+        length: Optional[float] = None,
+        quantity: int = 1
+    ) -> Dict:
+        """
+        Calculate weight for any fastener type
+        
+        Unit weights are memoized per (type, material, diameter, length)
+        for the current data version; quantity is applied afterwards.
+        
+        Returns dict with unit_weight, total_weight, pieces_per_50kg
+        """
+        fastener_type_name, material_name, material_grade, unit_weight_grams = self.unit_weight(
+            fastener_type_id, material_id, diameter, length
+        )
+        
+        calculations_total.inc(fastener_type_id, material_id)
         
         # Calculate totals
         total_weight_kg = (unit_weight_grams * quantity) / 1000
         pieces_per_50kg = int(50000 / unit_weight_grams) if unit_weight_grams > 0 else 0
         
         return {
-            "fastener_type": fastener_type["name"],
-            "material": material["name"],
-            "material_grade": material.get("grade"),
+            "fastener_type": fastener_type_name,
+            "material": material_name,
+            "material_grade": material_grade,
             "diameter": diameter,
             "length": length,
             "unit_weight_grams": round(unit_weight_grams, 3),
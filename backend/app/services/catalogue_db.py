@@ -0,0 +1,242 @@
+"""
+SQLite catalogue store
+
+An alternative to the JSON data files for catalogues too large to hold in
+memory. Dimension rows (one per fastener type × diameter, and in future
+per length, property class and customer variant) stay on disk and are
+answered by indexed queries; the small reference tables (fastener types,
+materials, HSN codes, standards, kits) are read into the usual snapshot.
+
+The database is written by `python -m app.import_catalogue` and opened
+read-only. Each snapshot holds its own connection, so a request pinned to
+a snapshot keeps reading the file it started with after the importer
+swaps in a new one.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_loader import DATA_FILES, DataLoader, DataSnapshot
+from .metrics import data_loader_loads_total
+
+# Bump when the schema changes
+CATALOGUE_DB_FORMAT = 1
+
+# (data file, list key) -> (table, columns indexed for lookups)
+RECORD_TABLES = {
+    ("fastener_types.json", "fastener_types"): ("fastener_types", ("id", "category")),
+    ("materials.json", "materials"): ("materials", ("id",)),
+    ("hsn_codes.json", "hsn_codes"): ("hsn_codes", ("code", "material_type")),
+    ("standards.json", "standards"): ("standards", ("code", "type")),
+    ("kits.json", "kits"): ("kits", ("id",)),
+}
+
+DIMENSIONS_KEY = ("dimensions.json", "dimensions")
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+-- Top-level values of the data files that are not record lists
+CREATE TABLE documents (
+    file TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (file, key)
+) WITHOUT ROWID;
+CREATE TABLE dimensions (
+    fastener_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    diameter TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (fastener_type, position)
+) WITHOUT ROWID;
+CREATE INDEX ix_dimensions_type_diameter ON dimensions (fastener_type, diameter);
+"""
+
+
+def _record_table_ddl(table: str, columns: Tuple[str, ...]) -> str:
+    column_defs = "".join(f"{column} TEXT, " for column in columns)
+    ddl = f"CREATE TABLE {table} (position INTEGER PRIMARY KEY, {column_defs}data TEXT NOT NULL);\n"
+    for column in columns:
+        ddl += f"CREATE INDEX ix_{table}_{column} ON {table} ({column});\n"
+    return ddl
+
+
+def import_catalogue(db_path: Path, data_dir: Optional[Path] = None) -> Dict:
+    """
+    Convert the JSON data files into a catalogue database at db_path
+
+    The database is built next to the target and renamed over it, so
+    servers never see a half-written file.
+    """
+    loader = DataLoader()
+    if data_dir is not None:
+        loader.data_dir = data_dir
+    snapshot = loader._parse_snapshot()
+
+    tmp_path = db_path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(tmp_path)
+    counts: Dict[str, int] = {}
+    try:
+        connection.executescript(_SCHEMA + "".join(
+            _record_table_ddl(table, columns) for table, columns in RECORD_TABLES.values()
+        ))
+        for filename, data in snapshot.files.items():
+            for key, value in data.items():
+                if (filename, key) == DIMENSIONS_KEY:
+                    rows = [
+                        (fastener_type, position, dim["diameter"], json.dumps(dim))
+                        for fastener_type, dims in value.items()
+                        for position, dim in enumerate(dims)
+                    ]
+                    connection.executemany("INSERT INTO dimensions VALUES (?, ?, ?, ?)", rows)
+                    counts["dimensions"] = len(rows)
+                elif (filename, key) in RECORD_TABLES:
+                    table, columns = RECORD_TABLES[(filename, key)]
+                    placeholders = ", ".join("?" * (len(columns) + 2))
+                    rows = [
+                        (position, *(record.get(column) for column in columns), json.dumps(record))
+                        for position, record in enumerate(value)
+                    ]
+                    connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+                    counts[table] = len(rows)
+                else:
+                    connection.execute("INSERT INTO documents VALUES (?, ?, ?)", (filename, key, json.dumps(value)))
+        meta = {
+            "format": str(CATALOGUE_DB_FORMAT),
+            # Source file fingerprints: the snapshot version matches the JSON backend's
+            "fingerprints": json.dumps(snapshot.fingerprints),
+            "imported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        connection.commit()
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+    tmp_path.replace(db_path)
+    return {"data_version": snapshot.version, "rows": counts}
+
+
+class CatalogueStore:
+    """Read-only queries against one catalogue database file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        stat = path.stat()
+        self.file_stat = (stat.st_mtime_ns, stat.st_size)
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def meta(self) -> Dict[str, str]:
+        return dict(self._query("SELECT key, value FROM meta"))
+
+    def load_files(self) -> Dict[str, Dict[str, Any]]:
+        """Data files as the JSON backend parses them, without the dimension rows"""
+        files: Dict[str, Dict[str, Any]] = {}
+        for filename, key, data in self._query("SELECT file, key, data FROM documents"):
+            files.setdefault(filename, {})[key] = json.loads(data)
+        for (filename, key), (table, _) in RECORD_TABLES.items():
+            rows = self._query(f"SELECT data FROM {table} ORDER BY position")
+            files.setdefault(filename, {})[key] = [json.loads(data) for data, in rows]
+        files.setdefault(DIMENSIONS_KEY[0], {})[DIMENSIONS_KEY[1]] = {}
+        return files
+
+    def dimensions(self, fastener_type: str, offset: int = 0, limit: int = -1) -> List[Dict]:
+        # Positions are numbered 0..n-1 per type on import, so a page is a
+        # primary key range rather than an OFFSET scan
+        rows = self._query(
+            "SELECT data FROM dimensions WHERE fastener_type = ? AND position >= ? ORDER BY position LIMIT ?",
+            (fastener_type, offset, limit)
+        )
+        return [json.loads(data) for data, in rows]
+
+    def count_dimensions(self, fastener_type: str) -> int:
+        return self._query("SELECT COUNT(*) FROM dimensions WHERE fastener_type = ?", (fastener_type,))[0][0]
+
+    def dimension(self, fastener_type: str, diameter: str) -> Optional[Dict]:
+        rows = self._query(
+            "SELECT data FROM dimensions WHERE fastener_type = ? AND diameter = ? ORDER BY position LIMIT 1",
+            (fastener_type, diameter)
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def diameters(self, fastener_type: str) -> List[str]:
+        rows = self._query(
+            "SELECT diameter FROM dimensions WHERE fastener_type = ? ORDER BY position", (fastener_type,)
+        )
+        return [diameter for diameter, in rows]
+
+    def fastener_types_with_dimensions(self) -> List[str]:
+        return [t for t, in self._query("SELECT DISTINCT fastener_type FROM dimensions ORDER BY fastener_type")]
+
+
+class SQLiteDataLoader(DataLoader):
+    """DataLoader serving the catalogue from a SQLite database"""
+
+    def __init__(self, db_path: Path):
+        super().__init__()
+        self.db_path = db_path
+
+    def _build_snapshot(self) -> DataSnapshot:
+        """Open the database and read its reference tables"""
+        data_loader_loads_total.inc()
+        store = CatalogueStore(self.db_path)
+        meta = store.meta()
+        if meta.get("format") != str(CATALOGUE_DB_FORMAT):
+            raise ValueError(f"{self.db_path} has catalogue format {meta.get('format')}, expected {CATALOGUE_DB_FORMAT}")
+
+        files = store.load_files()
+        indexes: Dict[str, Any] = {"catalogue_store": store}
+        for filename in DATA_FILES:
+            if filename in files and filename != DIMENSIONS_KEY[0]:
+                indexes.update(self._build_indexes(filename, files[filename]))
+        fingerprints = {name: tuple(value) for name, value in json.loads(meta["fingerprints"]).items()}
+        return DataSnapshot(files, indexes, fingerprints)
+
+    def changed_files(self, snapshot: Optional[DataSnapshot] = None) -> List[str]:
+        """The database file, if it was replaced with different data"""
+        snapshot = snapshot or self._latest()
+        store: CatalogueStore = snapshot.indexes["catalogue_store"]
+        if not self.db_path.exists():
+            return []
+        stat = self.db_path.stat()
+        if (stat.st_mtime_ns, stat.st_size) == store.file_stat:
+            return []
+        fingerprints = json.loads(CatalogueStore(self.db_path).meta().get("fingerprints", "{}"))
+        if {name: tuple(value) for name, value in fingerprints.items()} == snapshot.fingerprints:
+            # Rewritten with the same data; remember the new stat to skip this next time
+            store.file_stat = (stat.st_mtime_ns, stat.st_size)
+            return []
+        return [self.db_path.name]
+
+    def _store(self) -> CatalogueStore:
+        return self._get_index(self.db_path.name, "catalogue_store")
+
+    def get_dimensions(self, fastener_type: str) -> List[Dict]:
+        """Get dimensions for a fastener type"""
+        return self._store().dimensions(fastener_type)
+
+    def get_dimensions_page(self, fastener_type: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        """Get one page of a fastener type's dimensions and the total row count"""
+        store = self._store()
+        return store.dimensions(fastener_type, offset, limit), store.count_dimensions(fastener_type)
+
+    def get_all_dimensions(self) -> Dict[str, List[Dict]]:
+        """Get dimension tables for every fastener type (reads every row)"""
+        store = self._store()
+        return {t: store.dimensions(t) for t in store.fastener_types_with_dimensions()}
+
+    def get_dimension_for_diameter(self, fastener_type: str, diameter: str) -> Optional[Dict]:
+        """Get dimension data for a specific diameter"""
+        return self._store().dimension(fastener_type, diameter)
+
+    def get_all_diameters(self, fastener_type: str = "hex_bolt") -> List[str]:
+        """Get list of all available diameters for a fastener type"""
+        return self._store().diameters(fastener_type)
@@ -1,11 +1,79 @@
 """
 Data loader service for loading JSON data files
+
+All data files are loaded together into an immutable DataSnapshot. A
+reload builds the next snapshot off to the side and swaps it in with a
+single reference assignment, so readers never wait on a lock and a
+request pinned to a snapshot sees one consistent version throughout.
 """
+import hashlib
 import json
+import logging
 import os
+import pickle
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from functools import lru_cache
+from .. import config
+from . import hsn_index, standards_index
+from .hsn_index import HSNSearchIndex
+from .standards_index import build_equivalence_closure, normalize_standard_code
+from .metrics import data_loader_loads_total, data_loader_reads_total
+
+logger = logging.getLogger(__name__)
+
+DATA_FILES = (
+    "fastener_types.json",
+    "materials.json",
+    "dimensions.json",
+    "hsn_codes.json",
+    "standards.json",
+    "kits.json",
+)
+
+# Prebuilt snapshot written by `python -m app.build_snapshot`, used instead
+# of parsing the JSON files while it matches them
+COMPILED_SNAPSHOT_FILE = "snapshot.pickle"
+
+# Bump when DataSnapshot or an index class changes shape
+COMPILED_SNAPSHOT_FORMAT = 1
+
+
+@lru_cache(maxsize=1)
+def _index_code_fingerprint() -> str:
+    """
+    Hash of the modules whose objects are pickled into a compiled snapshot
+
+    A snapshot written by other code is ignored even if nobody remembered
+    to bump COMPILED_SNAPSHOT_FORMAT.
+    """
+    digest = hashlib.sha256()
+    for module in (sys.modules[__name__], hsn_index, standards_index):
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class DataSnapshot:
+    """One consistent, read-only version of every data file and its indexes"""
+    
+    def __init__(
+        self,
+        files: Dict[str, Any],
+        indexes: Dict[str, Dict],
+        fingerprints: Dict[str, Tuple[int, int, str]]
+    ):
+        self.files = files
+        self.indexes = indexes
+        # filename -> (mtime_ns, size, sha256)
+        self.fingerprints = fingerprints
+        combined = hashlib.sha256()
+        for filename in sorted(fingerprints):
+            combined.update(f"{filename}:{fingerprints[filename][2]};".encode())
+        self.version = combined.hexdigest()[:12]
 
 
 class DataLoader:
@@ -13,21 +81,255 @@ class DataLoader:
     
     def __init__(self):
         self.data_dir = Path(__file__).parent.parent / "data"
-        self._cache: Dict[str, Any] = {}
+        self._snapshot: Optional[DataSnapshot] = None
+        self._pinned: ContextVar[Optional[DataSnapshot]] = ContextVar("pinned_snapshot", default=None)
+        # Serializes loads and reloads; readers of an existing snapshot never take it
+        self._load_lock = threading.Lock()
+        self._reload_listeners: List[Callable[[DataSnapshot], None]] = []
     
-    def _load_json(self, filename: str) -> Any:
-        """Load JSON file from data directory"""
-        if filename in self._cache:
-            return self._cache[filename]
+    def snapshot(self) -> DataSnapshot:
+        """Get the snapshot pinned to this request, or the latest one"""
+        pinned = self._pinned.get()
+        if pinned is not None:
+            return pinned
+        return self._latest()
+    
+    def _latest(self) -> DataSnapshot:
+        """Get the most recently loaded snapshot, loading it on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build_snapshot()
+                snapshot = self._snapshot
+        return snapshot
+    
+    @property
+    def version(self) -> str:
+        """Version of the data currently served (hash of all data files)"""
+        return self.snapshot().version
+    
+    @contextmanager
+    def pin(self, snapshot: Optional[DataSnapshot] = None) -> Iterator[DataSnapshot]:
+        """Serve every lookup in this context from the same (given or current) snapshot"""
+        token = self._pinned.set(snapshot or self.snapshot())
+        try:
+            yield self._pinned.get()
+        finally:
+            self._pinned.reset(token)
+    
+    def _build_snapshot(self) -> DataSnapshot:
+        """Load the compiled snapshot if it is current, else parse the data files"""
+        data_loader_loads_total.inc()
+        snapshot = self._load_compiled_snapshot()
+        if snapshot is not None:
+            return snapshot
+        return self._parse_snapshot()
+    
+    def _load_compiled_snapshot(self) -> Optional[DataSnapshot]:
+        """
+        Read the compiled snapshot, or None if it is missing, was written
+        by another format, Python version or index code, or any data file
+        changed since
+        """
+        path = self.data_dir / COMPILED_SNAPSHOT_FILE
+        if not path.exists():
+            return None
+        try:
+            with path.open("rb") as f:
+                payload = pickle.load(f)
+        except Exception:
+            logger.warning("Ignoring unreadable compiled snapshot %s", path, exc_info=True)
+            return None
+        if (
+            payload.get("format") != COMPILED_SNAPSHOT_FORMAT
+            or payload.get("python") != sys.version_info[:2]
+            or payload.get("code") != _index_code_fingerprint()
+        ):
+            logger.info("Ignoring compiled snapshot built by another format, Python version or index code")
+            return None
+        snapshot: DataSnapshot = payload["snapshot"]
+        changed = self.changed_files(snapshot)
+        if changed:
+            logger.info("Ignoring compiled snapshot, data files changed: %s", ", ".join(changed))
+            return None
+        # Same content; take the current mtimes so the watcher's cheap check matches
+        for filename, (_, _, digest) in list(snapshot.fingerprints.items()):
+            stat = (self.data_dir / filename).stat()
+            snapshot.fingerprints[filename] = (stat.st_mtime_ns, stat.st_size, digest)
+        return snapshot
+    
+    def write_compiled_snapshot(self, path: Optional[Path] = None) -> DataSnapshot:
+        """Parse the data files and write them with their indexes as a compiled snapshot"""
+        path = path or self.data_dir / COMPILED_SNAPSHOT_FILE
+        snapshot = self._parse_snapshot()
+        payload = {
+            "format": COMPILED_SNAPSHOT_FORMAT,
+            "python": sys.version_info[:2],
+            "code": _index_code_fingerprint(),
+            "snapshot": snapshot,
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return snapshot
+    
+    def _parse_snapshot(self) -> DataSnapshot:
+        """Read, parse and index every data file"""
+        files: Dict[str, Any] = {}
+        indexes: Dict[str, Dict] = {}
+        fingerprints: Dict[str, Tuple[int, int, str]] = {}
+        for filename in DATA_FILES:
+            filepath = self.data_dir / filename
+            if not filepath.exists():
+                continue
+            # stat before reading: a write in between shows up as a change next check
+            stat = filepath.stat()
+            content = filepath.read_bytes()
+            fingerprints[filename] = (stat.st_mtime_ns, stat.st_size, hashlib.sha256(content).hexdigest())
+            data = json.loads(content.decode('utf-8'))
+            indexes.update(self._build_indexes(filename, data))
+            files[filename] = data
+        return DataSnapshot(files, indexes, fingerprints)
+    
+    def changed_files(self, snapshot: Optional[DataSnapshot] = None) -> List[str]:
+        """
+        Data files that differ from the given (or current) snapshot
+        
+        mtime and size are checked first; content is only hashed when
+        they moved, so touching a file without editing it is not a change.
+        """
+        snapshot = snapshot or self._latest()
+        changed = []
+        for filename in DATA_FILES:
+            filepath = self.data_dir / filename
+            known = snapshot.fingerprints.get(filename)
+            if not filepath.exists():
+                if known:
+                    changed.append(filename)
+                continue
+            stat = filepath.stat()
+            if known and (stat.st_mtime_ns, stat.st_size) == known[:2]:
+                continue
+            digest = hashlib.sha256(filepath.read_bytes()).hexdigest()
+            if not known or digest != known[2]:
+                changed.append(filename)
+        return changed
+    
+    def reload(self, force: bool = False) -> Dict:
+        """
+        Reload data files if they changed on disk
+        
+        The new snapshot is fully built before it replaces the current
+        one. A file that fails to parse leaves the current data in place.
+        """
+        self._latest()
+        with self._load_lock:
+            previous = self._snapshot
+            changed = self.changed_files()
+            if not changed and not force:
+                return {
+                    "reloaded": False,
+                    "data_version": previous.version,
+                    "changed_files": []
+                }
+            snapshot = self._build_snapshot()
+            self._snapshot = snapshot
         
-        filepath = self.data_dir / filename
-        if not filepath.exists():
+        logger.info("Data reloaded: %s -> %s (%s)", previous.version, snapshot.version, ", ".join(changed))
+        for listener in self._reload_listeners:
+            try:
+                listener(snapshot)
+            except Exception:
+                logger.exception("Reload listener failed")
+        return {
+            "reloaded": True,
+            "data_version": snapshot.version,
+            "previous_version": previous.version,
+            "changed_files": changed
+        }
+    
+    def add_reload_listener(self, listener: Callable[[DataSnapshot], None]):
+        """Call listener(new_snapshot) after every successful reload"""
+        self._reload_listeners.append(listener)
+    
+    def start_watcher(self, interval: float) -> threading.Event:
+        """
+        Poll the data files every `interval` seconds in a daemon thread and
+        reload when they change. Set the returned event to stop it.
+        """
+        stop = threading.Event()
+        
+        def watch():
+            while not stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("Data reload failed, keeping version %s", self._latest().version)
+        
+        threading.Thread(target=watch, name="data-watcher", daemon=True).start()
+        return stop
+    
+    def _load_json(self, filename: str) -> Any:
+        """Get parsed JSON file from the current snapshot"""
+        data_loader_reads_total.inc()
+        files = self.snapshot().files
+        if filename not in files:
             raise FileNotFoundError(f"Data file not found: {filename}")
+        return files[filename]
+    
+    @staticmethod
+    def _build_indexes(filename: str, data: Any) -> Dict[str, Dict]:
+        """
+        Build lookup indexes for a freshly loaded data file
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self._cache[filename] = data
-            return data
+        The first record wins on duplicate keys, matching the order a
+        linear scan would find them in.
+        """
+        indexes: Dict[str, Dict] = {}
+        if filename == "fastener_types.json":
+            by_id: Dict[str, Dict] = {}
+            for ft in data.get("fastener_types", []):
+                by_id.setdefault(ft["id"], ft)
+            indexes["fastener_types_by_id"] = by_id
+        elif filename == "materials.json":
+            by_id = {}
+            for mat in data.get("materials", []):
+                by_id.setdefault(mat["id"], mat)
+            indexes["materials_by_id"] = by_id
+        elif filename == "dimensions.json":
+            by_key: Dict[Tuple[str, str], Dict] = {}
+            for fastener_type, dims in data.get("dimensions", {}).items():
+                for dim in dims:
+                    by_key.setdefault((fastener_type, dim["diameter"]), dim)
+            indexes["dimensions_by_type_diameter"] = by_key
+        elif filename == "hsn_codes.json":
+            by_code: Dict[str, Dict] = {}
+            for hsn in data.get("hsn_codes", []):
+                by_code.setdefault(hsn["code"], hsn)
+            indexes["hsn_codes_by_code"] = by_code
+            indexes["hsn_search"] = HSNSearchIndex(data.get("hsn_codes", []))
+        elif filename == "standards.json":
+            by_code = {}
+            for standard in data.get("standards", []):
+                by_code.setdefault(normalize_standard_code(standard["code"]), standard)
+            indexes["standards_by_code"] = by_code
+            indexes["standard_equivalents"] = build_equivalence_closure(data.get("equivalence_groups", []))
+        elif filename == "kits.json":
+            by_id = {}
+            for kit in data.get("kits", []):
+                by_id.setdefault(kit["id"], kit)
+            indexes["kits_by_id"] = by_id
+        return indexes
+    
+    def _get_index(self, filename: str, name: str) -> Dict:
+        """Get a lookup index from the current snapshot"""
+        data_loader_reads_total.inc()
+        indexes = self.snapshot().indexes
+        if name not in indexes:
+            raise FileNotFoundError(f"Data file not found: {filename}")
+        return indexes[name]
     
     def get_fastener_types(self) -> List[Dict]:
         """Get all fastener types"""
@@ -36,11 +338,7 @@ class DataLoader:
     
     def get_fastener_type_by_id(self, type_id: str) -> Optional[Dict]:
         """Get fastener type by ID"""
-        types = self.get_fastener_types()
-        for ft in types:
-            if ft["id"] == type_id:
-                return ft
-        return None
+        return self._get_index("fastener_types.json", "fastener_types_by_id").get(type_id)
     
     def get_materials(self) -> List[Dict]:
         """Get all materials"""
@@ -49,11 +347,7 @@ class DataLoader:
     
     def get_material_by_id(self, material_id: str) -> Optional[Dict]:
         """Get material by ID"""
-        materials = self.get_materials()
-        for mat in materials:
-            if mat["id"] == material_id:
-                return mat
-        return None
+        return self._get_index("materials.json", "materials_by_id").get(material_id)
     
     def get_dimensions(self, fastener_type: str) -> List[Dict]:
         """Get dimensions for a fastener type"""
@@ -61,13 +355,20 @@ class DataLoader:
         dimensions = data.get("dimensions", {})
         return dimensions.get(fastener_type, [])
     
+    def get_dimensions_page(self, fastener_type: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        """Get one page of a fastener type's dimensions and the total row count"""
+        dimensions = self.get_dimensions(fastener_type)
+        return dimensions[offset:offset + limit], len(dimensions)
+    
+    def get_all_dimensions(self) -> Dict[str, List[Dict]]:
+        """Get dimension tables for every fastener type"""
+        data = self._load_json("dimensions.json")
+        return data.get("dimensions", {})
+    
     def get_dimension_for_diameter(self, fastener_type: str, diameter: str) -> Optional[Dict]:
         """Get dimension data for a specific diameter"""
-        dimensions = self.get_dimensions(fastener_type)
-        for dim in dimensions:
-            if dim["diameter"] == diameter:
-                return dim
-        return None
+        index = self._get_index("dimensions.json", "dimensions_by_type_diameter")
+        return index.get((fastener_type, diameter))
     
     def get_standards(self, fastener_type: str = None) -> Dict:
         """Get standards information"""
@@ -77,21 +378,53 @@ class DataLoader:
             return standards.get(fastener_type, {})
         return standards
     
+    def get_standard_info(self, code: str) -> Optional[Dict]:
+        """Get metadata for a standard code such as "DIN 931" (case and spacing are ignored)"""
+        index = self._get_index("standards.json", "standards_by_code")
+        return index.get(normalize_standard_code(code))
+    
+    def get_standard_equivalents(self, code: str) -> List[str]:
+        """Get every standard equivalent to a code, directly or transitively"""
+        index = self._get_index("standards.json", "standard_equivalents")
+        return list(index.get(normalize_standard_code(code), ()))
+    
+    def get_kits(self) -> List[Dict]:
+        """Get named fastener kits (bolt + nut + washers and similar sets)"""
+        data = self._load_json("kits.json")
+        return data.get("kits", [])
+    
+    def get_kit_by_id(self, kit_id: str) -> Optional[Dict]:
+        """Get a named kit by ID"""
+        return self._get_index("kits.json", "kits_by_id").get(kit_id)
+    
+    def get_preferred_lengths(self) -> List[float]:
+        """Get preferred nominal lengths in mm (ISO 888)"""
+        data = self._load_json("dimensions.json")
+        return data.get("preferred_lengths", [])
+    
     def get_hsn_codes(self) -> List[Dict]:
         """Get all HSN codes"""
         data = self._load_json("hsn_codes.json")
         return data.get("hsn_codes", [])
     
-    def search_hsn_codes(self, query: str) -> List[Dict]:
-        """Search HSN codes by code or description"""
+    def get_hsn_codes_page(self, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        """Get one page of HSN codes and the total count"""
         hsn_codes = self.get_hsn_codes()
-        query_lower = query.lower()
-        results = []
-        for hsn in hsn_codes:
-            if (query_lower in hsn["code"].lower() or 
-                query_lower in hsn["description"].lower()):
-                results.append(hsn)
-        return results
+        return hsn_codes[offset:offset + limit], len(hsn_codes)
+    
+    def get_hsn_code_by_code(self, code: str) -> Optional[Dict]:
+        """Get HSN code details by exact code"""
+        return self._get_index("hsn_codes.json", "hsn_codes_by_code").get(code)
+    
+    def search_hsn_codes(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Search HSN codes by code or description
+        
+        Results are ranked: exact code, code prefix, description tokens,
+        then typo-tolerant matches.
+        """
+        index = self._get_index("hsn_codes.json", "hsn_search")
+        return index.search(query, limit=limit)
     
     def get_gst_info(self) -> Dict:
         """Get GST rate information"""
@@ -104,8 +437,16 @@ class DataLoader:
         return [dim["diameter"] for dim in dimensions]
 
 
+def _create_data_loader() -> DataLoader:
+    """JSON data files by default, or the SQLite catalogue when CATALOGUE_DB is set"""
+    if config.CATALOGUE_DB:
+        from .catalogue_db import SQLiteDataLoader
+        return SQLiteDataLoader(Path(config.CATALOGUE_DB))
+    return DataLoader()
+
+
 # Singleton instance
-data_loader = DataLoader()
+data_loader = _create_data_loader()
 
 
 @lru_cache(maxsize=1)
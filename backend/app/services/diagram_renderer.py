@@ -0,0 +1,484 @@
+"""
+Server-side SVG diagrams of fastener geometry
+
+Each fastener type is drawn to scale from its dimension table, using the
+same proportions the weight calculator models. Rendered SVGs are cached
+per (type, diameter) for the current data version in memory, and
+optionally on disk under a hash of everything that went into the
+drawing, so repeat requests and restarts skip rendering entirely.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from .. import config
+from .calculator import get_base_dimension_type, get_weight_calculator
+from .data_loader import DataSnapshot, get_data_loader
+from .prepared_responses import PreparedResponse
+
+logger = logging.getLogger(__name__)
+
+# Bump when drawings change so disk cache entries from older renders are not reused
+RENDERER_VERSION = "1"
+
+# Canvas size and the area the part is scaled into
+WIDTH = 400
+HEIGHT = 300
+MARGIN = 50
+
+STYLE = (
+    ".part{fill:#fff0e8;stroke:#e8551f;stroke-width:2;stroke-linejoin:round}"
+    ".face{fill:#ffd9c7;stroke:#e8551f;stroke-width:2;stroke-linejoin:round}"
+    ".hole{fill:#ffffff;stroke:#c2410c;stroke-width:1.5}"
+    ".edge{stroke:#e8551f;stroke-width:1;fill:none}"
+    ".hidden{stroke:#c2410c;stroke-width:1;stroke-dasharray:4 3;fill:none}"
+    ".thread{stroke:#9ca3af;stroke-width:1;fill:none}"
+    ".dim{stroke:#2563eb;stroke-width:1;fill:none}"
+    ".label{fill:#1e3a8a;font:12px sans-serif}"
+    ".title{fill:#374151;font:bold 13px sans-serif}"
+)
+
+# (nominal diameter in mm, dimension row, fastener type id) -> drawing
+DiagramRenderer = Callable[[float, Dict, str], "Drawing"]
+
+DIAGRAM_RENDERERS: Dict[str, DiagramRenderer] = {}
+
+
+def register_diagram(*fastener_type_ids: str):
+    """Register a drawing function for one or more fastener types"""
+    def decorator(func: DiagramRenderer) -> DiagramRenderer:
+        for fastener_type_id in fastener_type_ids:
+            DIAGRAM_RENDERERS[fastener_type_id] = func
+        return func
+    return decorator
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class Drawing:
+    """Collects SVG elements for a part drawn in mm, scaled to the canvas"""
+
+    def __init__(self, xmin: float, xmax: float, ymin: float, ymax: float):
+        width = max(xmax - xmin, 1e-6)
+        height = max(ymax - ymin, 1e-6)
+        self.scale = min((WIDTH - 2 * MARGIN) / width, (HEIGHT - 2 * MARGIN) / height)
+        self.ox = (WIDTH - width * self.scale) / 2 - xmin * self.scale
+        self.oy = (HEIGHT - height * self.scale) / 2 - ymin * self.scale
+        self.elements: List[str] = []
+
+    def x(self, mm: float) -> str:
+        return f"{self.ox + mm * self.scale:.1f}"
+
+    def y(self, mm: float) -> str:
+        return f"{self.oy + mm * self.scale:.1f}"
+
+    def rect(self, x0: float, y0: float, x1: float, y1: float, cls: str = "part") -> None:
+        self.polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], cls)
+
+    def polygon(self, points: List[Tuple[float, float]], cls: str = "part") -> None:
+        coords = " ".join(f"{self.x(px)},{self.y(py)}" for px, py in points)
+        self.elements.append(f'<polygon class="{cls}" points="{coords}"/>')
+
+    def line(self, x0: float, y0: float, x1: float, y1: float, cls: str = "edge") -> None:
+        self.elements.append(
+            f'<line class="{cls}" x1="{self.x(x0)}" y1="{self.y(y0)}" x2="{self.x(x1)}" y2="{self.y(y1)}"/>'
+        )
+
+    def ellipse(self, cx: float, cy: float, rx: float, ry: float, cls: str = "part") -> None:
+        self.elements.append(
+            f'<ellipse class="{cls}" cx="{self.x(cx)}" cy="{self.y(cy)}" '
+            f'rx="{rx * self.scale:.1f}" ry="{ry * self.scale:.1f}"/>'
+        )
+
+    def dome(self, x0: float, x1: float, base: float, height: float, cls: str = "part") -> None:
+        """Half-ellipse standing on y=base between x0 and x1"""
+        rx = (x1 - x0) / 2 * self.scale
+        ry = height * self.scale
+        self.elements.append(
+            f'<path class="{cls}" d="M{self.x(x0)},{self.y(base)} '
+            f'A{rx:.1f},{ry:.1f} 0 0 1 {self.x(x1)},{self.y(base)} Z"/>'
+        )
+
+    def threads(self, d: float, y0: float, y1: float) -> None:
+        """Minor-diameter lines over a threaded length"""
+        minor = d * 0.85 / 2
+        self.line(-minor, y0, -minor, y1, "thread")
+        self.line(minor, y0, minor, y1, "thread")
+
+    def dim_h(self, x0: float, x1: float, y: float, label: str, offset: float = -14) -> None:
+        """Horizontal dimension at y, label offset in pixels (negative is above)"""
+        py = self.oy + y * self.scale + offset
+        left, right = self.ox + x0 * self.scale, self.ox + x1 * self.scale
+        self.elements.append(
+            f'<path class="dim" d="M{left:.1f},{py:.1f}H{right:.1f}'
+            f'M{left:.1f},{py - 4:.1f}v8M{right:.1f},{py - 4:.1f}v8"/>'
+        )
+        ty = py - 5 if offset < 0 else py + 15
+        self.elements.append(
+            f'<text class="label" x="{(left + right) / 2:.1f}" y="{ty:.1f}" text-anchor="middle">{escape(label)}</text>'
+        )
+
+    def dim_v(self, y0: float, y1: float, x: float, label: str, offset: float = 14) -> None:
+        """Vertical dimension at x, label offset in pixels to the right"""
+        px = self.ox + x * self.scale + offset
+        top, bottom = self.oy + y0 * self.scale, self.oy + y1 * self.scale
+        self.elements.append(
+            f'<path class="dim" d="M{px:.1f},{top:.1f}V{bottom:.1f}'
+            f'M{px - 4:.1f},{top:.1f}h8M{px - 4:.1f},{bottom:.1f}h8"/>'
+        )
+        self.elements.append(
+            f'<text class="label" x="{px + 6:.1f}" y="{(top + bottom) / 2 + 4:.1f}">{escape(label)}</text>'
+        )
+
+    def render(self, title: str) -> bytes:
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH} {HEIGHT}" '
+            f'width="{WIDTH}" height="{HEIGHT}" role="img" aria-label="{escape(title, {chr(34): "&quot;"})}">'
+            f"<style>{STYLE}</style>"
+            f'<text class="title" x="12" y="20">{escape(title)}</text>'
+            + "".join(self.elements)
+            + "</svg>"
+        ).encode("utf-8")
+
+
+def _shank(drawing: Drawing, d: float, top: float, length: float, thread_length: float) -> None:
+    drawing.rect(-d / 2, top, d / 2, top + length)
+    drawing.threads(d, top + length - min(thread_length, length), top + length)
+    drawing.dim_h(-d / 2, d / 2, top + length, f"d = {_fmt(d)} mm", offset=14)
+
+
+def _thread_length(d: float, dim: Dict) -> float:
+    return dim.get("thread_length") or d * 2 + 6
+
+
+@register_diagram("hex_bolt", "hex_bolt_full_thread", "flange_bolt")
+def _draw_hex_bolt(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    s = dim.get("head_across_flats", d * 1.5)
+    k = dim.get("head_height", d * 0.7)
+    flange = d * 0.15 if fastener_type_id == "flange_bolt" else 0
+    length = d * 4
+    width = max(s, d * 2.5 if flange else 0)
+    drawing = Drawing(-width / 2, width / 2, 0, k + flange + length)
+    drawing.rect(-s / 2, 0, s / 2, k, "face")
+    drawing.line(0, 0, 0, k)
+    if flange:
+        drawing.rect(-d * 1.25, k, d * 1.25, k + flange)
+    thread = length if fastener_type_id == "hex_bolt_full_thread" else _thread_length(d, dim)
+    _shank(drawing, d, k + flange, length, thread)
+    drawing.dim_h(-s / 2, s / 2, 0, f"s = {_fmt(s)} mm")
+    drawing.dim_v(0, k, width / 2, f"k = {_fmt(k)} mm")
+    return drawing
+
+
+@register_diagram("socket_head_cap_screw")
+def _draw_socket_head_cap_screw(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    dk = dim.get("head_diameter", d * 1.5)
+    k = dim.get("head_height", d)
+    length = d * 4
+    drawing = Drawing(-dk / 2, dk / 2, 0, k + length)
+    drawing.rect(-dk / 2, 0, dk / 2, k, "face")
+    socket = dk * 0.3
+    drawing.polygon([(-socket, 0), (-socket, k * 0.8), (socket, k * 0.8), (socket, 0)], "hidden")
+    _shank(drawing, d, k, length, _thread_length(d, dim))
+    drawing.dim_h(-dk / 2, dk / 2, 0, f"dk = {_fmt(dk)} mm")
+    drawing.dim_v(0, k, dk / 2, f"k = {_fmt(k)} mm")
+    return drawing
+
+
+@register_diagram("machine_screw", "self_tapping_screw")
+def _draw_pan_head_screw(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    dk, k = d * 1.8, d * 0.6
+    length = d * 4
+    drawing = Drawing(-dk / 2, dk / 2, -k, length)
+    drawing.dome(-dk / 2, dk / 2, 0, k, "face")
+    drawing.rect(-d * 0.1, -k * 0.9, d * 0.1, -k * 0.4, "hidden")
+    if fastener_type_id == "self_tapping_screw":
+        tip = d * 0.8
+        drawing.polygon([(-d / 2, 0), (d / 2, 0), (d / 2, length - tip), (0, length), (-d / 2, length - tip)])
+        drawing.threads(d, 0, length - tip)
+        drawing.dim_h(-d / 2, d / 2, length, f"d = {_fmt(d)} mm", offset=14)
+    else:
+        _shank(drawing, d, 0, length, length)
+    drawing.dim_h(-dk / 2, dk / 2, -k, f"dk = {_fmt(dk)} mm")
+    drawing.dim_v(-k, 0, dk / 2, f"k = {_fmt(k)} mm")
+    return drawing
+
+
+@register_diagram("wood_screw")
+def _draw_wood_screw(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    dk, k = d * 2.0, d * 0.5
+    length = d * 5
+    drawing = Drawing(-dk / 2, dk / 2, 0, k + length)
+    drawing.polygon([(-dk / 2, 0), (dk / 2, 0), (d / 2, k), (-d / 2, k)], "face")
+    drawing.polygon([(-d / 2, k), (d / 2, k), (0, k + length)])
+    drawing.line(-d * 0.35, k + length * 0.3, 0, k + length * 0.95, "thread")
+    drawing.line(d * 0.35, k + length * 0.3, 0, k + length * 0.95, "thread")
+    drawing.dim_h(-dk / 2, dk / 2, 0, f"dk = {_fmt(dk)} mm")
+    drawing.dim_h(-d / 2, d / 2, k, f"d = {_fmt(d)} mm", offset=14)
+    return drawing
+
+
+@register_diagram("set_screw")
+def _draw_set_screw(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    length = d * 2
+    drawing = Drawing(-d, d, 0, length)
+    drawing.polygon([
+        (-d / 2, 0), (d / 2, 0), (d / 2, length - d * 0.2),
+        (d * 0.3, length), (-d * 0.3, length), (-d / 2, length - d * 0.2)
+    ])
+    drawing.threads(d, 0, length - d * 0.2)
+    drawing.rect(-d * 0.25, 0, d * 0.25, d * 0.5, "hidden")
+    drawing.dim_h(-d / 2, d / 2, 0, f"d = {_fmt(d)} mm")
+    drawing.dim_v(0, length, d / 2, "l")
+    return drawing
+
+
+@register_diagram("stud_bolt", "anchor_bolt")
+def _draw_rod(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    length = d * 6
+    thread = min(_thread_length(d, dim), length / 3)
+    if fastener_type_id == "anchor_bolt":
+        hook = d * 2
+        drawing = Drawing(-d / 2, hook + d / 2, 0, length + d / 2)
+        drawing.rect(-d / 2, 0, d / 2, length)
+        drawing.rect(-d / 2, length - d, hook + d / 2, length)
+        drawing.threads(d, 0, thread)
+    else:
+        drawing = Drawing(-d, d, 0, length)
+        drawing.rect(-d / 2, 0, d / 2, length)
+        drawing.threads(d, 0, thread)
+        drawing.threads(d, length - thread, length)
+    drawing.dim_h(-d / 2, d / 2, 0, f"d = {_fmt(d)} mm")
+    return drawing
+
+
+@register_diagram("carriage_bolt")
+def _draw_carriage_bolt(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    head = d * 1.2
+    dome = d * 0.6
+    neck_side, neck_height = d * 1.1, d * 0.5
+    length = d * 4
+    drawing = Drawing(-head, head, -dome, neck_height + length)
+    drawing.dome(-head, head, 0, dome, "face")
+    drawing.rect(-neck_side / 2, 0, neck_side / 2, neck_height)
+    _shank(drawing, d, neck_height, length, _thread_length(d, dim))
+    drawing.dim_h(-head, head, -dome, f"dk = {_fmt(head * 2)} mm")
+    return drawing
+
+
+@register_diagram("eye_bolt")
+def _draw_eye_bolt(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    outer = d * 1.5
+    length = d * 4
+    drawing = Drawing(-outer, outer, -outer * 2, length)
+    drawing.ellipse(0, -outer, outer, outer, "face")
+    drawing.ellipse(0, -outer, outer - d, outer - d, "hole")
+    _shank(drawing, d, 0, length, _thread_length(d, dim))
+    drawing.dim_h(-outer, outer, -outer * 2, f"D = {_fmt(outer * 2)} mm")
+    return drawing
+
+
+def _hex_top_view(drawing: Drawing, cx: float, cy: float, s: float, bore: float) -> None:
+    r = s / math.sqrt(3)
+    drawing.polygon(
+        [(cx + r * math.cos(math.radians(30 + 60 * i)), cy + r * math.sin(math.radians(30 + 60 * i))) for i in range(6)],
+        "face"
+    )
+    drawing.ellipse(cx, cy, bore / 2, bore / 2, "hole")
+
+
+@register_diagram("hex_nut", "lock_nut", "flange_nut", "wing_nut", "castle_nut", "thin_hex_nut")
+def _draw_nut(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    s = dim.get("across_flats", d * 1.5)
+    m = dim.get("height", d * 0.8)
+    if fastener_type_id == "thin_hex_nut":
+        m *= 0.6
+    extra_width = {"flange_nut": d * 2.2, "wing_nut": s * 2.2}.get(fastener_type_id, s)
+    cap = m * 0.35 if fastener_type_id in ("lock_nut", "castle_nut") else 0
+    gap = s * 0.6
+    top_x = extra_width / 2 + gap + s / 2
+    drawing = Drawing(-extra_width / 2, top_x + s / 2, -max(cap, 0), max(m, s))
+
+    # Side view
+    if fastener_type_id == "wing_nut":
+        wing = extra_width / 2
+        drawing.polygon([(-s / 2, m), (-wing, -m * 0.2), (-wing * 0.8, -m * 0.5), (-s / 2, m * 0.3)], "face")
+        drawing.polygon([(s / 2, m), (wing, -m * 0.2), (wing * 0.8, -m * 0.5), (s / 2, m * 0.3)], "face")
+        drawing.rect(-s / 2, 0, s / 2, m)
+    else:
+        hex_top = 0
+        if fastener_type_id == "flange_nut":
+            flange = d * 0.15
+            drawing.rect(-d * 1.1, m - flange, d * 1.1, m)
+            drawing.rect(-s / 2, 0, s / 2, m - flange, "face")
+        else:
+            drawing.rect(-s / 2, hex_top, s / 2, m, "face")
+            drawing.line(0, hex_top, 0, m)
+        if fastener_type_id == "lock_nut":
+            drawing.dome(-s * 0.45, s * 0.45, 0, cap)
+        elif fastener_type_id == "castle_nut":
+            slot = d * 0.25
+            drawing.rect(-s * 0.45, -cap, s * 0.45, 0)
+            drawing.rect(-slot / 2, -cap, slot / 2, 0, "hole")
+    drawing.line(-d / 2, -cap, -d / 2, m, "hidden")
+    drawing.line(d / 2, -cap, d / 2, m, "hidden")
+    drawing.dim_v(0, m, extra_width / 2, f"m = {_fmt(m)} mm")
+
+    # Top view
+    _hex_top_view(drawing, top_x, m / 2, s, d)
+    drawing.dim_h(top_x - s / 2, top_x + s / 2, m / 2 + s / 2, f"s = {_fmt(s)} mm", offset=14)
+    return drawing
+
+
+@register_diagram("plain_washer", "heavy_duty_washer", "spring_washer")
+def _draw_washer(d: float, dim: Dict, fastener_type_id: str) -> Drawing:
+    if fastener_type_id == "spring_washer":
+        d1 = dim.get("inner_diameter", d * 1.02)
+        d2 = dim.get("outer_diameter", d * 1.8)
+        h = dim.get("thickness", d * 0.25)
+    else:
+        d1 = dim.get("inner_diameter", d * 1.05)
+        d2 = dim.get("outer_diameter", d * 2.0)
+        h = dim.get("thickness", d * 0.15)
+        if fastener_type_id == "heavy_duty_washer":
+            h *= 1.5
+    side_y = d2 / 2 + d2 * 0.35
+    drawing = Drawing(-d2 / 2, d2 / 2, -d2 / 2, side_y + h)
+
+    # Top view
+    drawing.ellipse(0, 0, d2 / 2, d2 / 2, "face")
+    drawing.ellipse(0, 0, d1 / 2, d1 / 2, "hole")
+    if fastener_type_id == "spring_washer":
+        drawing.line(d1 / 2, -d * 0.05, d2 / 2, d * 0.05, "hole")
+    drawing.dim_h(-d2 / 2, d2 / 2, -d2 / 2, f"d2 = {_fmt(d2)} mm")
+
+    # Side section
+    drawing.rect(-d2 / 2, side_y, -d1 / 2, side_y + h)
+    drawing.rect(d1 / 2, side_y, d2 / 2, side_y + h)
+    drawing.dim_h(-d1 / 2, d1 / 2, side_y + h, f"d1 = {_fmt(d1)} mm", offset=14)
+    drawing.dim_v(side_y, side_y + h, d2 / 2, f"h = {_fmt(h)} mm")
+    return drawing
+
+
+def render_diagram_svg(fastener_type: Dict, diameter: str, dim: Dict) -> bytes:
+    """Render the SVG for a fastener type and its dimension row"""
+    renderer = DIAGRAM_RENDERERS.get(fastener_type["id"])
+    if renderer is None:
+        raise ValueError(f"No diagram for fastener type: {fastener_type['id']}")
+    d = get_weight_calculator()._get_nominal_diameter(diameter)
+    drawing = renderer(d, dim, fastener_type["id"])
+    return drawing.render(f"{fastener_type['name']} {diameter}")
+
+
+def resolve_diagram_dimensions(fastener_type_id: str, diameter: str) -> Optional[Dict]:
+    """Dimension row for a diagram, falling back to the type's base dimension table"""
+    data_loader = get_data_loader()
+    dim = data_loader.get_dimension_for_diameter(fastener_type_id, diameter)
+    if not dim:
+        # Many fastener types share the same base dimensions
+        parent = get_base_dimension_type(fastener_type_id)
+        if parent != fastener_type_id:
+            dim = data_loader.get_dimension_for_diameter(parent, diameter)
+    return dim
+
+
+class DiagramCache:
+    """Rendered diagrams for the current data version, optionally backed by a directory"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memory: Dict[Tuple[str, str], PreparedResponse] = {}
+        self.renders = 0
+        self.disk_hits = 0
+
+    def _disk_path(self, fastener_type: Dict, diameter: str, dim: Dict) -> Path:
+        inputs = json.dumps(
+            [RENDERER_VERSION, fastener_type["id"], fastener_type["name"], diameter, dim],
+            sort_keys=True
+        )
+        return self.cache_dir / f"{hashlib.sha256(inputs.encode('utf-8')).hexdigest()}.svg"
+
+    def _read_disk(self, path: Path) -> Optional[bytes]:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Could not read cached diagram %s: %s", path, e)
+            return None
+
+    def _write_disk(self, path: Path, body: bytes) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not write cached diagram %s: %s", path, e)
+
+    def get(self, fastener_type: Dict, diameter: str, dim: Dict) -> PreparedResponse:
+        """Get the rendered SVG, rendering it at most once per data version"""
+        version = get_data_loader().version
+        key = (fastener_type["id"], diameter)
+        prepared = self._memory.get(key)
+        if prepared is not None and prepared.data_version == version:
+            return prepared
+
+        body = None
+        path = self._disk_path(fastener_type, diameter, dim) if self.cache_dir else None
+        if path is not None:
+            body = self._read_disk(path)
+            if body is not None:
+                self.disk_hits += 1
+        if body is None:
+            body = render_diagram_svg(fastener_type, diameter, dim)
+            self.renders += 1
+            if path is not None:
+                self._write_disk(path, body)
+
+        prepared = PreparedResponse(body, version)
+        self._memory[key] = prepared
+        return prepared
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._memory),
+            "memory_bytes": sum(len(p.body) for p in self._memory.values()),
+            "renders": self.renders,
+            "disk_hits": self.disk_hits,
+            "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+        }
+
+
+diagram_cache = DiagramCache(config.DIAGRAM_CACHE_DIR)
+
+
+def get_diagram_cache() -> DiagramCache:
+    """Get singleton diagram cache instance"""
+    return diagram_cache
+
+
+def prerender_diagrams(snapshot: Optional[DataSnapshot] = None) -> int:
+    """Render every fastener type at every available diameter; returns the count"""
+    data_loader = get_data_loader()
+    count = 0
+    with data_loader.pin(snapshot):
+        for fastener_type in data_loader.get_fastener_types():
+            if fastener_type["id"] not in DIAGRAM_RENDERERS:
+                continue
+            for diameter in data_loader.get_all_diameters(get_base_dimension_type(fastener_type["id"])):
+                dim = resolve_diagram_dimensions(fastener_type["id"], diameter)
+                if dim:
+                    diagram_cache.get(fastener_type, diameter, dim)
+                    count += 1
+    logger.info("Pre-rendered %d diagrams: %s", count, diagram_cache.stats())
+    return count
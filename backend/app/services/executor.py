@@ -0,0 +1,120 @@
+"""
+Execution layer for CPU-heavy calculation jobs
+
+Small jobs run inline on the event loop, where a thread hop would cost
+more than the work. Jobs at or above a size threshold go to a worker
+pool so health checks and catalogue requests keep being served, and a
+bounded number of pending jobs gives callers backpressure instead of an
+ever-growing queue.
+"""
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .. import config
+from .metrics import registry
+
+calculation_jobs_pending = registry.gauge(
+    "calculation_jobs_pending", "Calculation jobs queued or running in the worker pool"
+)
+calculation_jobs_total = registry.counter(
+    "calculation_jobs_total", "Calculation jobs by where they ran", ("mode",)
+)
+
+
+class ExecutorBusyError(Exception):
+    """Raised when the worker pool already has max_pending jobs"""
+
+
+class CalculationExecutor:
+    """Runs calculation jobs inline or in a thread/process pool"""
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 2,
+        max_pending: int = 16,
+        inline_threshold: int = 500
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.inline_threshold = inline_threshold
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # spawn: workers start clean instead of forking a threaded server
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="calc")
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args: Any, size: int) -> Any:
+        """
+        Run func(*args), inline if size is below the threshold and in the
+        pool otherwise. Process pools need func and args to be picklable.
+
+        Raises ExecutorBusyError when max_pending jobs are already queued.
+        """
+        if size < self.inline_threshold:
+            calculation_jobs_total.inc("inline")
+            return func(*args)
+
+        if self.pending >= self.max_pending:
+            calculation_jobs_total.inc("rejected")
+            raise ExecutorBusyError(f"{self.pending} calculation jobs already pending")
+
+        if self.kind == "thread":
+            # Keep the request's pinned data snapshot in the worker thread
+            call = functools.partial(contextvars.copy_context().run, func, *args)
+        else:
+            call = functools.partial(func, *args)
+
+        self.pending += 1
+        calculation_jobs_pending.inc()
+        calculation_jobs_total.inc(self.kind)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), call)
+        finally:
+            self.pending -= 1
+            calculation_jobs_pending.dec()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_executor: Optional[CalculationExecutor] = None
+
+
+def get_calculation_executor() -> CalculationExecutor:
+    """Get the executor configured from CALC_* settings"""
+    global _executor
+    if _executor is None:
+        _executor = CalculationExecutor(
+            kind=config.CALC_EXECUTOR,
+            max_workers=config.CALC_WORKERS,
+            max_pending=config.CALC_MAX_PENDING,
+            inline_threshold=config.CALC_INLINE_THRESHOLD
+        )
+    return _executor
+
+
+def shutdown_calculation_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
@@ -0,0 +1,294 @@
+"""
+Search index for HSN codes
+
+Built once per load of hsn_codes.json. Combines a code-prefix trie, a
+token inverted index and a trigram index over the description vocabulary
+so a search never scans every record. Typo-tolerant matching also checks
+edit distance, but only against the vocabulary words a deletion index
+(as in SymSpell) offers as candidates.
+"""
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CODE_SEPARATORS_RE = re.compile(r"[\s.\-]")
+
+# Result tiers, best first
+TIER_EXACT_CODE = 0
+TIER_CODE_PREFIX = 1
+TIER_TOKEN = 2
+TIER_FUZZY = 3
+
+# Query tokens shorter than this only match whole words, not prefixes
+MIN_PREFIX_LENGTH = 2
+
+# Minimum trigram similarity (Jaccard) for a typo-tolerant token match
+FUZZY_THRESHOLD = 0.3
+
+# Trigrams miss transpositions and omissions in short words ("blot", "wsher"),
+# so tokens of at least MIN_EDIT_LENGTH characters also match vocabulary
+# words within this many edits (insertions, deletions, substitutions and
+# swaps of adjacent characters), or the start of such a word: 1 edit up to
+# 5 characters, 2 beyond
+MIN_EDIT_LENGTH = 3
+MAX_EDITS_SHORT = 1
+MAX_EDITS_LONG = 2
+SHORT_TOKEN_LENGTH = 5
+
+# The deletion index holds the strings left after deleting up to
+# max_edits characters from the first n characters of each vocabulary word,
+# for every n from MIN_EDIT_LENGTH to this length. A query token cut to the
+# same length shares one of them with every word it is within bound of (or
+# within bound of a prefix of). Longer than SHORT_TOKEN_LENGTH, so a cut
+# token keeps its bound.
+EDIT_PREFIX_LENGTH = 6
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token: str) -> Set[str]:
+    """Trigrams of a token, padded so short tokens still produce some"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(token: str) -> int:
+    """Edits allowed between a query token and a vocabulary word"""
+    return _max_edits_for_length(len(token))
+
+
+def _max_edits_for_length(length: int) -> int:
+    if length < MIN_EDIT_LENGTH:
+        return 0
+    return MAX_EDITS_SHORT if length <= SHORT_TOKEN_LENGTH else MAX_EDITS_LONG
+
+
+def deletions(text: str, depth: int) -> Set[str]:
+    """text and every string left after deleting up to depth of its characters"""
+    found = {text}
+    frontier = {text}
+    for _ in range(depth):
+        frontier = {s[:i] + s[i + 1:] for s in frontier for i in range(len(s))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, bound: int, prefix: bool = False) -> int:
+    """
+    Damerau-Levenshtein distance (optimal string alignment) between a and b
+
+    With prefix=True, the distance between a and the closest prefix of b,
+    so a misspelt word still finds its plural or longer forms. Gives up
+    once every alignment exceeds bound and returns bound + 1.
+    """
+    if prefix:
+        # Prefixes longer than this are already too far away
+        b = b[:len(a) + bound]
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    # Only cells within `bound` of the diagonal can stay within bound
+    over = bound + 1
+    previous2: List[int] = []
+    previous = [j if j <= bound else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [i if i <= bound else over] + [over] * len(b)
+        for j in range(max(1, i - bound), min(len(b), i + bound) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > bound:
+            return over
+        previous2, previous = previous, current
+    # The last row holds the distance from a to every prefix of b
+    distance = min(previous) if prefix else previous[len(b)]
+    return min(distance, over)
+
+
+class _TrieNode:
+    __slots__ = ("children", "record_ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Every record whose code passes through this node, best first
+        self.record_ids: List[int] = []
+
+
+class HSNSearchIndex:
+    """Ranked search over HSN codes and descriptions"""
+
+    def __init__(self, hsn_codes: List[Dict]):
+        self.records = hsn_codes
+        self._by_code: Dict[str, int] = {}
+        self._trie = _TrieNode()
+        self._postings: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._trigram_counts: Dict[str, int] = {}
+        # cut length -> deletion -> vocabulary words
+        self._edit_candidates: Dict[int, Dict[str, List[str]]] = {}
+
+        for record_id, hsn in enumerate(hsn_codes):
+            code = hsn["code"].lower()
+            self._by_code.setdefault(code, record_id)
+
+            node = self._trie
+            for char in code:
+                node = node.children.setdefault(char, _TrieNode())
+                node.record_ids.append(record_id)
+
+            for token in set(tokenize(hsn["description"])):
+                self._postings.setdefault(token, set()).add(record_id)
+
+        self._vocab = sorted(self._postings)
+        for token in self._vocab:
+            grams = trigrams(token)
+            self._trigram_counts[token] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(token)
+        self._build_edit_candidates()
+
+        # Shorter (more general) codes first under each prefix
+        self._sort_trie(self._trie)
+
+    def _sort_trie(self, root: _TrieNode):
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.record_ids.sort(key=lambda rid: (len(self.records[rid]["code"]), rid))
+            stack.extend(node.children.values())
+
+    def _build_edit_candidates(self):
+        for length in range(MIN_EDIT_LENGTH, EDIT_PREFIX_LENGTH + 1):
+            bound = _max_edits_for_length(length)
+            table: Dict[str, List[str]] = {}
+            for token in self._vocab:
+                # Too short to be within bound of a token this long
+                if len(token) < length - bound:
+                    continue
+                for key in deletions(token[:length], bound):
+                    table.setdefault(key, []).append(token)
+            self._edit_candidates[length] = table
+
+    def _edit_candidates_for(self, token: str, bound: int) -> Set[str]:
+        """Vocabulary words that may be within bound edits of the token or its prefix"""
+        head = token[:EDIT_PREFIX_LENGTH]
+        table = self._edit_candidates[len(head)]
+        candidates: Set[str] = set()
+        for key in deletions(head, bound):
+            candidates.update(table.get(key, ()))
+        return candidates
+
+    def _code_prefix_matches(self, code: str) -> List[int]:
+        node = self._trie
+        for char in code:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.record_ids
+
+    def _token_prefix_matches(self, token: str) -> Tuple[Set[int], Set[int]]:
+        """Records containing the token exactly, and records with a word starting with it"""
+        exact = self._postings.get(token, set())
+        if len(token) < MIN_PREFIX_LENGTH:
+            return exact, exact
+        prefixed: Set[int] = set()
+        i = bisect_left(self._vocab, token)
+        while i < len(self._vocab) and self._vocab[i].startswith(token):
+            prefixed |= self._postings[self._vocab[i]]
+            i += 1
+        return exact, prefixed
+
+    def _fuzzy_matches(self, token: str) -> Dict[int, float]:
+        """Records with a vocabulary token similar to the (possibly misspelt) query token"""
+        grams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        similarities: Dict[str, float] = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + self._trigram_counts[candidate] - count)
+            if similarity >= FUZZY_THRESHOLD:
+                similarities[candidate] = similarity
+
+        bound = max_edits(token)
+        if bound:
+            for candidate in self._edit_candidates_for(token, bound):
+                distance = edit_distance(token, candidate, bound, prefix=True)
+                if distance <= bound:
+                    similarity = 1.0 - distance / len(token)
+                    if similarity > similarities.get(candidate, 0.0):
+                        similarities[candidate] = similarity
+
+        scores: Dict[int, float] = {}
+        for candidate, similarity in similarities.items():
+            for record_id in self._postings[candidate]:
+                if similarity > scores.get(record_id, 0.0):
+                    scores[record_id] = similarity
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Search HSN codes, best matches first
+
+        Ranking: exact code match, then code prefix matches (shorter codes
+        first), then records matching every query token (exact tokens
+        ahead of prefixes), then typo-tolerant matches (trigram similarity or a small edit distance).
+        """
+        # record id -> (tier, score), lower sorts first
+        ranked: Dict[int, Tuple[int, float]] = {}
+
+        def offer(record_id: int, tier: int, score: float):
+            current = ranked.get(record_id)
+            if current is None or (tier, score) < current:
+                ranked[record_id] = (tier, score)
+
+        code = _CODE_SEPARATORS_RE.sub("", query.lower())
+        if code:
+            exact = self._by_code.get(code)
+            if exact is not None:
+                offer(exact, TIER_EXACT_CODE, 0.0)
+            # Trie lists are pre-sorted, so only the first `limit` can rank
+            prefix_matches = self._code_prefix_matches(code)
+            if limit is not None:
+                prefix_matches = prefix_matches[:limit]
+            for position, record_id in enumerate(prefix_matches):
+                offer(record_id, TIER_CODE_PREFIX, float(position))
+
+        tokens = tokenize(query)
+        if tokens:
+            matched: Optional[Set[int]] = None
+            exact_hits: Dict[int, int] = {}
+            for token in tokens:
+                exact, prefixed = self._token_prefix_matches(token)
+                for record_id in exact:
+                    exact_hits[record_id] = exact_hits.get(record_id, 0) + 1
+                matched = prefixed if matched is None else matched & prefixed
+            for record_id in matched or ():
+                offer(record_id, TIER_TOKEN, -float(exact_hits.get(record_id, 0)))
+
+            if not ranked:
+                fuzzy: Optional[Dict[int, float]] = None
+                for token in tokens:
+                    scores = self._fuzzy_matches(token)
+                    if fuzzy is None:
+                        fuzzy = scores
+                    else:
+                        fuzzy = {rid: fuzzy[rid] + s for rid, s in scores.items() if rid in fuzzy}
+                for record_id, similarity in (fuzzy or {}).items():
+                    offer(record_id, TIER_FUZZY, -similarity)
+
+        sort_key = lambda rid: (ranked[rid], rid)
+        if limit is None:
+            ordered = sorted(ranked, key=sort_key)
+        else:
+            ordered = heapq.nsmallest(limit, ranked, key=sort_key)
+        return [self.records[rid] for rid in ordered]
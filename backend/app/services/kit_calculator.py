@@ -0,0 +1,113 @@
+"""
+Kit (assembly) weight calculator
+
+A kit is a set of components sharing one thread size, such as a bolt
+with its nut, plain washer and spring washer. Component unit weights come
+from WeightCalculator, so they are served from its unit-weight cache.
+"""
+from typing import Dict, List, Optional
+
+from .calculator import SHAPE_REGISTRY, get_base_dimension_type, get_weight_calculator
+from .data_loader import get_data_loader
+from .metrics import calculations_total
+
+
+class KitCalculator:
+    """Service for calculating per-set and total weights of fastener kits"""
+
+    def __init__(self):
+        self.data_loader = get_data_loader()
+        self.calculator = get_weight_calculator()
+
+    def resolve_kit(self, kit_id: str) -> Dict:
+        """Get a named kit, raising ValueError if it does not exist"""
+        kit = self.data_loader.get_kit_by_id(kit_id)
+        if not kit:
+            raise ValueError(f"Unknown kit: {kit_id}")
+        return kit
+
+    def _check_size(self, fastener_type_id: str, diameter: str) -> None:
+        """
+        Make sure the component comes in this thread size: nuts and washers
+        must have a row for the diameter in their dimension table
+        """
+        if fastener_type_id not in SHAPE_REGISTRY:
+            raise ValueError(f"Unsupported fastener type: {fastener_type_id}")
+        base_type = get_base_dimension_type(fastener_type_id)
+        has_table = bool(self.data_loader.get_dimensions(base_type))
+        if has_table and not self.data_loader.get_dimension_for_diameter(base_type, diameter):
+            raise ValueError(f"No {fastener_type_id} available in size {diameter}")
+
+    def calculate_kit(
+        self,
+        components: List[Dict],
+        diameter: str,
+        material_id: str,
+        length: Optional[float] = None,
+        sets: int = 1
+    ) -> Dict:
+        """
+        Calculate weights for `sets` kits of the given components
+
+        Each component has fastener_type_id, quantity (per set) and an
+        optional material_id overriding the kit material. Every component
+        uses the kit diameter; length applies to the bolts and screws.
+
+        Returns dict with per-component rows, set weight, total weight
+        and sets per 50 kg
+        """
+        if sets <= 0:
+            raise ValueError("Number of sets must be greater than 0")
+        if not components:
+            raise ValueError("Kit has no components")
+
+        rows = []
+        set_weight_grams = 0.0
+        for component in components:
+            fastener_type_id = component["fastener_type_id"]
+            quantity = component.get("quantity", 1)
+            if quantity <= 0:
+                raise ValueError(f"Quantity for {fastener_type_id} must be greater than 0")
+            self._check_size(fastener_type_id, diameter)
+
+            component_length = length if SHAPE_REGISTRY[fastener_type_id].needs_length else None
+            component_material_id = component.get("material_id") or material_id
+            fastener_type_name, material_name, material_grade, unit_weight_grams = self.calculator.unit_weight(
+                fastener_type_id, component_material_id, diameter, component_length
+            )
+            calculations_total.inc(fastener_type_id, component_material_id)
+            # Unrounded, so rounding happens once per output figure and does not grow with quantity
+            weight_per_set = unit_weight_grams * quantity
+            set_weight_grams += weight_per_set
+            rows.append({
+                "fastener_type_id": fastener_type_id,
+                "fastener_type": fastener_type_name,
+                "material": material_name,
+                "material_grade": material_grade,
+                "diameter": diameter,
+                "length": component_length,
+                "quantity_per_set": quantity,
+                "unit_weight_grams": round(unit_weight_grams, 3),
+                "weight_per_set_grams": round(weight_per_set, 3),
+                "total_quantity": quantity * sets,
+                "total_weight_kg": round(weight_per_set * sets / 1000, 4)
+            })
+
+        return {
+            "diameter": diameter,
+            "length": length,
+            "sets": sets,
+            "components": rows,
+            "set_weight_grams": round(set_weight_grams, 3),
+            "total_weight_kg": round(set_weight_grams * sets / 1000, 4),
+            "sets_per_50kg": int(50000 / set_weight_grams) if set_weight_grams > 0 else 0
+        }
+
+
+# Singleton instance
+kit_calculator = KitCalculator()
+
+
+def get_kit_calculator() -> KitCalculator:
+    """Get singleton kit calculator instance"""
+    return kit_calculator
@@ -0,0 +1,144 @@
+"""
+Live calculation channel for the weight calculator page
+
+The page sends one message per form edit over a WebSocket. Incoming
+messages are parked in a single-slot mailbox per connection, so a message
+that arrives before the previous one was computed replaces it: only the
+latest input of each client is parsed, validated and calculated.
+"""
+import asyncio
+import json
+from typing import Dict, Optional
+
+from pydantic import ValidationError
+
+from ..models.schemas import PiecesCalculationRequest, WeightCalculationRequest
+from .calculator import get_weight_calculator
+from .data_loader import get_data_loader
+from .metrics import registry
+
+# Messages larger than this (UTF-8 encoded) are rejected without being parsed
+MAX_MESSAGE_BYTES = 4096
+
+live_connections = registry.gauge(
+    "live_calculation_connections", "Open live calculation WebSocket connections"
+)
+live_messages_total = registry.counter(
+    "live_calculation_messages_total",
+    "Live calculation messages: received, superseded (dropped for a newer one), sent and errors",
+    ("event",)
+)
+
+
+class LatestMessageSlot:
+    """Mailbox holding only the most recent unprocessed message"""
+
+    def __init__(self):
+        self._message: Optional[str] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def put(self, message: str) -> bool:
+        """Store a message, returning True if it replaced one not yet taken"""
+        superseded = self._message is not None
+        self._message = message
+        self._ready.set()
+        return superseded
+
+    def close(self) -> None:
+        """Wake the consumer; take() returns None once the slot is drained"""
+        self._closed = True
+        self._ready.set()
+
+    async def take(self) -> Optional[str]:
+        """Wait for the next message, or None after close()"""
+        while self._message is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        message, self._message = self._message, None
+        return message
+
+
+def _error(message_id, detail) -> Dict:
+    live_messages_total.inc("error")
+    return {"type": "error", "id": message_id, "detail": detail}
+
+
+def compute_live_message(text: str) -> Dict:
+    """
+    Calculate one live message and build the reply
+
+    A message is the body of /calculate/weight (mode "weight", the
+    default) or /calculate/pieces (mode "pieces") plus an optional "id"
+    that is echoed back so the client can drop stale replies.
+    """
+    # Every character takes at least one byte, so only encode texts that might fit
+    if len(text) > MAX_MESSAGE_BYTES or len(text.encode("utf-8")) > MAX_MESSAGE_BYTES:
+        return _error(None, "Message too large")
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return _error(None, "Message is not valid JSON")
+    if not isinstance(message, dict):
+        return _error(None, "Message must be a JSON object")
+
+    message_id = message.get("id")
+    mode = message.get("mode", "weight")
+    calculator = get_weight_calculator()
+    try:
+        with get_data_loader().pin() as snapshot:
+            if mode == "weight":
+                request = WeightCalculationRequest.model_validate(message)
+                result = calculator.calculate_weight(
+                    fastener_type_id=request.fastener_type_id,
+                    material_id=request.material_id,
+                    diameter=request.diameter,
+                    length=request.length,
+                    quantity=request.quantity
+                )
+            elif mode == "pieces":
+                request = PiecesCalculationRequest.model_validate(message)
+                if request.tolerance:
+                    return _error(message_id, "Tolerance mode is only available on /api/calculate/pieces")
+                result = calculator.calculate_pieces_from_weight(
+                    fastener_type_id=request.fastener_type_id,
+                    material_id=request.material_id,
+                    diameter=request.diameter,
+                    length=request.length,
+                    weight_kg=request.weight
+                )
+            else:
+                return _error(message_id, f"Unknown mode: {mode}")
+    except ValidationError as e:
+        return _error(message_id, e.errors(include_url=False, include_context=False, include_input=False))
+    except ValueError as e:
+        return _error(message_id, str(e))
+
+    return {
+        "type": "result",
+        "id": message_id,
+        "mode": mode,
+        "data_version": snapshot.version,
+        "result": result
+    }
+
+
+def encode_reply(reply: Dict) -> str:
+    """
+    Serialize a reply as strict JSON, which browsers require
+
+    A reply holding NaN or an infinity (the echoed id can be one, since
+    json.loads accepts them) is replaced by an error reply.
+    """
+    try:
+        return json.dumps(reply, allow_nan=False)
+    except ValueError:
+        pass
+    error = _error(reply.get("id"), "Reply contains a number that is not finite")
+    try:
+        return json.dumps(error, allow_nan=False)
+    except ValueError:
+        error["id"] = None
+        return json.dumps(error)
@@ -0,0 +1,76 @@
+"""
+Size-bounded LRU cache tied to a data version
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache
+
+    Entries belong to one data version; the first access with a different
+    version clears the cache, so nothing computed from old data survives
+    a reload. A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data_version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, data_version: str) -> None:
+        if data_version != self.data_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.data_version = data_version
+
+    def get(self, key: Hashable, data_version: str) -> Optional[Any]:
+        """Get the cached value for key, or None"""
+        with self._lock:
+            self._check_version(data_version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, data_version: str) -> None:
+        """Store value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(data_version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit rate, size and eviction counts for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "maxsize": self.maxsize,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "data_version": self.data_version,
+            }
@@ -0,0 +1,143 @@
+"""
+Pre-serialized JSON responses for static catalogue endpoints
+
+Bodies are encoded once per data version and served with a strong ETag,
+so a conditional GET that still matches is answered with 304 without
+rebuilding or re-encoding anything. Larger bodies can also be kept
+gzip-compressed so the compression cost is paid once per data version.
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from .. import config
+from .data_loader import get_data_loader
+
+
+class PreparedResponse:
+    """Encoded body with its ETag for one data version"""
+
+    __slots__ = ("body", "etag", "data_version", "_gzip_body")
+
+    def __init__(self, body: bytes, data_version: str):
+        self.body = body
+        # Content-addressed: unchanged bodies keep their ETag across reloads
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.data_version = data_version
+        self._gzip_body: Optional[bytes] = None
+
+    @property
+    def gzip_body(self) -> bytes:
+        """Body gzip-compressed once, on first use"""
+        if self._gzip_body is None:
+            # mtime=0 keeps the compressed bytes identical across builds
+            self._gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        return self._gzip_body
+
+    @property
+    def gzip_etag(self) -> str:
+        """ETag of the gzip-encoded representation"""
+        return self.etag[:-1] + '-gzip"'
+
+
+_prepared: Dict[str, PreparedResponse] = {}
+
+
+def encode_json(content: Any, model: Optional[Type[BaseModel]] = None) -> bytes:
+    """
+    Encode content the way FastAPI would, validating through the response
+    model when one is given
+    """
+    if model is not None:
+        return model.model_validate(content).model_dump_json().encode("utf-8")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _quality(params: str) -> float:
+    """q-value of one Accept-Encoding entry; a malformed value counts as q=0"""
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                return 0.0
+            return q if 0 <= q <= 1 else 0.0
+    return 1.0
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Check whether an Accept-Encoding header allows gzip (an explicit gzip entry overrides *)"""
+    if not accept_encoding:
+        return False
+    gzip_q = wildcard_q = None
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        name = name.strip().lower()
+        if name == "gzip":
+            gzip_q = _quality(params)
+        elif name == "*":
+            wildcard_q = _quality(params)
+    q = gzip_q if gzip_q is not None else wildcard_q
+    return bool(q)
+
+
+def get_prepared(key: str, build: Callable[[], Any], model: Optional[Type[BaseModel]] = None) -> PreparedResponse:
+    """Get the encoded body for key, building it if the data version changed"""
+    version = get_data_loader().version
+    prepared = _prepared.get(key)
+    if prepared is None or prepared.data_version != version:
+        prepared = PreparedResponse(encode_json(build(), model), version)
+        _prepared[key] = prepared
+    return prepared
+
+
+def prepared_json_response(
+    request: Request,
+    key: str,
+    build: Callable[[], Any],
+    model: Optional[Type[BaseModel]] = None,
+    compress: bool = False
+) -> Response:
+    """
+    Serve a cached JSON body for key, or 304 if the client already has it
+
+    build() is only called when the body for the current data version has
+    not been encoded yet; it may raise HTTPException (e.g. 404). With
+    compress=True, clients that accept gzip get the pre-compressed body.
+    """
+    prepared = get_prepared(key, build, model)
+    use_gzip = compress and accepts_gzip(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": prepared.gzip_etag if use_gzip else prepared.etag,
+        "Cache-Control": f"public, max-age={config.CATALOGUE_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if compress:
+        headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, prepared.etag) or (compress and etag_matches(if_none_match, prepared.gzip_etag)):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=prepared.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=prepared.body, media_type="application/json", headers=headers)
@@ -0,0 +1,170 @@
+"""
+On-demand stack-sampling profiler
+
+A session starts a sampler thread that reads sys._current_frames() at a
+fixed rate and counts each thread's stack. The stacks are reported in
+collapsed format ("frame;frame;frame count" per line), which
+flamegraph.pl, speedscope and most flame graph viewers read directly.
+No trace or profile hook is installed, so the server runs untouched while
+no session is active, and during a session the cost is one frame walk
+per thread per sample on the sampler thread.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from .. import config
+from .metrics import registry
+
+profiler_sessions_total = registry.counter(
+    "profiler_sessions_total", "Sampling profiler sessions run"
+)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Leaf frames of threads that are waiting for work rather than running it
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    # uvloop polls in C, so an idle uvloop event loop shows asyncio.run as its leaf
+    ("runners.py", "run"),
+}
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling session is already running"""
+
+
+def _frame_label(code, cache: Dict) -> str:
+    label = cache.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(APP_DIR):
+            filename = "app" + filename[len(APP_DIR):]
+        else:
+            filename = os.path.basename(filename)
+        label = cache[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+class ProfileSession:
+    """Samples collected by one sampler thread"""
+
+    def __init__(self, hz: float, include_idle: bool):
+        self.hz = hz
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.ticks = 0
+        self.sampling_seconds = 0.0
+        self.started_at = time.perf_counter()
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.stopped_at = time.perf_counter()
+
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        own_ident = threading.get_ident()
+        labels: Dict = {}
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            tick_started = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                leaf = frame.f_code
+                if not self.include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                    self.idle_samples += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+                self.samples += 1
+            self.ticks += 1
+            self.sampling_seconds += time.perf_counter() - tick_started
+            # Fixed schedule; ticks missed while the GIL was held are skipped, not bunched up
+            next_tick += interval
+            now = time.perf_counter()
+            if next_tick < now:
+                next_tick = now
+            self._stop.wait(next_tick - now)
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self, top: int = 20) -> Dict:
+        """Session summary, the collapsed stacks and the functions most often on top of a stack"""
+        elapsed = (self.stopped_at or time.perf_counter()) - self.started_at
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "duration_seconds": round(elapsed, 3),
+            "requested_hz": self.hz,
+            "achieved_hz": round(self.ticks / elapsed, 1) if elapsed else 0.0,
+            "ticks": self.ticks,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "sampler_overhead_pct": round(100 * self.sampling_seconds / elapsed, 2) if elapsed else 0.0,
+            "top_functions": [
+                {"frame": frame, "samples": count, "share": round(count / self.samples, 4)}
+                for frame, count in leaves.most_common(top)
+            ],
+            "stacks": dict(self.stacks.most_common()),
+        }
+
+
+class SamplingProfiler:
+    """Runs at most one ProfileSession at a time within the limits from config"""
+
+    def __init__(self, max_hz: float, max_seconds: float):
+        self.max_hz = max_hz
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    def start(self, seconds: float, hz: float, include_idle: bool = False) -> ProfileSession:
+        """Start a session; raises ValueError outside the limits and ProfilerBusyError if one is running"""
+        if not 0 < hz <= self.max_hz:
+            raise ValueError(f"hz must be greater than 0 and at most {self.max_hz:g} (PROFILER_MAX_HZ)")
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be greater than 0 and at most {self.max_seconds:g} (PROFILER_MAX_SECONDS)")
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profiling session is already running")
+        session = ProfileSession(hz, include_idle)
+        profiler_sessions_total.inc()
+        session.start()
+        return session
+
+    def stop(self, session: ProfileSession) -> None:
+        """Stop the sampler thread and free the slot for the next session"""
+        try:
+            session.stop()
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler(config.PROFILER_MAX_HZ, config.PROFILER_MAX_SECONDS)
+
+
+def get_profiler() -> SamplingProfiler:
+    """Get the application profiler"""
+    return profiler
@@ -0,0 +1,160 @@
+"""
+Server-side cache of complete responses for parameterized GET routes
+
+Routes opt in with @cached_response(). ResponseCacheMiddleware keys each
+GET by path plus normalized query string, stores responses of opted-in
+routes after they ran, and replays the stored status, headers and body
+on a hit, so the handler and JSON encoding are skipped entirely. Entries
+expire after their TTL and are dropped as soon as the data version
+changes.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from .. import config
+
+# Bodies larger than this are passed through without being cached
+MAX_CACHED_BODY_BYTES = 256 * 1024
+
+
+class CachedResponse:
+    """Status, raw ASGI headers and body of one response, and the route that produced it"""
+
+    __slots__ = ("status", "headers", "body", "etag", "route", "expires_at")
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, route: Any, expires_at: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = next((value.decode("latin-1") for name, value in headers if name == b"etag"), None)
+        self.route = route
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    LRU of CachedResponse entries with a per-entry TTL
+
+    Like LRUCache, entries belong to one data version and the first
+    access with a different version clears them. Only touched from the
+    event loop, so no lock is needed.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.data_version: Optional[str] = None
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _check_version(self, data_version: str) -> None:
+        if data_version != self.data_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.data_version = data_version
+
+    def get(self, key: str, data_version: str) -> Optional[CachedResponse]:
+        """
+        Get a live entry for key, or None
+
+        A None is not counted as a miss: most GETs are to routes that are
+        not cached at all. put() counts the miss once the route turns out
+        to be cacheable.
+        """
+        self._check_version(data_version)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: str,
+        status: int,
+        headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        route: Any,
+        data_version: str,
+        ttl: Optional[float] = None
+    ) -> None:
+        """Store a response after a miss, evicting the least recently used entry when full"""
+        self.misses += 1
+        self._check_version(data_version)
+        ttl = self.default_ttl if ttl is None else ttl
+        self._entries[key] = CachedResponse(status, headers, body, route, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit rate, size, expirations and evictions for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "maxsize": self.maxsize,
+            "size": len(self._entries),
+            "default_ttl": self.default_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "data_version": self.data_version,
+        }
+
+
+def normalize_query(query_string: bytes) -> str:
+    """Query string with parameters sorted, so ?b=2&a=1 and ?a=1&b=2 share an entry"""
+    if not query_string:
+        return ""
+    pairs = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    return urlencode(sorted(pairs))
+
+
+def cache_key(path: str, query_string: bytes) -> str:
+    query = normalize_query(query_string)
+    return f"{path}?{query}" if query else path
+
+
+def cached_response(ttl: Optional[float] = None) -> Callable:
+    """
+    Opt a GET route into the response cache
+
+    Successful responses are cached for ttl seconds (RESPONSE_CACHE_TTL
+    when omitted). Only use it on routes whose answer depends on nothing
+    but the path, query string and data version.
+    """
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.response_cache = True
+        endpoint.response_cache_ttl = ttl
+        return endpoint
+    return decorate
+
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_SIZE, config.RESPONSE_CACHE_TTL)
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the application response cache"""
+    return response_cache
@@ -0,0 +1,112 @@
+"""
+Unit-weight tables shared read-only by all server workers
+
+In multi-worker mode (python -m app.serve) the parent process builds the
+unit-weight table and the weight identification index once and writes
+their arrays as .npy files. Workers map them with np.load(mmap_mode="r"),
+so every worker reads the same pages from the OS page cache instead of
+building and holding its own copy. Only the small id lists and the
+manifest are copied into each worker.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from .data_loader import DataSnapshot, get_data_loader
+from .weight_index import UnitWeightIndex, build_unit_weight_index, install_unit_weight_index
+from .weight_table import UnitWeightTable, build_unit_weight_table, install_unit_weight_table
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the arrays or manifest change shape
+SHARED_TABLES_FORMAT = 1
+
+INDEX_ARRAYS = (
+    "type_index", "material_index", "diameter_index", "lengths", "weights", "order", "sorted_weights"
+)
+
+
+def export_shared_tables(directory: Path, snapshot: Optional[DataSnapshot] = None) -> Dict:
+    """Build the table and index for the given (or current) data and write them to directory"""
+    directory.mkdir(parents=True, exist_ok=True)
+    table = build_unit_weight_table(snapshot)
+    index = build_unit_weight_index(snapshot)
+
+    np.save(directory / "table_weights.npy", table.weights)
+    for name in INDEX_ARRAYS:
+        np.save(directory / f"index_{name}.npy", getattr(index, name))
+
+    manifest = {
+        "format": SHARED_TABLES_FORMAT,
+        "data_version": table.data_version,
+        "table": {
+            "fastener_type_ids": table.fastener_type_ids,
+            "material_ids": table.material_ids,
+            "diameters": table.diameters,
+            "lengths": table.lengths,
+            "has_length": table.has_length,
+            "build_seconds": table.build_seconds,
+        },
+        "index": {
+            "fastener_types": index.fastener_types,
+            "materials": index.materials,
+            "diameters": index.diameters,
+            "build_seconds": index.build_seconds,
+        },
+    }
+    # Manifest last: a directory without one is never loaded half-written
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest))
+    logger.info("Exported shared tables for data version %s to %s", table.data_version, directory)
+    return manifest
+
+
+def load_shared_tables(directory: Path) -> bool:
+    """
+    Map the table and index from directory and serve them in this process
+
+    Returns False (and installs nothing) when the files are missing or
+    were built from other data than this process is serving.
+    """
+    manifest_path = directory / MANIFEST_FILE
+    if not manifest_path.exists():
+        logger.warning("No shared tables in %s", directory)
+        return False
+    manifest = json.loads(manifest_path.read_text())
+    version = get_data_loader().version
+    if manifest.get("format") != SHARED_TABLES_FORMAT or manifest.get("data_version") != version:
+        logger.warning(
+            "Shared tables in %s are for data version %s, serving %s",
+            directory, manifest.get("data_version"), version
+        )
+        return False
+
+    def mapped(name: str) -> np.ndarray:
+        return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+    table_meta = manifest["table"]
+    install_unit_weight_table(UnitWeightTable(
+        fastener_type_ids=table_meta["fastener_type_ids"],
+        material_ids=table_meta["material_ids"],
+        diameters=table_meta["diameters"],
+        lengths=table_meta["lengths"],
+        weights=mapped("table_weights"),
+        has_length=table_meta["has_length"],
+        data_version=version,
+        build_seconds=table_meta["build_seconds"]
+    ))
+    index_meta = manifest["index"]
+    arrays = {name: mapped(f"index_{name}") for name in INDEX_ARRAYS}
+    install_unit_weight_index(UnitWeightIndex(
+        fastener_types=index_meta["fastener_types"],
+        materials=index_meta["materials"],
+        diameters=index_meta["diameters"],
+        data_version=version,
+        build_seconds=index_meta["build_seconds"],
+        **arrays
+    ))
+    return True
@@ -0,0 +1,77 @@
+"""
+Standard code normalization and the DIN/ISO/IS equivalence graph
+
+Equivalence groups from standards.json are edges of an undirected graph;
+its connected components are the transitive closure, so a code maps to
+every standard reachable from it (IS 2016 -> DIN 125 -> ISO 7090) with
+one dict lookup at request time.
+"""
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Order equivalents are listed in, and the prefixes a code may start with
+STANDARD_TYPES = ("DIN", "ISO", "IS")
+
+_CODE_PATTERN = re.compile(r"^(DIN|ISO|IS)[\s\-:/]*(.+)$")
+
+
+def normalize_standard_code(code: str) -> str:
+    """
+    Canonical form of a standard code: "din931", "DIN-931" and
+    " din  931 " all become "DIN 931". Unknown prefixes are only
+    upper-cased and stripped.
+    """
+    code = " ".join(code.upper().split())
+    match = _CODE_PATTERN.match(code)
+    if not match:
+        return code
+    return f"{match.group(1)} {match.group(2).replace(' ', '')}"
+
+
+def standard_type(code: str) -> str:
+    """DIN, ISO or IS for a normalized code (empty string if unknown)"""
+    prefix = code.split(" ", 1)[0]
+    return prefix if prefix in STANDARD_TYPES else ""
+
+
+def _sort_key(code: str) -> Tuple[int, List]:
+    kind = standard_type(code)
+    rank = STANDARD_TYPES.index(kind) if kind else len(STANDARD_TYPES)
+    # Natural order so that DIN 931 comes before DIN 9021
+    parts = [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", code)]
+    return rank, parts
+
+
+def build_equivalence_closure(groups: Iterable[Iterable[str]]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Map every code in the groups to all other codes in its connected
+    component, ordered DIN, ISO, IS
+    """
+    parent: Dict[str, str] = {}
+
+    def find(code: str) -> str:
+        root = code
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[code] != root:
+            parent[code], code = root, parent[code]
+        return root
+
+    for group in groups:
+        codes = [normalize_standard_code(code) for code in group]
+        for code in codes:
+            parent.setdefault(code, code)
+        for code in codes[1:]:
+            parent[find(code)] = find(codes[0])
+
+    components: Dict[str, List[str]] = {}
+    for code in parent:
+        components.setdefault(find(code), []).append(code)
+
+    closure: Dict[str, Tuple[str, ...]] = {}
+    for members in components.values():
+        members.sort(key=_sort_key)
+        for code in members:
+            closure[code] = tuple(other for other in members if other != code)
+    return closure
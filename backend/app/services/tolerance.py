@@ -0,0 +1,121 @@
+"""
+Monte Carlo piece counts within manufacturing tolerances
+
+Each geometry parameter of a fastener is drawn from its tolerance band,
+the batch engine's volume formulas are evaluated on the sampled arrays,
+and the spread of unit weights is turned into a piece-count interval
+for a weighed quantity.
+"""
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .batch_calculator import VOLUME_FUNCTIONS, get_batch_weight_calculator
+from .calculator import SHAPE_REGISTRY, get_weight_calculator
+
+# Allowed (lower, upper) deviation in mm from a nominal value, by shape
+# parameter. Simplified from ISO 4759-1 product grades A/B: external
+# dimensions (threads, across flats, head diameters) only go below
+# nominal, washer holes only above, heights and lengths both ways.
+TOLERANCE_BANDS: Dict[str, Callable[[float], Tuple[float, float]]] = {
+    "d": lambda v: (-(0.02 + 0.012 * v), 0.0),
+    "s": lambda v: (-(0.1 + 0.015 * v), 0.0),
+    "k": lambda v: (-(0.05 + 0.04 * v), 0.05 + 0.04 * v),
+    "head_d": lambda v: (-(0.1 + 0.015 * v), 0.0),
+    "head_h": lambda v: (-(0.05 + 0.03 * v), 0.0),
+    "h": lambda v: (-(0.1 + 0.04 * v), 0.0),
+    "id": lambda v: (0.0, 0.1 + 0.02 * v),
+    "od": lambda v: (-(0.1 + 0.02 * v), 0.0),
+    "t": lambda v: (-0.1 * v, 0.1 * v),
+    "length": lambda v: (-(0.2 + 0.01 * v), 0.2 + 0.01 * v),
+}
+
+DEFAULT_SAMPLES = 100_000
+
+# Two-sided interval reported for unit weight and piece count
+INTERVAL_PERCENTILES = (5, 95)
+
+
+def _sample_band(rng: np.random.Generator, nominal: float, name: str, samples: int) -> np.ndarray:
+    """
+    Normal distribution centred in the band with the band edges at ±3σ,
+    clipped to the band (a capable process that stays within tolerance)
+    """
+    low, high = TOLERANCE_BANDS[name](nominal)
+    low, high = nominal + low, nominal + high
+    if high <= low:
+        return np.full(samples, nominal)
+    values = rng.normal((low + high) / 2, (high - low) / 6, samples)
+    return np.clip(values, low, high)
+
+
+def sample_unit_weights(
+    fastener_type_id: str,
+    diameter: str,
+    length: Optional[float],
+    density: float,
+    samples: int = DEFAULT_SAMPLES,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Unit weights in grams for `samples` parts drawn within tolerance"""
+    rng = np.random.default_rng(seed)
+    nominal = get_batch_weight_calculator().resolve_shape_parameters(fastener_type_id, diameter)
+    params = {name: _sample_band(rng, value, name, samples) for name, value in nominal.items()}
+    if SHAPE_REGISTRY[fastener_type_id].needs_length:
+        params["length"] = _sample_band(rng, float(length), "length", samples)
+    else:
+        params["length"] = np.zeros(samples)
+    return VOLUME_FUNCTIONS[fastener_type_id](params) / 1000 * density
+
+
+def estimate_pieces_with_tolerance(
+    fastener_type_id: str,
+    material_id: str,
+    diameter: str,
+    length: Optional[float],
+    weight_kg: float,
+    samples: int = DEFAULT_SAMPLES,
+    seed: Optional[int] = None
+) -> Dict:
+    """
+    Pieces in weight_kg with the unit-weight distribution under tolerance
+
+    Each sample stands for a lot whose parts sit at that point of the
+    band, so the piece-count interval covers lot-to-lot variation rather
+    than shrinking with the number of pieces in the bag.
+    """
+    calculator = get_weight_calculator()
+    result = calculator.calculate_pieces_from_weight(
+        fastener_type_id=fastener_type_id,
+        material_id=material_id,
+        diameter=diameter,
+        length=length,
+        weight_kg=weight_kg
+    )
+    if fastener_type_id not in VOLUME_FUNCTIONS:
+        raise ValueError(f"No tolerance model for fastener type: {fastener_type_id}")
+
+    density = calculator.data_loader.get_material_by_id(material_id)["density"]
+    weights = sample_unit_weights(fastener_type_id, diameter, length, density, samples, seed)
+    pieces = np.floor(weight_kg * 1000 / weights)
+
+    low, high = INTERVAL_PERCENTILES
+    w_low, w_median, w_high = np.percentile(weights, (low, 50, high))
+    p_low, p_median, p_high = np.percentile(pieces, (low, 50, high))
+    result["tolerance"] = {
+        "samples": samples,
+        "interval": f"p{low}-p{high}",
+        "unit_weight_grams": {
+            "mean": round(float(weights.mean()), 3),
+            "std": round(float(weights.std()), 4),
+            f"p{low}": round(float(w_low), 3),
+            "p50": round(float(w_median), 3),
+            f"p{high}": round(float(w_high), 3),
+        },
+        "total_pieces": {
+            f"p{low}": int(p_low),
+            "p50": int(p_median),
+            f"p{high}": int(p_high),
+        },
+    }
+    return result
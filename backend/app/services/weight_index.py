@@ -0,0 +1,268 @@
+"""
+Sorted unit-weight index for identifying parts from a measured weight
+
+Every catalogue combination (fastener type × material × available
+diameter × plausible standard length) is calculated once with the batch
+engine and sorted by unit weight. A query is two binary searches for the
+tolerance window plus a sort of the matches, instead of evaluating every
+formula per request.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .calculator import SHAPE_REGISTRY, get_base_dimension_type
+from .data_loader import DataSnapshot, get_data_loader
+
+logger = logging.getLogger(__name__)
+
+# Standard lengths considered for a diameter: from MIN × d up to MAX × d,
+# roughly the range DIN/ISO bolt and screw catalogues list
+MIN_LENGTH_RATIO = 1.0
+MAX_LENGTH_RATIO = 20.0
+
+# (material_id, category) filter -> (sorted weights, entry positions)
+Partition = Tuple[np.ndarray, np.ndarray]
+
+
+class UnitWeightIndex:
+    """Unit weights of all catalogue combinations, sorted for range queries"""
+
+    def __init__(
+        self,
+        fastener_types: List[Dict],
+        materials: List[Dict],
+        diameters: List[str],
+        type_index: np.ndarray,
+        material_index: np.ndarray,
+        diameter_index: np.ndarray,
+        lengths: np.ndarray,
+        weights: np.ndarray,
+        data_version: str,
+        build_seconds: float = 0.0,
+        order: Optional[np.ndarray] = None,
+        sorted_weights: Optional[np.ndarray] = None
+    ):
+        self.fastener_types = fastener_types
+        self.materials = materials
+        self.diameters = diameters
+        self.type_index = type_index
+        self.material_index = material_index
+        self.diameter_index = diameter_index
+        # NaN for fastener types whose weight does not depend on length
+        self.lengths = lengths
+        self.weights = weights
+        self.data_version = data_version
+        self.build_seconds = build_seconds
+
+        self._material_positions = {mat["id"]: i for i, mat in enumerate(materials)}
+        self._type_categories = np.array([ft.get("category", "") for ft in fastener_types])
+        # Entry positions in ascending weight order, and the weights in that order
+        if order is None:
+            order = np.argsort(weights, kind="stable")
+        if sorted_weights is None:
+            sorted_weights = weights[order]
+        self.order = order
+        self.sorted_weights = sorted_weights
+        self._partitions: Dict[Tuple[Optional[str], Optional[str]], Partition] = {
+            (None, None): (sorted_weights, order)
+        }
+        self._partition_lock = threading.Lock()
+
+    def _partition(self, material_id: Optional[str], category: Optional[str]) -> Partition:
+        """Sorted weights restricted to a material and/or category, built on first use"""
+        key = (material_id, category)
+        partition = self._partitions.get(key)
+        if partition is not None:
+            return partition
+
+        if material_id is not None and material_id not in self._material_positions:
+            raise ValueError(f"Unknown material: {material_id}")
+        if category is not None and category not in {ft.get("category") for ft in self.fastener_types}:
+            raise ValueError(f"Unknown category: {category}")
+
+        _, order = self._partitions[(None, None)]
+        mask = np.ones(len(order), dtype=bool)
+        if material_id is not None:
+            mask &= self.material_index[order] == self._material_positions[material_id]
+        if category is not None:
+            mask &= self._type_categories[self.type_index[order]] == category
+        selected = order[mask]
+        partition = (self.weights[selected], selected)
+        with self._partition_lock:
+            self._partitions[key] = partition
+        return partition
+
+    def query(
+        self,
+        weight_grams: float,
+        tolerance_pct: float = 5.0,
+        material_id: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Find combinations whose unit weight is within tolerance_pct of
+        weight_grams, closest first
+        """
+        if weight_grams <= 0:
+            raise ValueError("Weight must be greater than 0")
+        sorted_weights, positions = self._partition(material_id, category)
+        low = weight_grams * (1 - tolerance_pct / 100)
+        high = weight_grams * (1 + tolerance_pct / 100)
+        start = int(np.searchsorted(sorted_weights, low, side="left"))
+        end = int(np.searchsorted(sorted_weights, high, side="right"))
+
+        matches = positions[start:end]
+        deviation = np.abs(sorted_weights[start:end] - weight_grams)
+        best = matches[np.argsort(deviation, kind="stable")[:limit]]
+        return {
+            "weight_grams": weight_grams,
+            "tolerance_pct": tolerance_pct,
+            "range_grams": [round(low, 4), round(high, 4)],
+            "match_count": end - start,
+            "candidates": self._candidates(best, weight_grams),
+        }
+
+    def _candidates(self, positions: np.ndarray, weight_grams: float) -> List[Dict]:
+        """Result rows for entry positions, gathering each column in one go"""
+        candidates = []
+        columns = zip(
+            self.type_index[positions].tolist(),
+            self.material_index[positions].tolist(),
+            self.diameter_index[positions].tolist(),
+            self.lengths[positions].tolist(),
+            self.weights[positions].tolist()
+        )
+        for t, m, d, length, unit_weight in columns:
+            fastener_type = self.fastener_types[t]
+            material = self.materials[m]
+            candidates.append({
+                "fastener_type_id": fastener_type["id"],
+                "fastener_type": fastener_type["name"],
+                "category": fastener_type.get("category"),
+                "material_id": material["id"],
+                "material": material["name"],
+                "diameter": self.diameters[d],
+                "length": None if length != length else length,
+                "unit_weight_grams": round(unit_weight, 3),
+                "deviation_pct": round((unit_weight - weight_grams) / weight_grams * 100, 3),
+            })
+        return candidates
+
+    def stats(self) -> Dict:
+        return {
+            "entries": int(self.weights.size),
+            "data_version": self.data_version,
+            "build_seconds": round(self.build_seconds, 6),
+        }
+
+
+def build_unit_weight_index(snapshot: Optional[DataSnapshot] = None) -> UnitWeightIndex:
+    """Calculate and sort unit weights for the given (or current) data"""
+    data_loader = get_data_loader()
+    with data_loader.pin(snapshot):
+        return _build_unit_weight_index()
+
+
+def _build_unit_weight_index() -> UnitWeightIndex:
+    from .batch_calculator import VOLUME_FUNCTIONS, get_batch_weight_calculator
+
+    started = time.perf_counter()
+    data_loader = get_data_loader()
+    batch_calculator = get_batch_weight_calculator()
+    nominal = batch_calculator.calculator._get_nominal_diameter
+
+    fastener_types = [
+        ft for ft in data_loader.get_fastener_types()
+        if ft["id"] in VOLUME_FUNCTIONS and ft["id"] in SHAPE_REGISTRY
+    ]
+    materials = data_loader.get_materials()
+    densities = np.array([mat["density"] for mat in materials], dtype=np.float64)
+    preferred_lengths = [float(length) for length in data_loader.get_preferred_lengths()]
+
+    diameters: List[str] = []
+    diameter_positions: Dict[str, int] = {}
+    type_parts, diameter_parts, length_parts, volume_parts = [], [], [], []
+    for t, fastener_type in enumerate(fastener_types):
+        type_id = fastener_type["id"]
+        rows_d: List[str] = []
+        rows_l: List[float] = []
+        for diameter in data_loader.get_all_diameters(get_base_dimension_type(type_id)):
+            if SHAPE_REGISTRY[type_id].needs_length:
+                d = nominal(diameter)
+                lengths = [l for l in preferred_lengths if MIN_LENGTH_RATIO * d <= l <= MAX_LENGTH_RATIO * d]
+            else:
+                lengths = [float("nan")]
+            rows_d.extend([diameter] * len(lengths))
+            rows_l.extend(lengths)
+        if not rows_d:
+            continue
+        row_lengths = np.array(rows_l, dtype=np.float64)
+        volumes = batch_calculator.calculate_volumes(type_id, rows_d, np.nan_to_num(row_lengths))
+        for diameter in rows_d:
+            if diameter not in diameter_positions:
+                diameter_positions[diameter] = len(diameters)
+                diameters.append(diameter)
+        type_parts.append(np.full(len(rows_d), t, dtype=np.int32))
+        diameter_parts.append(np.array([diameter_positions[dia] for dia in rows_d], dtype=np.int32))
+        length_parts.append(row_lengths)
+        volume_parts.append(volumes)
+
+    # One row per (type, diameter, length), repeated for every material
+    volumes = np.concatenate(volume_parts)
+    rows = volumes.size
+    weights = (volumes[np.newaxis, :] / 1000 * densities[:, np.newaxis]).ravel()
+    index = UnitWeightIndex(
+        fastener_types=fastener_types,
+        materials=materials,
+        diameters=diameters,
+        type_index=np.tile(np.concatenate(type_parts), len(materials)),
+        material_index=np.repeat(np.arange(len(materials), dtype=np.int32), rows),
+        diameter_index=np.tile(np.concatenate(diameter_parts), len(materials)),
+        lengths=np.tile(np.concatenate(length_parts), len(materials)),
+        weights=weights,
+        data_version=data_loader.version,
+        build_seconds=time.perf_counter() - started
+    )
+    logger.info("Built unit-weight index: %s", index.stats())
+    return index
+
+
+_unit_weight_index: Optional[UnitWeightIndex] = None
+_build_lock = threading.Lock()
+
+
+def install_unit_weight_index(index: UnitWeightIndex) -> None:
+    """Serve queries from an index built elsewhere (e.g. mapped from shared files)"""
+    global _unit_weight_index
+    _unit_weight_index = index
+
+
+def precompute_unit_weight_index(snapshot: Optional[DataSnapshot] = None) -> UnitWeightIndex:
+    """Build the index for the given (or current) data ahead of the first query, e.g. at startup or after a reload"""
+    global _unit_weight_index
+    snapshot = snapshot or get_data_loader().snapshot()
+    with _build_lock:
+        if _unit_weight_index is None or _unit_weight_index.data_version != snapshot.version:
+            _unit_weight_index = build_unit_weight_index(snapshot)
+        return _unit_weight_index
+
+
+def current_unit_weight_index() -> Optional[UnitWeightIndex]:
+    """The index if it matches the data being served, else None (never builds)"""
+    index = _unit_weight_index
+    if index is not None and index.data_version == get_data_loader().version:
+        return index
+    return None
+
+
+def get_unit_weight_index() -> UnitWeightIndex:
+    """Get the index for the data being served, building it if it is missing or stale"""
+    index = current_unit_weight_index()
+    if index is not None:
+        return index
+    return precompute_unit_weight_index(get_data_loader().snapshot())
@@ -0,0 +1,171 @@
+"""
+Precomputed unit-weight table for standard sizes
+
+A dense array over fastener type × material × diameter × preferred
+length, so standard combinations are answered with a single index
+lookup instead of the geometric formulas.
+"""
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .data_loader import DataSnapshot, get_data_loader
+
+logger = logging.getLogger(__name__)
+
+
+class UnitWeightTable:
+    """Dense table of unit weights in grams"""
+
+    def __init__(
+        self,
+        fastener_type_ids: List[str],
+        material_ids: List[str],
+        diameters: List[str],
+        lengths: List[float],
+        weights: np.ndarray,
+        has_length: Dict[str, bool],
+        data_version: str,
+        build_seconds: float = 0.0
+    ):
+        self.fastener_type_ids = fastener_type_ids
+        self.material_ids = material_ids
+        self.diameters = diameters
+        self.lengths = lengths
+        self.weights = weights
+        self.has_length = has_length
+        self.data_version = data_version
+        self.build_seconds = build_seconds
+
+        self._type_index = {t: i for i, t in enumerate(fastener_type_ids)}
+        self._material_index = {m: i for i, m in enumerate(material_ids)}
+        self._diameter_index = {d: i for i, d in enumerate(diameters)}
+        self._length_index = {float(length): i for i, length in enumerate(lengths)}
+
+    def lookup(
+        self,
+        fastener_type_id: str,
+        material_id: str,
+        diameter: str,
+        length: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Get the unit weight in grams, or None if the combination is not
+        on the grid (unknown ids or a non-preferred length)
+        """
+        t = self._type_index.get(fastener_type_id)
+        m = self._material_index.get(material_id)
+        d = self._diameter_index.get(diameter)
+        if t is None or m is None or d is None:
+            return None
+        if self.has_length[fastener_type_id]:
+            if length is None:
+                return None
+            l = self._length_index.get(float(length))
+            if l is None:
+                return None
+        else:
+            # Weight does not depend on length; every column holds the same value
+            l = 0
+        return float(self.weights[t, m, d, l])
+
+    def stats(self) -> Dict:
+        """Size and build cost of the table"""
+        return {
+            "shape": {
+                "fastener_types": len(self.fastener_type_ids),
+                "materials": len(self.material_ids),
+                "diameters": len(self.diameters),
+                "lengths": len(self.lengths),
+            },
+            "data_version": self.data_version,
+            "entries": int(self.weights.size),
+            "memory_bytes": int(self.weights.nbytes),
+            "build_seconds": round(self.build_seconds, 6),
+        }
+
+
+def build_unit_weight_table(snapshot: Optional[DataSnapshot] = None) -> UnitWeightTable:
+    """Compute unit weights for every standard combination of the given (or current) data"""
+    data_loader = get_data_loader()
+    with data_loader.pin(snapshot):
+        return _build_unit_weight_table()
+
+
+def _build_unit_weight_table() -> UnitWeightTable:
+    from .batch_calculator import VOLUME_FUNCTIONS, get_batch_weight_calculator
+    from .calculator import SHAPE_REGISTRY
+
+    started = time.perf_counter()
+    data_loader = get_data_loader()
+    batch_calculator = get_batch_weight_calculator()
+
+    fastener_types = [
+        ft for ft in data_loader.get_fastener_types()
+        if ft["id"] in VOLUME_FUNCTIONS and ft["id"] in SHAPE_REGISTRY
+    ]
+    materials = data_loader.get_materials()
+    diameters = sorted(
+        {dim["diameter"] for dims in data_loader.get_all_dimensions().values() for dim in dims},
+        key=batch_calculator.calculator._get_nominal_diameter
+    )
+    lengths = [float(length) for length in data_loader.get_preferred_lengths()]
+
+    densities = np.array([mat["density"] for mat in materials], dtype=np.float64)
+    weights = np.empty(
+        (len(fastener_types), len(materials), len(diameters), len(lengths)),
+        dtype=np.float64
+    )
+
+    # Volume grid per type is diameters × lengths, flattened for the batch engine
+    grid_diameters = [d for d in diameters for _ in lengths]
+    grid_lengths = np.tile(np.array(lengths, dtype=np.float64), len(diameters))
+    has_length = {}
+    for t, fastener_type in enumerate(fastener_types):
+        type_id = fastener_type["id"]
+        has_length[type_id] = SHAPE_REGISTRY[type_id].needs_length
+        lengths_for_type = grid_lengths if has_length[type_id] else np.zeros_like(grid_lengths)
+        volumes = batch_calculator.calculate_volumes(type_id, grid_diameters, lengths_for_type)
+        volumes = volumes.reshape(len(diameters), len(lengths))
+        weights[t] = volumes[np.newaxis, :, :] / 1000 * densities[:, np.newaxis, np.newaxis]
+
+    table = UnitWeightTable(
+        fastener_type_ids=[ft["id"] for ft in fastener_types],
+        material_ids=[mat["id"] for mat in materials],
+        diameters=diameters,
+        lengths=lengths,
+        weights=weights,
+        has_length=has_length,
+        data_version=data_loader.version,
+        build_seconds=time.perf_counter() - started
+    )
+    logger.info("Built unit-weight table: %s", table.stats())
+    return table
+
+
+_unit_weight_table: Optional[UnitWeightTable] = None
+
+
+def precompute_unit_weight_table(snapshot: Optional[DataSnapshot] = None) -> UnitWeightTable:
+    """Build the table and make it available to the calculator"""
+    global _unit_weight_table
+    _unit_weight_table = build_unit_weight_table(snapshot)
+    return _unit_weight_table
+
+
+def install_unit_weight_table(table: UnitWeightTable) -> None:
+    """Make a table built elsewhere (e.g. mapped from shared files) available to the calculator"""
+    global _unit_weight_table
+    _unit_weight_table = table
+
+
+def get_unit_weight_table() -> Optional[UnitWeightTable]:
+    """
+    Get the precomputed table, or None if precompute is disabled
+
+    Callers should check `data_version` against the data they are
+    serving; the table is rebuilt after a reload.
+    """
+    return _unit_weight_table
@@ -0,0 +1,113 @@
+"""
+Timing harness for the benchmark suite
+
+Each sample times a batch of calls so sub-microsecond operations are not
+swamped by timer overhead; latency percentiles are per call.
+"""
+import gc
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+# Target duration of one timed sample
+SAMPLE_TARGET_NS = 50_000
+
+
+def _calibrate(func: Callable[[], object]) -> int:
+    """Number of calls per sample so one sample takes about SAMPLE_TARGET_NS"""
+    batch = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(batch):
+            func()
+        elapsed = time.perf_counter_ns() - started
+        if elapsed >= SAMPLE_TARGET_NS or batch >= 1 << 20:
+            return batch
+        batch *= 2
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func: Callable[[], object], samples: int = 200, warmup: int = 20) -> Dict:
+    """
+    Time func and return ops/sec with p50/p99 latency in microseconds
+    """
+    for _ in range(warmup):
+        func()
+    batch = _calibrate(func)
+
+    per_call_ns: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        total_started = time.perf_counter_ns()
+        for _ in range(samples):
+            started = time.perf_counter_ns()
+            for _ in range(batch):
+                func()
+            per_call_ns.append((time.perf_counter_ns() - started) / batch)
+        total_ns = time.perf_counter_ns() - total_started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    per_call_ns.sort()
+    return {
+        "ops_per_sec": round(samples * batch / (total_ns / 1e9), 1),
+        "p50_us": round(_percentile(per_call_ns, 0.50) / 1000, 3),
+        "p99_us": round(_percentile(per_call_ns, 0.99) / 1000, 3),
+        "samples": samples,
+        "batch": batch,
+    }
+
+
+def combine_runs(runs: List[Dict]) -> Dict:
+    """
+    Median of repeated measure() results, keeping every run's p50 and
+    ops/sec so compare() can tell a slowdown from run-to-run noise
+    """
+    return {
+        "ops_per_sec": round(statistics.median(r["ops_per_sec"] for r in runs), 1),
+        "p50_us": round(statistics.median(r["p50_us"] for r in runs), 3),
+        "p99_us": round(statistics.median(r["p99_us"] for r in runs), 3),
+        "samples": runs[0]["samples"],
+        "batch": runs[0]["batch"],
+        "runs": len(runs),
+        "p50_us_runs": [r["p50_us"] for r in runs],
+        "ops_per_sec_runs": [r["ops_per_sec"] for r in runs],
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """
+    Benchmarks whose median p50 latency grew, or throughput fell, by more
+    than `threshold` (a fraction) against the baseline
+
+    When both sides have several runs, the change must also be larger than
+    the noise: every current run slower than every baseline run.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        p50_change = current["p50_us"] / previous["p50_us"] - 1 if previous["p50_us"] else 0.0
+        ops_change = current["ops_per_sec"] / previous["ops_per_sec"] - 1 if previous["ops_per_sec"] else 0.0
+        p50_slower = p50_change > threshold
+        ops_slower = ops_change < -threshold
+        if "p50_us_runs" in current and "p50_us_runs" in previous:
+            p50_slower = p50_slower and min(current["p50_us_runs"]) > max(previous["p50_us_runs"])
+            ops_slower = ops_slower and max(current["ops_per_sec_runs"]) < min(previous["ops_per_sec_runs"])
+        if p50_slower or ops_slower:
+            regressions.append({
+                "name": name,
+                "p50_us": [previous["p50_us"], current["p50_us"]],
+                "ops_per_sec": [previous["ops_per_sec"], current["ops_per_sec"]],
+                "p50_change": round(p50_change, 3),
+                "ops_change": round(ops_change, 3),
+            })
+    return regressions
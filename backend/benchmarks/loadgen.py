@@ -0,0 +1,345 @@
+"""
+Load generator with latency SLO reporting
+
+Starts the API under uvicorn on loopback (or targets --url), then replays
+a weighted mix of requests from N concurrent keep-alive connections for
+each concurrency level. Reports throughput, p50/p95/p99 latency and error
+rate per endpoint as a text table and optionally as JSON. The client is a
+minimal HTTP/1.1 implementation on asyncio streams, so nothing beyond the
+standard library is needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.loadgen                                  # default mix, 1/8/32 connections
+    python -m benchmarks.loadgen --concurrency 4,16,64 --duration 15 --slo-p99-ms 50
+    python -m benchmarks.loadgen --mix calculate_weight=5,hsn_search=1 --output load.json
+    python -m benchmarks.loadgen --server-workers 4               # start via app.serve
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000      # existing server
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .harness import _percentile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Request = (method, path with query, JSON body or None)
+Request = Tuple[str, str, Optional[dict]]
+
+DIAMETERS = ["M6", "M8", "M10", "M12", "M16", "M20"]
+LENGTHS = [20, 30, 40, 50, 60, 80, 100]
+MATERIALS = ["mild_steel", "stainless_steel_304", "high_tensile_8_8", "brass"]
+BOLTS = ["hex_bolt", "socket_head_cap_screw"]
+NUTS_AND_WASHERS = ["hex_nut", "plain_washer", "spring_washer"]
+HSN_QUERIES = ["bolt", "nut", "washer", "screw", "7318", "731815", "stainless", "rivet", "bolts nuts", "scerw"]
+CATALOGUE_PATHS = [
+    "/api/bootstrap", "/api/fastener-types", "/api/materials", "/api/hsn-codes",
+    "/api/standards", "/api/dimensions/hex_bolt", "/api/diameters/hex_nut",
+]
+DIAGRAM_TYPES = BOLTS + NUTS_AND_WASHERS
+
+
+def _calculate_weight(rng: random.Random) -> Request:
+    if rng.random() < 0.6:
+        body = {"fastener_type_id": rng.choice(BOLTS), "length": rng.choice(LENGTHS)}
+    else:
+        body = {"fastener_type_id": rng.choice(NUTS_AND_WASHERS)}
+    body.update(material_id=rng.choice(MATERIALS), diameter=rng.choice(DIAMETERS), quantity=rng.randint(1, 5000))
+    return "POST", "/api/calculate/weight", body
+
+
+def _calculate_pieces(rng: random.Random) -> Request:
+    body = {
+        "fastener_type_id": rng.choice(BOLTS),
+        "material_id": rng.choice(MATERIALS),
+        "diameter": rng.choice(DIAMETERS),
+        "length": rng.choice(LENGTHS),
+        "weight": round(rng.uniform(1, 100), 1),
+    }
+    return "POST", "/api/calculate/pieces", body
+
+
+def _hsn_search(rng: random.Random) -> Request:
+    return "GET", f"/api/hsn-codes/search?q={rng.choice(HSN_QUERIES).replace(' ', '+')}&limit=10", None
+
+
+def _catalogue(rng: random.Random) -> Request:
+    return "GET", rng.choice(CATALOGUE_PATHS), None
+
+
+def _diagram(rng: random.Random) -> Request:
+    fmt = "svg" if rng.random() < 0.5 else "json"
+    return "GET", f"/api/diagram/{rng.choice(DIAGRAM_TYPES)}/{rng.choice(DIAMETERS)}?format={fmt}", None
+
+
+def _identify(rng: random.Random) -> Request:
+    return "GET", f"/api/identify?weight_grams={rng.uniform(2, 400):.1f}&limit=10", None
+
+
+SCENARIOS: Dict[str, Callable[[random.Random], Request]] = {
+    "calculate_weight": _calculate_weight,
+    "calculate_pieces": _calculate_pieces,
+    "hsn_search": _hsn_search,
+    "catalogue": _catalogue,
+    "diagram": _diagram,
+    "identify": _identify,
+}
+
+DEFAULT_MIX = "calculate_weight=4,calculate_pieces=1,hsn_search=2,catalogue=2,diagram=1"
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"name=weight,..." -> {name: weight}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class HTTPConnection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[dict]) -> int:
+        """Send a request and read the whole response; returns the status code"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept-Encoding: identity\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + payload)
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.reader = None
+
+
+async def _virtual_user(
+    host: str,
+    port: int,
+    mix: Dict[str, float],
+    deadline: float,
+    seed: int,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int]
+) -> None:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    connection = HTTPConnection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, body = SCENARIOS[name](rng)
+            started = time.perf_counter()
+            try:
+                status = await connection.request(method, path, body)
+                ok = 200 <= status < 400
+            except (OSError, asyncio.IncompleteReadError, ConnectionError, ValueError, IndexError):
+                await connection.close()
+                ok = False
+            samples[name].append(time.perf_counter() - started)
+            if not ok:
+                errors[name] += 1
+    finally:
+        await connection.close()
+
+
+def _summarize(latencies: List[float], error_count: int, elapsed: float) -> Dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    if not count:
+        return {"requests": 0, "rps": 0.0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "error_rate": 0.0}
+    return {
+        "requests": count,
+        "rps": round(count / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "error_rate": round(error_count / count, 4),
+    }
+
+
+async def run_stage(host: str, port: int, mix: Dict[str, float], concurrency: int, duration: float, warmup: float) -> Dict:
+    """Run `concurrency` connections for warmup + duration seconds and summarize the timed part"""
+    if warmup > 0:
+        await asyncio.gather(*[
+            _virtual_user(host, port, mix, time.perf_counter() + warmup, 1000 + i, {n: [] for n in mix}, {n: 0 for n in mix})
+            for i in range(concurrency)
+        ])
+    samples: Dict[str, List[float]] = {name: [] for name in mix}
+    errors: Dict[str, int] = {name: 0 for name in mix}
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _virtual_user(host, port, mix, started + duration, i, samples, errors)
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    endpoints = {name: _summarize(samples[name], errors[name], elapsed) for name in mix}
+    overall = _summarize([s for name in mix for s in samples[name]], sum(errors.values()), elapsed)
+    return {"concurrency": concurrency, "duration_s": round(elapsed, 3), "overall": overall, "endpoints": endpoints}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    """Start the API on 127.0.0.1:port and wait until /health answers"""
+    if workers > 1:
+        command = [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+                   "--workers", str(workers), "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                   "--log-level", "warning", "--no-access-log"]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=dict(os.environ))
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Server did not become healthy within 60 s")
+
+
+def format_table(report: Dict) -> str:
+    """Per-endpoint results of every stage as a text table"""
+    slo = report["slo_p99_ms"]
+    header = f"{'conc':>5}  {'endpoint':<18} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}"
+    lines = [header, "-" * len(header)]
+
+    def row(concurrency, name, r):
+        if not r["requests"]:
+            return f"{concurrency:>5}  {name:<18} {0:>9}"
+        flag = "  > SLO" if slo and r["p99_ms"] > slo else ""
+        return (
+            f"{concurrency:>5}  {name:<18} {r['requests']:>9} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} "
+            f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['error_rate']:>8.2%}{flag}"
+        )
+
+    for stage in report["stages"]:
+        for name, result in stage["endpoints"].items():
+            lines.append(row(stage["concurrency"], name, result))
+        lines.append(row(stage["concurrency"], "ALL", stage["overall"]))
+        lines.append("")
+    if slo:
+        best = report["max_rps_within_slo"]
+        if best:
+            lines.append(f"Highest throughput with p99 <= {slo} ms: {best['rps']:.1f} req/s at concurrency {best['concurrency']}")
+        else:
+            lines.append(f"No concurrency level met p99 <= {slo} ms")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="India Fasteners API load generator")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated connection counts, one stage each")
+    parser.add_argument("--duration", type=float, default=10.0, help="Timed seconds per stage")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Untimed seconds before each stage")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--slo-p99-ms", type=float, default=100.0, help="p99 latency objective in ms (0 to disable)")
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--server-workers", type=int, default=1, help="Worker processes for the started server")
+    parser.add_argument("--output", type=Path, help="Write the report JSON to this file")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    process = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        process = start_server(port, args.server_workers)
+
+    try:
+        stages = []
+        for concurrency in levels:
+            stage = asyncio.run(run_stage(host, port, mix, concurrency, args.duration, args.warmup))
+            stages.append(stage)
+            overall = stage["overall"]
+            print(f"concurrency {concurrency}: {overall['rps']:.1f} req/s, p99 {overall['p99_ms']} ms", file=sys.stderr)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    within_slo = [
+        {"concurrency": s["concurrency"], "rps": s["overall"]["rps"]}
+        for s in stages
+        if s["overall"]["requests"] and s["overall"]["p99_ms"] <= args.slo_p99_ms and s["overall"]["error_rate"] == 0
+    ]
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.url or f"http://{host}:{port} (started, {args.server_workers} worker(s))",
+            "mix": mix,
+        },
+        "slo_p99_ms": args.slo_p99_ms or None,
+        "stages": stages,
+        "max_rps_within_slo": max(within_slo, key=lambda s: s["rps"]) if args.slo_p99_ms and within_slo else None,
+    }
+    print(format_table(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
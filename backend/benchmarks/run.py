@@ -0,0 +1,94 @@
+"""
+Run the benchmark suite
+
+Usage (from the backend directory):
+    python -m benchmarks.run                              # run and print
+    python -m benchmarks.run --save-baseline              # store benchmarks/baseline.json
+    python -m benchmarks.run --compare --threshold 0.2    # exit 1 on regressions
+    python -m benchmarks.run --suite loader --filter search --repeat 7
+
+Timings depend on the machine, so no baseline is committed. Record one
+from the base revision on the same machine (or CI runner, in the same
+job) right before comparing; see "Benchmarks" in the README.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+from .harness import combine_runs, compare, measure
+from .suites import SUITES
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="India Fasteners API benchmarks")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Suite to run (repeatable, default all)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--samples", type=int, default=200, help="Timed samples per benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark, reported as the median (default 5)")
+    parser.add_argument("--output", type=Path, help="Write results JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Flag regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown as a fraction (default 0.2)")
+    args = parser.parse_args(argv)
+
+    benchmarks = [
+        (name, func)
+        for suite_name in args.suite or list(SUITES)
+        for name, func in SUITES[suite_name]()
+        if not args.filter or args.filter in name
+    ]
+    # Rounds run every benchmark once, so drift (CPU frequency, other load)
+    # spreads over all of them instead of skewing the ones that ran last
+    runs = {name: [] for name, _ in benchmarks}
+    for _ in range(max(1, args.repeat)):
+        for name, func in benchmarks:
+            runs[name].append(measure(func, samples=args.samples))
+
+    results = {}
+    for name, _ in benchmarks:
+        results[name] = r = combine_runs(runs[name])
+        spread = (max(r["p50_us_runs"]) - min(r["p50_us_runs"])) / r["p50_us"] if r["p50_us"] else 0.0
+        print(
+            f"{name:<52} {r['ops_per_sec']:>14,.0f} ops/s  p50 {r['p50_us']:>10.3f} us  "
+            f"p99 {r['p99_us']:>10.3f} us  spread {spread:>5.0%}"
+        )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=4))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=4))
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['name']}: p50 {r['p50_us'][0]} -> {r['p50_us'][1]} us ({r['p50_change']:+.0%}), "
+                f"ops/s {r['ops_per_sec'][0]} -> {r['ops_per_sec'][1]} ({r['ops_change']:+.0%})"
+            )
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} and run-to-run noise")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
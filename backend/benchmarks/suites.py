@@ -0,0 +1,118 @@
+"""
+Benchmark definitions for the calculator, data loader and HTTP layers
+
+Each suite returns (name, callable) pairs; names are stable keys in the
+baseline file.
+"""
+import inspect
+from typing import Callable, List, Tuple
+
+from app.services.calculator import WeightCalculator, get_weight_calculator
+from app.services.data_loader import get_data_loader
+from app.services.lru import LRUCache
+from app.services.tolerance import estimate_pieces_with_tolerance
+from app.services.weight_index import get_unit_weight_index
+
+Benchmarks = List[Tuple[str, Callable[[], object]]]
+
+DIAMETER = "M10"
+LENGTH = 50.0
+DENSITY = 7.85
+
+
+def calculator_methods() -> Benchmarks:
+    """Every calculate_*_weight shape method with a standard size"""
+    calculator = get_weight_calculator()
+    benchmarks = []
+    for name, method in inspect.getmembers(calculator, inspect.ismethod):
+        if not (name.startswith("calculate_") and name.endswith("_weight")):
+            continue
+        params = list(inspect.signature(method).parameters)
+        if params[:1] != ["diameter"]:
+            # calculate_weight / calculate_pieces_from_weight are in the dispatch suite
+            continue
+        if "length" in params:
+            benchmarks.append((f"calculator.{name}", lambda m=method: m(DIAMETER, LENGTH, DENSITY)))
+        else:
+            benchmarks.append((f"calculator.{name}", lambda m=method: m(DIAMETER, DENSITY)))
+    return benchmarks
+
+
+def _uncached_calculator() -> WeightCalculator:
+    """A calculator whose unit-weight cache is disabled, so every call resolves and calculates"""
+    calculator = WeightCalculator()
+    calculator.unit_weight_cache = LRUCache(0)
+    return calculator
+
+
+def calculator_dispatch() -> Benchmarks:
+    """
+    calculate_weight end to end for a bolt, a nut and a washer, and weight identification
+
+    The calculate_weight.* and calculate_pieces_from_weight.* benchmarks
+    bypass the unit-weight cache (repeating the same arguments would make
+    every call a hit); calculate_weight_cached.* measures the hit path.
+    """
+    calculator = _uncached_calculator()
+    cached = get_weight_calculator()
+    index = get_unit_weight_index()
+    return [
+        ("calculate_weight.hex_bolt", lambda: calculator.calculate_weight("hex_bolt", "mild_steel", DIAMETER, LENGTH, 100)),
+        ("calculate_weight.hex_bolt_off_grid", lambda: calculator.calculate_weight("hex_bolt", "mild_steel", DIAMETER, 47.5, 100)),
+        ("calculate_weight.hex_nut", lambda: calculator.calculate_weight("hex_nut", "stainless_steel_304", DIAMETER, None, 100)),
+        ("calculate_weight.plain_washer", lambda: calculator.calculate_weight("plain_washer", "brass", DIAMETER, None, 100)),
+        ("calculate_weight_cached.hex_bolt", lambda: cached.calculate_weight("hex_bolt", "mild_steel", DIAMETER, LENGTH, 100)),
+        ("calculate_pieces_from_weight.hex_bolt", lambda: calculator.calculate_pieces_from_weight("hex_bolt", "mild_steel", DIAMETER, LENGTH, 50.0)),
+        ("calculate_pieces_tolerance.hex_bolt", lambda: estimate_pieces_with_tolerance("hex_bolt", "mild_steel", DIAMETER, LENGTH, 50.0, seed=0)),
+        ("identify.any", lambda: index.query(42.0, 2.0)),
+        ("identify.material_category", lambda: index.query(42.0, 2.0, material_id="mild_steel", category="bolt")),
+    ]
+
+
+def data_loader() -> Benchmarks:
+    """Indexed lookups and HSN search"""
+    loader = get_data_loader()
+    return [
+        ("data_loader.get_fastener_type_by_id", lambda: loader.get_fastener_type_by_id("hex_bolt")),
+        ("data_loader.get_material_by_id", lambda: loader.get_material_by_id("mild_steel")),
+        ("data_loader.get_dimension_for_diameter", lambda: loader.get_dimension_for_diameter("hex_bolt", DIAMETER)),
+        ("data_loader.get_hsn_code_by_code", lambda: loader.get_hsn_code_by_code("731815")),
+        ("data_loader.search_hsn_codes.code", lambda: loader.search_hsn_codes("7318", limit=50)),
+        ("data_loader.search_hsn_codes.word", lambda: loader.search_hsn_codes("bolt", limit=50)),
+        ("data_loader.search_hsn_codes.typo", lambda: loader.search_hsn_codes("bollt", limit=50)),
+    ]
+
+
+def http() -> Benchmarks:
+    """Endpoints through FastAPI's TestClient (requires httpx)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    weight_body = {
+        "fastener_type_id": "hex_bolt",
+        "material_id": "mild_steel",
+        "diameter": DIAMETER,
+        "length": LENGTH,
+        "quantity": 100,
+    }
+    pieces_body = {key: value for key, value in weight_body.items() if key != "quantity"}
+    pieces_body["weight"] = 50.0
+    batch_body = {"items": [weight_body] * 100}
+    return [
+        ("http.get_fastener_types", lambda: client.get("/api/fastener-types")),
+        ("http.get_materials", lambda: client.get("/api/materials")),
+        ("http.search_hsn_codes", lambda: client.get("/api/hsn-codes/search", params={"q": "bolt"})),
+        ("http.get_diagram", lambda: client.get(f"/api/diagram/hex_bolt/{DIAMETER}")),
+        ("http.calculate_weight", lambda: client.post("/api/calculate/weight", json=weight_body)),
+        ("http.calculate_pieces", lambda: client.post("/api/calculate/pieces", json=pieces_body)),
+        ("http.calculate_weight_batch_100", lambda: client.post("/api/calculate/weight/batch", json=batch_body)),
+    ]
+
+
+SUITES = {
+    "calculator": calculator_methods,
+    "dispatch": calculator_dispatch,
+    "loader": data_loader,
+    "http": http,
+}
@@ -0,0 +1,107 @@
+"""
+Tests for the vectorized batch weight calculator
+"""
+import json
+
+import numpy as np
+import pytest
+
+from app.services.batch_calculator import VOLUME_FUNCTIONS, get_batch_weight_calculator
+from app.services.calculator import SHAPE_REGISTRY, get_weight_calculator
+from app.services.data_loader import get_data_loader
+
+LENGTHS = [8.0, 20.0, 35.0, 100.0, 250.0]
+FALLBACK_DIAMETERS = ["M3", "M4", "M5", "M6", "M8", "M10", "M12", "M16", "M20", "M24", "M30"]
+
+
+def test_every_registered_shape_has_a_volume_function():
+    assert set(SHAPE_REGISTRY) <= set(VOLUME_FUNCTIONS)
+
+
+@pytest.mark.parametrize("fastener_type_id", sorted(SHAPE_REGISTRY))
+def test_batch_matches_calculate_weight(fastener_type_id):
+    """The batch formulas duplicate the WeightCalculator ones; they must not drift apart"""
+    data_loader = get_data_loader()
+    calculator = get_weight_calculator()
+    batch_calculator = get_batch_weight_calculator()
+    handler = SHAPE_REGISTRY[fastener_type_id]
+    diameters = data_loader.get_all_diameters(handler.base_dimension_type) or FALLBACK_DIAMETERS
+    lengths = LENGTHS if handler.needs_length else [0.0]
+    checked = 0
+
+    for material in data_loader.get_materials()[:2]:
+        density = material["density"]
+        rows = [(d, l) for d in diameters for l in lengths]
+        batch = batch_calculator.calculate_volumes(
+            fastener_type_id, [d for d, _ in rows], np.array([l for _, l in rows], dtype=np.float64)
+        ) / 1000 * density
+
+        for (diameter, length), batch_weight in zip(rows, batch.tolist()):
+            if handler.needs_length:
+                expected = handler.calculate(calculator, diameter, length, density)
+            else:
+                expected = handler.calculate(calculator, diameter, density)
+            assert batch_weight == pytest.approx(expected, rel=1e-9, abs=1e-9), (diameter, length)
+            checked += 1
+    assert checked
+
+
+def test_batch_endpoint_matches_single_endpoint(client):
+    items = [
+        {"fastener_type_id": "hex_bolt", "material_id": "mild_steel", "diameter": "M10", "length": 50, "quantity": 100},
+        {"fastener_type_id": "hex_nut", "material_id": "stainless_steel_304", "diameter": "M12", "quantity": 7},
+        {"fastener_type_id": "spring_washer", "material_id": "brass", "diameter": "M8", "quantity": 3},
+    ]
+    batch = client.post("/api/calculate/weight/batch", json={"items": items}).json()
+    for item, result in zip(items, batch["results"]):
+        single = client.post("/api/calculate/weight", json=item).json()
+        assert result["unit_weight_grams"] == single["unit_weight_grams"]
+        assert result["total_weight_kg"] == single["total_weight_kg"]
+
+
+def test_batch_size_is_bounded(client):
+    item = {"fastener_type_id": "hex_nut", "material_id": "mild_steel", "diameter": "M10", "quantity": 1}
+    response = client.post("/api/calculate/weight/batch", json={"items": [item] * 10_001})
+    assert response.status_code == 422
+
+
+def test_invalid_lengths_are_row_errors(client):
+    good = {"fastener_type_id": "hex_bolt", "material_id": "mild_steel", "diameter": "M10", "length": 50, "quantity": 10}
+    # json= cannot send NaN, so build the body by hand
+    rows = ",".join(
+        json.dumps(good).replace('"length": 50', f'"length": {length}')
+        for length in ("NaN", "Infinity", "0", "-5", "50")
+    )
+    response = client.post(
+        "/api/calculate/weight/batch",
+        content=f'{{"items": [{rows}]}}',
+        headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    errors = [result.get("error") for result in body["results"]]
+    assert errors == [
+        "Length must be a positive number: nan",
+        "Length must be a positive number: inf",
+        "Length must be a positive number: 0.0",
+        "Length must be a positive number: -5.0",
+        None,
+    ]
+    assert body["totals"]["error_count"] == 4
+    assert body["totals"]["total_weight_kg"] == body["results"][-1]["total_weight_kg"]
+
+
+def test_invalid_length_is_an_error_even_where_unused():
+    # The length is echoed in the result, so a NaN would still break the response
+    result = get_batch_weight_calculator().calculate_batch([
+        {"fastener_type_id": "hex_nut", "material_id": "mild_steel", "diameter": "M10", "length": float("nan"), "quantity": 1}
+    ])
+    assert result["results"][0]["error"] == "Length must be a positive number: nan"
+
+
+@pytest.mark.parametrize("length", [0, -5])
+@pytest.mark.parametrize("path", ["/api/calculate/weight", "/api/calculate/pieces"])
+def test_single_endpoints_reject_non_positive_lengths(client, path, length):
+    body = {"fastener_type_id": "hex_bolt", "material_id": "mild_steel", "diameter": "M10", "length": length,
+            "quantity": 10, "weight": 1}
+    assert client.post(path, json=body).status_code == 422
@@ -0,0 +1,44 @@
+"""
+Tests for the benchmark regression check
+"""
+from benchmarks.harness import combine_runs, compare
+
+
+def _runs(p50s):
+    return combine_runs([
+        {"ops_per_sec": 1e6 / p50, "p50_us": p50, "p99_us": p50 * 2, "samples": 200, "batch": 10}
+        for p50 in p50s
+    ])
+
+
+def test_combine_runs_reports_medians():
+    combined = _runs([1.0, 5.0, 2.0])
+    assert combined["p50_us"] == 2.0
+    assert combined["runs"] == 3
+    assert combined["p50_us_runs"] == [1.0, 5.0, 2.0]
+
+
+def test_one_noisy_run_is_not_a_regression():
+    baseline = {"b": _runs([1.0, 1.0, 1.1, 1.0, 1.0])}
+    results = {"b": _runs([1.0, 1.0, 3.0, 1.1, 1.0])}
+    assert compare(results, baseline, 0.2) == []
+
+
+def test_overlapping_runs_are_not_a_regression():
+    baseline = {"b": _runs([1.0, 1.0, 1.0, 1.6, 1.0])}
+    results = {"b": _runs([1.3, 1.3, 1.3, 1.3, 1.3])}
+    assert compare(results, baseline, 0.2) == []
+
+
+def test_consistent_slowdown_is_a_regression():
+    baseline = {"b": _runs([1.0, 1.05, 0.95, 1.0, 1.0])}
+    results = {"b": _runs([1.5, 1.55, 1.45, 1.5, 1.5])}
+    [regression] = compare(results, baseline, 0.2)
+    assert regression["name"] == "b"
+    assert regression["p50_change"] == 0.5
+
+
+def test_single_run_results_use_the_threshold_only():
+    baseline = {"b": {"p50_us": 1.0, "ops_per_sec": 1e6}}
+    results = {"b": {"p50_us": 1.3, "ops_per_sec": 1e6 / 1.3}}
+    assert [r["name"] for r in compare(results, baseline, 0.2)] == ["b"]
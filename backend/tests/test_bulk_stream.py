@@ -0,0 +1,66 @@
+"""
+Tests for streaming bulk weight calculation
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from app.services.bulk_stream import stream_ndjson
+
+HEADER = "fastener_type_id,material_id,diameter,length,quantity\n"
+GOOD_ROW = "hex_bolt,mild_steel,M10,50,10\n"
+
+
+def _ndjson_lines(data: bytes, input_format: str):
+    return [json.loads(line) for line in b"".join(stream_ndjson(io.BytesIO(data), input_format)).splitlines()]
+
+
+@pytest.mark.parametrize("length", ["nan", "inf", "-inf", "-5", "0"])
+def test_non_finite_or_non_positive_length_is_a_row_error(length):
+    lines = _ndjson_lines(f"{HEADER}hex_bolt,mild_steel,M10,{length},10\n{GOOD_ROW}".encode(), "csv")
+    assert lines[0] == {"line": 2, "error": f"Length must be a positive number: {float(length)!r}"}
+    assert "error" not in lines[1]
+    totals = lines[-1]["totals"]
+    assert totals["error_count"] == 1
+    assert totals["total_weight_kg"] == lines[1]["total_weight_kg"]
+
+
+@pytest.mark.parametrize("quantity", ["nan", "inf", "0", "-3", "2.5"])
+def test_invalid_quantity_is_a_row_error(quantity):
+    lines = _ndjson_lines(f"{HEADER}hex_bolt,mild_steel,M10,50,{quantity}\n".encode(), "csv")
+    assert "error" in lines[0]
+    assert lines[-1]["totals"]["error_count"] == 1
+
+
+def test_ndjson_nan_length_is_a_row_error():
+    data = b'{"fastener_type_id": "hex_bolt", "material_id": "mild_steel", "diameter": "M10", "length": NaN, "quantity": 1}\n'
+    lines = _ndjson_lines(data, "ndjson")
+    assert "error" in lines[0]
+    assert lines[-1]["totals"]["total_weight_kg"] == 0.0
+
+
+def test_malformed_csv_record_does_not_end_the_stream():
+    oversized = "x" * (csv.field_size_limit() + 1)
+    data = f'{HEADER}{GOOD_ROW}hex_bolt,mild_steel,M10,"{oversized}",10\n{GOOD_ROW}'.encode()
+    lines = _ndjson_lines(data, "csv")
+    assert [line.get("line") for line in lines[:-1]] == [2, 3, 4]
+    assert lines[1]["error"].startswith("Invalid CSV row")
+    assert lines[-1]["totals"] == {
+        "line_items": 3, "error_count": 1, "total_pieces": 20, "total_weight_kg": round(2 * lines[0]["total_weight_kg"], 4)
+    }
+
+
+def test_stream_endpoint_output_is_valid_json(client):
+    data = f"{HEADER}hex_bolt,mild_steel,M10,nan,10\n{GOOD_ROW}".encode()
+    response = client.post(
+        "/api/calculate/weight/stream",
+        files={"file": ("items.csv", data, "text/csv")},
+        params={"output_format": "ndjson"}
+    )
+    assert response.status_code == 200
+    # json.loads accepts NaN and Infinity, so check the raw text
+    assert "NaN" not in response.text and "Infinity" not in response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["totals"]["error_count"] == 1
@@ -0,0 +1,100 @@
+"""
+Tests that the SQLite catalogue serves the same data as the JSON files
+"""
+import pytest
+
+from app.import_catalogue import main as import_catalogue_main
+from app.services.lru import LRUCache
+from app.services.calculator import SHAPE_REGISTRY, WeightCalculator
+from app.services.catalogue_db import SQLiteDataLoader
+from app.services.data_loader import DataLoader
+
+HSN_QUERIES = ["7318", "7318 15", "bolt", "hex bolts", "stainless steel", "blot", "wsher", "xyzzy"]
+LENGTHS = [10.0, 45.0, 120.0]
+
+
+@pytest.fixture(scope="module")
+def loaders(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("catalogue") / "catalogue.db"
+    assert import_catalogue_main(["--output", str(db_path)]) == 0
+    return DataLoader(), SQLiteDataLoader(db_path)
+
+
+def _fastener_type_ids(json_loader):
+    return [fastener_type["id"] for fastener_type in json_loader.get_fastener_types()]
+
+
+def test_same_data_version(loaders):
+    json_loader, sqlite_loader = loaders
+    assert sqlite_loader.version == json_loader.version
+
+
+def test_same_reference_data(loaders):
+    json_loader, sqlite_loader = loaders
+    for getter in ("get_fastener_types", "get_materials", "get_hsn_codes", "get_standards",
+                   "get_kits", "get_preferred_lengths", "get_gst_info"):
+        assert getattr(sqlite_loader, getter)() == getattr(json_loader, getter)(), getter
+    assert sqlite_loader.get_hsn_codes_page(5, 10) == json_loader.get_hsn_codes_page(5, 10)
+
+
+def test_same_lookups(loaders):
+    json_loader, sqlite_loader = loaders
+    for fastener_type_id in _fastener_type_ids(json_loader) + ["no_such_type"]:
+        assert sqlite_loader.get_fastener_type_by_id(fastener_type_id) == json_loader.get_fastener_type_by_id(fastener_type_id)
+    for material in json_loader.get_materials():
+        assert sqlite_loader.get_material_by_id(material["id"]) == material
+    for hsn in json_loader.get_hsn_codes():
+        assert sqlite_loader.get_hsn_code_by_code(hsn["code"]) == json_loader.get_hsn_code_by_code(hsn["code"])
+    for kit in json_loader.get_kits():
+        assert sqlite_loader.get_kit_by_id(kit["id"]) == kit
+    for code in json_loader.get_standards():
+        assert sqlite_loader.get_standard_info(code) == json_loader.get_standard_info(code)
+        assert sqlite_loader.get_standard_equivalents(code) == json_loader.get_standard_equivalents(code)
+
+
+def test_same_dimensions(loaders):
+    json_loader, sqlite_loader = loaders
+    assert sqlite_loader.get_all_dimensions() == json_loader.get_all_dimensions()
+    for fastener_type in list(json_loader.get_all_dimensions()) + ["no_such_type"]:
+        assert sqlite_loader.get_dimensions(fastener_type) == json_loader.get_dimensions(fastener_type)
+        diameters = json_loader.get_all_diameters(fastener_type)
+        assert sqlite_loader.get_all_diameters(fastener_type) == diameters
+        for diameter in diameters + ["M999"]:
+            assert (sqlite_loader.get_dimension_for_diameter(fastener_type, diameter)
+                    == json_loader.get_dimension_for_diameter(fastener_type, diameter))
+
+
+@pytest.mark.parametrize("offset, limit", [(0, 1), (0, 5), (3, 4), (0, 1000), (1000, 5)])
+def test_same_dimension_pages(loaders, offset, limit):
+    json_loader, sqlite_loader = loaders
+    for fastener_type in json_loader.get_all_dimensions():
+        assert (sqlite_loader.get_dimensions_page(fastener_type, offset, limit)
+                == json_loader.get_dimensions_page(fastener_type, offset, limit))
+
+
+@pytest.mark.parametrize("query", HSN_QUERIES)
+@pytest.mark.parametrize("limit", [None, 5])
+def test_same_hsn_search(loaders, query, limit):
+    json_loader, sqlite_loader = loaders
+    assert sqlite_loader.search_hsn_codes(query, limit) == json_loader.search_hsn_codes(query, limit)
+
+
+def _calculator(data_loader):
+    calculator = WeightCalculator()
+    calculator.data_loader = data_loader
+    calculator.unit_weight_cache = LRUCache(0)
+    return calculator
+
+
+def test_same_weight_calculations(loaders):
+    json_loader, sqlite_loader = loaders
+    json_calculator, sqlite_calculator = _calculator(json_loader), _calculator(sqlite_loader)
+    checked = 0
+    for fastener_type_id, handler in SHAPE_REGISTRY.items():
+        diameters = json_loader.get_all_diameters(handler.base_dimension_type) or ["M10"]
+        for diameter in diameters:
+            for length in LENGTHS if handler.needs_length else [None]:
+                args = (fastener_type_id, "stainless_steel_304", diameter, length, 25)
+                assert sqlite_calculator.calculate_weight(*args) == json_calculator.calculate_weight(*args), args
+                checked += 1
+    assert checked
@@ -0,0 +1,43 @@
+"""
+Tests for the compiled data snapshot
+"""
+import pickle
+import shutil
+
+from app.services.data_loader import COMPILED_SNAPSHOT_FILE, DataLoader, get_data_loader
+
+
+def _loader(tmp_path):
+    source = get_data_loader().data_dir
+    for path in source.glob("*.json"):
+        shutil.copy2(path, tmp_path / path.name)
+    loader = DataLoader()
+    loader.data_dir = tmp_path
+    return loader
+
+
+def test_compiled_snapshot_round_trip(tmp_path):
+    loader = _loader(tmp_path)
+    written = loader.write_compiled_snapshot()
+    loaded = loader._load_compiled_snapshot()
+    assert loaded is not None
+    assert loaded.version == written.version
+    assert loaded.indexes["hsn_search"].search("blot", limit=1)
+
+
+def test_snapshot_from_other_index_code_is_ignored(tmp_path):
+    loader = _loader(tmp_path)
+    loader.write_compiled_snapshot()
+    path = tmp_path / COMPILED_SNAPSHOT_FILE
+    payload = pickle.loads(path.read_bytes())
+    payload["code"] = "0" * 16
+    path.write_bytes(pickle.dumps(payload))
+    assert loader._load_compiled_snapshot() is None
+
+
+def test_snapshot_of_changed_data_is_ignored(tmp_path):
+    loader = _loader(tmp_path)
+    loader.write_compiled_snapshot()
+    kits = tmp_path / "kits.json"
+    kits.write_text(kits.read_text().replace("{", "{ ", 1))
+    assert loader._load_compiled_snapshot() is None
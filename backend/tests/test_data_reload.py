@@ -0,0 +1,124 @@
+"""
+Tests for atomic data reloads and per-request snapshot pinning
+"""
+import json
+import shutil
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import config, middleware
+from app.routers import admin
+from app.services.data_loader import DataLoader, get_data_loader
+
+ADMIN_TOKEN = "test-token"
+
+
+@pytest.fixture
+def loader(tmp_path):
+    for path in get_data_loader().data_dir.glob("*.json"):
+        shutil.copy2(path, tmp_path / path.name)
+    data_loader = DataLoader()
+    data_loader.data_dir = tmp_path
+    return data_loader
+
+
+def _rename_material(data_loader, material_id, name):
+    path = data_loader.data_dir / "materials.json"
+    data = json.loads(path.read_text())
+    for material in data["materials"]:
+        if material["id"] == material_id:
+            material["name"] = name
+    path.write_text(json.dumps(data))
+
+
+def _material_name(data_loader):
+    return data_loader.get_material_by_id("mild_steel")["name"]
+
+
+def test_pinned_snapshot_survives_a_reload(loader):
+    old_name, old_version = _material_name(loader), loader.version
+    with loader.pin() as snapshot:
+        _rename_material(loader, "mild_steel", "Renamed Steel")
+        # /admin/reload runs in a worker thread, not in the pinned context
+        result = {}
+        reloader = threading.Thread(target=lambda: result.update(loader.reload()))
+        reloader.start()
+        reloader.join()
+        assert result["reloaded"] is True and result["changed_files"] == ["materials.json"]
+        assert loader.version == snapshot.version == old_version
+        assert _material_name(loader) == old_name
+    assert loader.version == result["data_version"] != old_version
+    assert _material_name(loader) == "Renamed Steel"
+
+
+def test_reload_listeners_get_the_new_snapshot(loader):
+    seen = []
+
+    def failing(snapshot):
+        raise RuntimeError("listener failed")
+
+    loader.add_reload_listener(failing)
+    loader.add_reload_listener(seen.append)
+
+    assert loader.reload()["reloaded"] is False
+    assert seen == []
+
+    _rename_material(loader, "mild_steel", "Renamed Steel")
+    result = loader.reload()
+    # A failing listener neither undoes the swap nor stops the next one
+    assert [snapshot.version for snapshot in seen] == [result["data_version"]]
+    assert seen[0] is loader.snapshot()
+
+
+def test_broken_file_keeps_the_current_snapshot(loader):
+    version = loader.version
+    (loader.data_dir / "materials.json").write_text("{not json")
+    with pytest.raises(ValueError):
+        loader.reload()
+    assert loader.version == version
+    assert _material_name(loader) == "Mild Steel (MS)"
+
+
+def test_request_in_flight_keeps_its_snapshot_across_admin_reload(loader, monkeypatch):
+    monkeypatch.setattr(middleware, "get_data_loader", lambda: loader)
+    monkeypatch.setattr(admin, "get_data_loader", lambda: loader)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", ADMIN_TOKEN)
+    started, release = threading.Event(), threading.Event()
+
+    app = FastAPI()
+    app.add_middleware(middleware.DataSnapshotMiddleware)
+    app.include_router(admin.router)
+
+    @app.get("/slow")
+    def slow():
+        before = _material_name(loader)
+        started.set()
+        assert release.wait(5)
+        return {"before": before, "after": _material_name(loader), "version": loader.version}
+
+    old_version = loader.version
+    responses = {}
+    with TestClient(app) as client:
+        request = threading.Thread(target=lambda: responses.update(slow=client.get("/slow")))
+        request.start()
+        assert started.wait(5)
+
+        _rename_material(loader, "mild_steel", "Renamed Steel")
+        reload = client.post("/admin/reload", headers={"X-Admin-Token": ADMIN_TOKEN})
+        assert reload.status_code == 200 and reload.json()["reloaded"] is True
+        new_version = reload.json()["data_version"]
+        # The reload request itself started on the old snapshot
+        assert reload.headers["x-data-version"] == old_version
+
+        release.set()
+        request.join(5)
+        slow = responses["slow"]
+        assert slow.json() == {"before": "Mild Steel (MS)", "after": "Mild Steel (MS)", "version": old_version}
+        assert slow.headers["x-data-version"] == old_version
+
+        after = client.get("/slow")
+        assert after.json() == {"before": "Renamed Steel", "after": "Renamed Steel", "version": new_version}
+        assert after.headers["x-data-version"] == new_version
@@ -0,0 +1,116 @@
+"""
+Tests for ranked HSN search
+"""
+import random
+import string
+
+import pytest
+
+from app.services.data_loader import get_data_loader
+from app.services.hsn_index import HSNSearchIndex, edit_distance, max_edits
+
+
+@pytest.fixture(scope="module")
+def index():
+    return HSNSearchIndex(get_data_loader().get_hsn_codes())
+
+
+def _descriptions(results):
+    return [record["description"].lower() for record in results]
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("bolt", "bolt", 0),
+    ("blot", "bolt", 1),      # transposition
+    ("bollt", "bolt", 1),     # insertion
+    ("wsher", "washer", 1),   # deletion
+    ("nit", "nut", 1),        # substitution
+    ("scerws", "screws", 1),
+    ("bolt", "washer", 3),    # capped at bound + 1
+])
+def test_edit_distance(a, b, expected):
+    assert edit_distance(a, b, 2) == min(expected, 3)
+
+
+def test_edit_distance_to_prefix():
+    assert edit_distance("blot", "bolts", 1) == 2
+    assert edit_distance("blot", "bolts", 1, prefix=True) == 1
+    assert edit_distance("wsher", "washers", 1, prefix=True) == 1
+
+
+@pytest.mark.parametrize("query, word", [
+    ("blot", "bolt"),        # transposition
+    ("iorn", "iron"),
+    ("scerw", "screw"),
+    ("scerws", "screws"),
+    ("bollt", "bolt"),       # insertion
+    ("screwz", "screw"),
+    ("wsher", "washer"),     # deletion
+    ("stel", "steel"),
+    ("washr bolts", "washer"),
+])
+def test_typo_tolerant_search(index, query, word):
+    results = index.search(query, limit=10)
+    assert results
+    assert word in _descriptions(results)[0]
+
+
+@pytest.mark.parametrize("query", ["xyzzy", "ab", "qqqqqqqq"])
+def test_unrelated_queries_find_nothing(index, query):
+    assert index.search(query, limit=10) == []
+
+
+def test_exact_matches_rank_ahead_of_typos(index):
+    results = index.search("bolts", limit=5)
+    assert all("bolt" in description for description in _descriptions(results))
+
+
+def test_code_search(index):
+    results = index.search("7318", limit=5)
+    assert results[0]["code"] == "7318"
+    assert all(record["code"].startswith("7318") for record in results)
+
+
+def _typo(word, rng):
+    i = rng.randrange(len(word))
+    edit = rng.choice(("insert", "delete", "substitute", "swap"))
+    letter = rng.choice(string.ascii_lowercase)
+    if edit == "insert":
+        return word[:i] + letter + word[i:]
+    if edit == "delete" and len(word) > 1:
+        return word[:i] + word[i + 1:]
+    if edit == "swap" and i + 1 < len(word):
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + letter + word[i + 1:]
+
+
+def test_edit_candidates_match_a_full_scan():
+    rng = random.Random(7)
+    vocab = sorted({
+        "".join(rng.choice(string.ascii_lowercase[:8]) for _ in range(rng.randint(3, 11)))
+        for _ in range(800)
+    })
+    records = [{"code": str(9000 + i), "description": " ".join(rng.sample(vocab, 4))} for i in range(600)]
+    index = HSNSearchIndex(records)
+    # Words no record picked are not in the index
+    vocab = index._vocab
+    queries = [_typo(_typo(word, rng), rng) for word in rng.sample(vocab, 150)]
+    for query in queries + [word[:-1] for word in vocab[:50]]:
+        bound = max_edits(query)
+        if not bound:
+            continue
+        expected = {word for word in vocab if edit_distance(query, word, bound, prefix=True) <= bound}
+        assert expected <= index._edit_candidates_for(query, bound), query
+
+
+def test_typo_queries_on_a_large_vocabulary():
+    rng = random.Random(11)
+    real = get_data_loader().get_hsn_codes()
+    noise = sorted({"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12))) for _ in range(3000)})
+    records = list(real) + [
+        {"code": str(90000 + i), "description": " ".join(rng.sample(noise, 6))} for i in range(5000)
+    ]
+    index = HSNSearchIndex(records)
+    for query, word in [("blot", "bolt"), ("wsher", "washer"), ("scerws", "screw"), ("stel", "steel")]:
+        results = index.search(query, limit=10)
+        assert any(word in description for description in _descriptions(results)), query
@@ -0,0 +1,49 @@
+"""
+Tests for identifying fasteners from a measured unit weight
+"""
+from fastapi.testclient import TestClient
+
+from app import config
+from app.main import app
+from app.services import weight_index
+from app.services.data_loader import get_data_loader
+
+
+def test_index_is_built_at_startup(client):
+    index = weight_index.current_unit_weight_index()
+    assert index is not None
+    assert index.data_version == get_data_loader().version
+
+
+def test_reload_rebuilds_index_off_the_request_path(client, monkeypatch):
+    data_loader = get_data_loader()
+    # As if the index still belonged to the previous data version
+    monkeypatch.setattr(weight_index, "_unit_weight_index", None)
+    data_loader.reload(force=True)
+    rebuilt = weight_index.current_unit_weight_index()
+    assert rebuilt is not None and rebuilt.data_version == data_loader.version
+
+    def fail(*args, **kwargs):
+        raise AssertionError("index built inside a request")
+
+    monkeypatch.setattr(weight_index, "build_unit_weight_index", fail)
+    response = client.get("/api/identify", params={"weight_grams": 41.965, "tolerance_pct": 1})
+    assert response.status_code == 200
+    assert response.json()["match_count"] > 0
+
+
+def test_index_is_built_on_first_use_when_precompute_is_off(monkeypatch):
+    data_loader = get_data_loader()
+    monkeypatch.setattr(config, "PRECOMPUTE_WEIGHT_INDEX", False)
+    monkeypatch.setattr(weight_index, "_unit_weight_index", None)
+    # Keep the listeners this second startup registers away from the session app
+    monkeypatch.setattr(data_loader, "_reload_listeners", list(data_loader._reload_listeners))
+    listeners = len(data_loader._reload_listeners)
+
+    with TestClient(app) as client:
+        assert weight_index.current_unit_weight_index() is None
+        assert weight_index.precompute_unit_weight_index not in data_loader._reload_listeners[listeners:]
+        response = client.get("/api/identify", params={"weight_grams": 41.965, "tolerance_pct": 1})
+        assert response.status_code == 200
+        assert response.json()["match_count"] > 0
+        assert weight_index.current_unit_weight_index() is not None
@@ -0,0 +1,61 @@
+"""
+Tests for kit (assembly) weight calculation
+"""
+import pytest
+
+from app.services.calculator import SHAPE_REGISTRY, get_weight_calculator
+from app.services.data_loader import get_data_loader
+from app.services.kit_calculator import get_kit_calculator
+
+COMPONENTS = [
+    {"fastener_type_id": "hex_bolt", "quantity": 3},
+    {"fastener_type_id": "hex_nut", "quantity": 7},
+    {"fastener_type_id": "plain_washer", "quantity": 13},
+    {"fastener_type_id": "spring_washer", "quantity": 11, "material_id": "stainless_steel_304"},
+]
+
+
+def _scalar_total_kg(components, material_id, diameter, length, sets):
+    calculator = get_weight_calculator()
+    return sum(
+        calculator.calculate_weight(
+            fastener_type_id=component["fastener_type_id"],
+            material_id=component.get("material_id") or material_id,
+            diameter=diameter,
+            length=length if SHAPE_REGISTRY[component["fastener_type_id"]].needs_length else None,
+            quantity=component["quantity"] * sets
+        )["total_weight_kg"]
+        for component in components
+    )
+
+
+@pytest.mark.parametrize("diameter, length", [("M6", 25.0), ("M10", 47.5), ("M20", 120.0)])
+@pytest.mark.parametrize("sets", [1, 1000, 250_000])
+def test_kit_total_matches_scalar_calculations(diameter, length, sets):
+    result = get_kit_calculator().calculate_kit(COMPONENTS, diameter, "brass", length, sets)
+    expected = _scalar_total_kg(COMPONENTS, "brass", diameter, length, sets)
+    # Each scalar total is rounded to 4 decimals. Summing rounded unit weights
+    # instead is off by up to 0.0005 g per piece, over 4 kg at 250,000 sets
+    assert result["total_weight_kg"] == pytest.approx(expected, abs=1e-4 * len(COMPONENTS))
+    for component, row in zip(COMPONENTS, result["components"]):
+        row_expected = _scalar_total_kg([component], "brass", diameter, length, sets)
+        assert row["total_weight_kg"] == pytest.approx(row_expected, abs=1e-4)
+
+
+def test_named_kit_matches_its_components():
+    kit = get_data_loader().get_kit_by_id("hex_bolt_double_washer_set")
+    result = get_kit_calculator().calculate_kit(kit["components"], "M12", "mild_steel", 60.0, 10_000)
+    expected = _scalar_total_kg(kit["components"], "mild_steel", "M12", 60.0, 10_000)
+    assert result["total_weight_kg"] == pytest.approx(expected, abs=1e-4 * len(kit["components"]))
+    set_grams = sum(row["weight_per_set_grams"] for row in result["components"])
+    assert result["set_weight_grams"] == pytest.approx(set_grams, abs=1e-3 * len(kit["components"]))
+
+
+def test_kit_endpoint(client):
+    response = client.post("/api/calculate/kit", json={
+        "kit_id": "hex_bolt_set", "material_id": "mild_steel", "diameter": "M10", "length": 50, "sets": 500
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["fastener_type_id"] for row in body["components"]] == ["hex_bolt", "hex_nut", "plain_washer", "spring_washer"]
+    assert body["sets_per_50kg"] == int(50000 / body["set_weight_grams"])
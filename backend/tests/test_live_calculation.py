@@ -0,0 +1,118 @@
+"""
+Tests for the live calculation WebSocket
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.routers import live
+from app.services.live_calculation import (
+    MAX_MESSAGE_BYTES,
+    LatestMessageSlot,
+    compute_live_message,
+    encode_reply,
+    live_messages_total,
+)
+
+WEIGHT = {"fastener_type_id": "hex_bolt", "material_id": "mild_steel", "diameter": "M10", "length": 50, "quantity": 10}
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_slot_keeps_only_the_latest_message():
+    async def run():
+        slot = LatestMessageSlot()
+        assert slot.put("a") is False
+        assert slot.put("b") is True
+        assert await slot.take() == "b"
+        slot.close()
+        assert await slot.take() is None
+
+    asyncio.run(run())
+
+
+def test_replies_to_each_message(client):
+    with client.websocket_connect("/api/ws/calculate") as ws:
+        ws.send_json({**WEIGHT, "id": 1})
+        reply = ws.receive_json()
+        assert reply["type"] == "result" and reply["id"] == 1
+        single = client.post("/api/calculate/weight", json=WEIGHT).json()
+        assert reply["result"]["unit_weight_grams"] == single["unit_weight_grams"]
+
+        ws.send_json({**WEIGHT, "mode": "pieces", "weight": 1, "id": 2})
+        reply = ws.receive_json()
+        assert reply["type"] == "result" and reply["mode"] == "pieces" and reply["id"] == 2
+
+
+def test_messages_queued_behind_a_calculation_are_coalesced(client, monkeypatch):
+    gate = threading.Event()
+
+    class GatedSlot(LatestMessageSlot):
+        async def take(self):
+            # Hold the consumer until the test has sent every message
+            while not gate.is_set():
+                await asyncio.sleep(0.001)
+            return await super().take()
+
+    monkeypatch.setattr(live, "LatestMessageSlot", GatedSlot)
+    received = live_messages_total.value("received")
+    superseded = live_messages_total.value("superseded")
+
+    with client.websocket_connect("/api/ws/calculate") as ws:
+        for message_id in range(1, 6):
+            ws.send_json({**WEIGHT, "length": 10 * message_id, "id": message_id})
+        _wait_for(lambda: live_messages_total.value("received") - received == 5)
+        gate.set()
+        reply = ws.receive_json()
+        assert reply["id"] == 5 and reply["result"]["length"] == 50
+
+        # Nothing was left behind for ids 1-4: the next reply answers the next message
+        ws.send_json({**WEIGHT, "id": 6})
+        assert ws.receive_json()["id"] == 6
+    assert live_messages_total.value("superseded") - superseded == 4
+
+
+@pytest.mark.parametrize("text, detail", [
+    ("not json", "Message is not valid JSON"),
+    ("[1, 2]", "Message must be a JSON object"),
+    (json.dumps({**WEIGHT, "mode": "volume", "id": 3}), "Unknown mode: volume"),
+    (json.dumps({**WEIGHT, "material_id": "unobtainium", "id": 3}), "Unknown material: unobtainium"),
+])
+def test_error_replies(client, text, detail):
+    with client.websocket_connect("/api/ws/calculate") as ws:
+        ws.send_text(text)
+        reply = ws.receive_json()
+        assert reply["type"] == "error"
+        assert reply["detail"] == detail
+
+
+@pytest.mark.parametrize("length", ["NaN", "Infinity", "-Infinity", "0", "-5"])
+def test_invalid_length_gets_a_strict_json_error(client, length):
+    text = json.dumps({**WEIGHT, "id": 4}).replace('"length": 50', f'"length": {length}')
+    with client.websocket_connect("/api/ws/calculate") as ws:
+        ws.send_text(text)
+        raw = ws.receive_text()
+    # The browser's JSON.parse rejects NaN and Infinity
+    reply = json.loads(raw, parse_constant=lambda name: pytest.fail(f"{name} in reply"))
+    assert reply["type"] == "error" and reply["id"] == 4
+    assert reply["detail"][0]["loc"] == ["length"]
+
+
+def test_message_size_is_limited_in_bytes():
+    # Fewer characters than the limit, but more bytes once encoded
+    text = json.dumps({**WEIGHT, "note": "€" * (MAX_MESSAGE_BYTES // 2)}, ensure_ascii=False)
+    assert len(text) < MAX_MESSAGE_BYTES < len(text.encode("utf-8"))
+    assert compute_live_message(text) == {"type": "error", "id": None, "detail": "Message too large"}
+
+
+def test_non_finite_id_is_not_echoed():
+    reply = json.loads(encode_reply(compute_live_message(json.dumps({**WEIGHT, "id": float("nan")}))))
+    assert reply == {"type": "error", "id": None, "detail": "Reply contains a number that is not finite"}
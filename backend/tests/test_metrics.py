@@ -0,0 +1,31 @@
+"""
+Tests for the /metrics endpoint
+"""
+import re
+
+
+def _samples(client, name):
+    text = client.get("/metrics").text
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+def test_routes_are_labelled_by_template(client):
+    client.get("/api/diagram/hex_bolt/M10")
+    lines = _samples(client, "http_requests_total")
+    assert any('route="/api/diagram/{fastener_type}/{diameter}"' in line for line in lines)
+    assert not any("M10" in line for line in lines)
+
+
+def test_unknown_methods_share_one_label(client):
+    for method in ("FOOBAR", "BAZ", "PROPFIND"):
+        client.request(method, "/health")
+    lines = _samples(client, "http_requests_total")
+    methods = {re.search(r'method="([^"]*)"', line).group(1) for line in lines}
+    assert "other" in methods
+    assert not methods & {"FOOBAR", "BAZ", "PROPFIND"}
+
+
+def test_data_loader_counters(client):
+    client.get("/api/materials")
+    assert _samples(client, "data_loader_reads_total ")
+    assert _samples(client, "data_loader_loads_total ")
@@ -0,0 +1,43 @@
+"""
+Tests for pre-serialized catalogue responses
+"""
+import pytest
+
+from app.services.prepared_responses import accepts_gzip
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.000", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("*;q=0, gzip", True),
+    ("br, gzip;level=1;q=0.8", True),
+    # Malformed q-values count as q=0
+    ("gzip;q=x", False),
+    ("gzip;q=", False),
+    ("gzip;q=2", False),
+    ("gzip;q=x, *", False),
+    ("*;q=x, gzip;q=1", True),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.mark.parametrize("header", ["gzip;q=x", "gzip;q=", "gzip;q=nan", "identity;q=abc, gzip;q=0.x"])
+def test_malformed_accept_encoding_is_not_an_error(client, header):
+    response = client.get("/api/bootstrap", headers={"Accept-Encoding": header})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") != "gzip"
+    assert "materials" in response.json()
+
+
+def test_bootstrap_gzip(client):
+    response = client.get("/api/bootstrap", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
@@ -0,0 +1,105 @@
+"""
+Tests for the server-side response cache middleware
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app import middleware
+from app.services.response_cache import ResponseCache, cached_response
+
+
+@pytest.fixture
+def cached_app(monkeypatch):
+    cache = ResponseCache(maxsize=16, default_ttl=60)
+    data_loader = SimpleNamespace(version="v1")
+    monkeypatch.setattr(middleware, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(middleware, "get_data_loader", lambda: data_loader)
+    calls = {}
+
+    app = FastAPI()
+    app.add_middleware(middleware.ResponseCacheMiddleware)
+
+    def count(name):
+        calls[name] = calls.get(name, 0) + 1
+        return calls[name]
+
+    @app.get("/cached/{item}")
+    @cached_response()
+    async def cached(item: str, response: Response):
+        response.headers["ETag"] = f'"{item}-{data_loader.version}"'
+        return {"item": item, "call": count("cached")}
+
+    @app.get("/plain")
+    async def plain():
+        return {"call": count("plain")}
+
+    @app.get("/missing")
+    @cached_response()
+    async def missing(response: Response):
+        response.status_code = 404
+        return {"call": count("missing")}
+
+    @app.get("/cookie")
+    @cached_response()
+    async def cookie(response: Response):
+        response.set_cookie("session", "abc")
+        return {"call": count("cookie")}
+
+    @app.get("/vary")
+    @cached_response()
+    async def vary(response: Response):
+        response.headers["Vary"] = "Accept-Language"
+        return {"call": count("vary")}
+
+    with TestClient(app) as client:
+        yield SimpleNamespace(client=client, calls=calls, cache=cache, data_loader=data_loader)
+
+
+def test_repeated_request_is_served_from_cache(cached_app):
+    first = cached_app.client.get("/cached/a?x=1&y=2")
+    second = cached_app.client.get("/cached/a?y=2&x=1")
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json() == {"item": "a", "call": 1}
+    assert second.headers["etag"] == first.headers["etag"]
+    assert cached_app.calls["cached"] == 1
+    assert cached_app.client.get("/cached/b").json()["call"] == 2
+
+
+def test_matching_etag_gets_304_from_cache(cached_app):
+    etag = cached_app.client.get("/cached/a").headers["etag"]
+    response = cached_app.client.get("/cached/a", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["x-cache"] == "HIT"
+    assert response.headers["etag"] == etag
+    assert cached_app.calls["cached"] == 1
+
+    other = cached_app.client.get("/cached/a", headers={"If-None-Match": '"stale"'})
+    assert other.status_code == 200 and other.headers["x-cache"] == "HIT"
+
+
+def test_data_version_change_invalidates_entries(cached_app):
+    cached_app.client.get("/cached/a")
+    cached_app.data_loader.version = "v2"
+    response = cached_app.client.get("/cached/a")
+    assert response.headers["x-cache"] == "MISS"
+    assert response.headers["etag"] == '"a-v2"'
+    assert response.json()["call"] == 2
+    assert cached_app.cache.stats()["invalidations"] == 1
+    assert cached_app.client.get("/cached/a").headers["x-cache"] == "HIT"
+
+
+@pytest.mark.parametrize("path", ["/plain", "/missing", "/cookie", "/vary"])
+def test_responses_that_must_not_be_cached_are_not_stored(cached_app, path):
+    name = path.strip("/")
+    for call in (1, 2):
+        response = cached_app.client.get(path)
+        assert response.json()["call"] == call
+        assert response.headers.get("x-cache") != "HIT"
+    assert cached_app.calls[name] == 2
+    assert cached_app.cache.stats()["size"] == 0
+
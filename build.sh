@@ -3,3 +3,6 @@
 
 cd backend
 pip install -r requirements.txt
+
+# Validate the data files and compile them into a prebuilt snapshot
+python -m app.build_snapshot
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef, useCallback } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import {
     Calculator,
@@ -10,15 +10,24 @@ import {
     AlertCircle
 } from 'lucide-react';
 import { Card, Button, Select, Input } from '../components/common';
-import { fastenerTypesAPI, materialsAPI, calculatorAPI, dimensionsAPI } from '../services/api';
+import { bootstrapAPI, calculatorAPI, dimensionsAPI, liveCalculatorAPI } from '../services/api';
 import './WeightCalculator.css';
 
+// Live channel errors are a message or a list of validation errors
+function formatLiveError(detail) {
+    if (Array.isArray(detail)) {
+        return detail.map(e => e.msg).join('; ');
+    }
+    return String(detail);
+}
+
 function WeightCalculator() {
     // State
     const [mode, setMode] = useState('pieces_to_weight'); // or 'weight_to_pieces'
     const [fastenerTypes, setFastenerTypes] = useState([]);
     const [materials, setMaterials] = useState([]);
     const [diameters, setDiameters] = useState([]);
+    const [diametersByType, setDiametersByType] = useState({});
 
     const [formData, setFormData] = useState({
         fastenerType: '',
@@ -32,18 +41,19 @@ function WeightCalculator() {
     const [result, setResult] = useState(null);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
+    const [liveError, setLiveError] = useState(null);
     const [selectedFastener, setSelectedFastener] = useState(null);
+    const liveRef = useRef(null);
 
     // Load initial data
     useEffect(() => {
         async function loadData() {
             try {
-                const [types, mats] = await Promise.all([
-                    fastenerTypesAPI.getAll(),
-                    materialsAPI.getAll()
-                ]);
+                const catalogue = await bootstrapAPI.get();
+                const types = catalogue.fastener_types;
                 setFastenerTypes(types);
-                setMaterials(mats);
+                setMaterials(catalogue.materials);
+                setDiametersByType(catalogue.diameters);
 
                 // Auto-select first fastener type
                 if (types.length > 0) {
@@ -60,6 +70,23 @@ function WeightCalculator() {
         loadData();
     }, []);
 
+    // Open the live calculation channel; results arrive as fields are edited
+    useEffect(() => {
+        // A rejected message (e.g. a half-typed value) keeps the last good result on screen
+        const live = liveCalculatorAPI.connect(
+            (liveResult) => {
+                setResult(liveResult);
+                setLiveError(null);
+            },
+            (detail) => setLiveError(formatLiveError(detail))
+        );
+        liveRef.current = live;
+        return () => {
+            liveRef.current = null;
+            live.close();
+        };
+    }, []);
+
     // Load diameters when fastener type changes
     useEffect(() => {
         async function loadDiameters() {
@@ -68,6 +95,15 @@ function WeightCalculator() {
                 return;
             }
 
+            // Find selected fastener details
+            const fastener = fastenerTypes.find(f => f.id === formData.fastenerType);
+            setSelectedFastener(fastener);
+
+            if (diametersByType[formData.fastenerType]) {
+                setDiameters(diametersByType[formData.fastenerType]);
+                return;
+            }
+
             try {
                 // Find the base type for diameters
                 const typeMap = {
@@ -83,17 +119,13 @@ function WeightCalculator() {
 
                 const dims = await dimensionsAPI.getDiameters(baseType);
                 setDiameters(dims);
-
-                // Find selected fastener details
-                const fastener = fastenerTypes.find(f => f.id === formData.fastenerType);
-                setSelectedFastener(fastener);
             } catch (err) {
                 // Fallback to default diameters
                 setDiameters(['M3', 'M4', 'M5', 'M6', 'M8', 'M10', 'M12', 'M14', 'M16', 'M20', 'M24', 'M30']);
             }
         }
         loadDiameters();
-    }, [formData.fastenerType, fastenerTypes]);
+    }, [formData.fastenerType, fastenerTypes, diametersByType]);
 
     // Handle form changes
     const handleChange = (field) => (e) => {
@@ -101,7 +133,10 @@ function WeightCalculator() {
             ...prev,
             [field]: e.target.value
         }));
-        setResult(null);
+        // With the live channel open the next result replaces this one
+        if (!liveRef.current?.isOpen()) {
+            setResult(null);
+        }
         setError(null);
     };
 
@@ -109,10 +144,11 @@ function WeightCalculator() {
     const toggleMode = () => {
         setMode(prev => prev === 'pieces_to_weight' ? 'weight_to_pieces' : 'pieces_to_weight');
         setResult(null);
+        setLiveError(null);
     };
 
     // Validate form
-    const isFormValid = () => {
+    const isFormValid = useCallback(() => {
         if (!formData.fastenerType || !formData.material || !formData.diameter) {
             return false;
         }
@@ -130,7 +166,29 @@ function WeightCalculator() {
         }
 
         return true;
-    };
+    }, [formData, mode, selectedFastener]);
+
+    // Request body shared by the HTTP endpoints and the live channel
+    const buildRequest = useCallback(() => {
+        const params = {
+            fastener_type_id: formData.fastenerType,
+            material_id: formData.material,
+            diameter: formData.diameter,
+            length: selectedFastener?.has_length ? parseFloat(formData.length) : null
+        };
+        if (mode === 'pieces_to_weight') {
+            return { ...params, quantity: parseInt(formData.quantity) };
+        }
+        return { ...params, weight: parseFloat(formData.weight) };
+    }, [formData, mode, selectedFastener]);
+
+    // Recalculate over the live channel whenever the form is complete
+    useEffect(() => {
+        if (!liveRef.current || !isFormValid()) {
+            return;
+        }
+        liveRef.current.send(mode === 'pieces_to_weight' ? 'weight' : 'pieces', buildRequest());
+    }, [isFormValid, buildRequest, mode]);
 
     // Calculate
     const handleCalculate = async () => {
@@ -145,26 +203,14 @@ function WeightCalculator() {
         try {
             let response;
 
-            const params = {
-                fastener_type_id: formData.fastenerType,
-                material_id: formData.material,
-                diameter: formData.diameter,
-                length: selectedFastener?.has_length ? parseFloat(formData.length) : null
-            };
-
             if (mode === 'pieces_to_weight') {
-                response = await calculatorAPI.calculateWeight({
-                    ...params,
-                    quantity: parseInt(formData.quantity)
-                });
+                response = await calculatorAPI.calculateWeight(buildRequest());
             } else {
-                response = await calculatorAPI.calculatePieces({
-                    ...params,
-                    weight: parseFloat(formData.weight)
-                });
+                response = await calculatorAPI.calculatePieces(buildRequest());
             }
 
             setResult(response);
+            setLiveError(null);
         } catch (err) {
             setError(err.response?.data?.detail || 'Calculation failed. Please try again.');
             console.error(err);
@@ -173,6 +219,9 @@ function WeightCalculator() {
         }
     };
 
+    // Why the result on screen may not match the form
+    const staleReason = liveError || (result && !isFormValid() ? 'fill in all required fields' : null);
+
     // Prepare options for selects
     const fastenerOptions = fastenerTypes.map(f => ({
         value: f.id,
@@ -350,6 +399,13 @@ function WeightCalculator() {
                                             <h3>Calculation Result</h3>
                                         </div>
 
+                                        {staleReason && (
+                                            <div className="live-error">
+                                                <AlertCircle size={16} />
+                                                <span>Not updated: {staleReason}</span>
+                                            </div>
+                                        )}
+
                                         <div className="result-summary">
                                             <div className="result-item">
                                                 <span className="result-label">Fastener</span>
@@ -30,6 +30,25 @@ api.interceptors.response.use(
     }
 );
 
+/**
+ * Bootstrap API - the whole catalogue in one request, shared by all pages
+ */
+let bootstrapPromise = null;
+
+export const bootstrapAPI = {
+    get: () => {
+        if (!bootstrapPromise) {
+            bootstrapPromise = api.get('/api/bootstrap')
+                .then((response) => response.data)
+                .catch((error) => {
+                    bootstrapPromise = null;
+                    throw error;
+                });
+        }
+        return bootstrapPromise;
+    },
+};
+
 /**
  * Fastener Types API
  */
@@ -95,6 +114,44 @@ export const calculatorAPI = {
     },
 };
 
+/**
+ * Live calculation channel - results pushed over one WebSocket while the
+ * form is edited. Replies to superseded inputs are skipped by the server,
+ * and anything older than the last message sent is ignored here.
+ */
+export const liveCalculatorAPI = {
+    connect: (onResult, onError) => {
+        const url = `${API_BASE_URL.replace(/^http/, 'ws')}/api/ws/calculate`;
+        const socket = new WebSocket(url);
+        let lastId = 0;
+
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.id !== lastId) {
+                return;
+            }
+            if (message.type === 'result') {
+                onResult(message.result, message.mode);
+            } else if (onError) {
+                onError(message.detail);
+            }
+        };
+
+        return {
+            isOpen: () => socket.readyState === WebSocket.OPEN,
+            send: (mode, params) => {
+                if (socket.readyState !== WebSocket.OPEN) {
+                    return false;
+                }
+                lastId += 1;
+                socket.send(JSON.stringify({ ...params, mode, id: lastId }));
+                return true;
+            },
+            close: () => socket.close(),
+        };
+    },
+};
+
 /**
  * HSN Codes API
  */